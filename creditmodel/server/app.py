@@ -1,15 +1,59 @@
 # app.py
 # FastAPI server that accepts React form JSON and returns the model evaluation.
+#
+# Inference backend is picked with the CREDIT_BACKEND env var (read when .model is imported):
+#   CREDIT_BACKEND=torch  (default) torch; serves the fused graph from artifacts/model.cma
+#                         (CREDIT_MODEL_FORMAT=pickle or CREDIT_FUSED_MODEL=0: model_bundle.pkl)
+#   CREDIT_BACKEND=numpy  artifacts/model.cma, plain NumPy matmuls, torch is never imported
+# Create/refresh model.cma after training with `python -m server.export_artifact`.
+#
+# Identical payloads are served from an LRU+TTL result cache in model.py
+# (CREDIT_CACHE_SIZE=10000 entries, 0 disables; CREDIT_CACHE_TTL_S=300).
+#
+# /score requests are micro-batched (see microbatch.py):
+#   SCORE_MICROBATCH=0         score every request on its own instead
+#   SCORE_BATCH_WINDOW_MS=2    how long the first request in a batch waits for company
+#   SCORE_BATCH_MAX=64         max requests per batch
+#
+# POST /score/batch takes at most SCORE_BATCH_LIMIT=1000 applicants; longer lists get a 422
+# before anything is scored (split big portfolios into several calls).
+#
+# Models are served from a registry (see registry.py): a champion plus an optional challenger
+# (CREDIT_CHALLENGER_PATH, CREDIT_CHALLENGER_WEIGHT or CREDIT_SHADOW=1). Results carry the
+# "model_version" that scored them. POST /admin/reload swaps in freshly loaded bundles without
+# dropping requests (CREDIT_MODEL_WATCH_S=N does the same when a model file changes);
+# /admin/* needs the X-Admin-Token header to match CREDIT_ADMIN_TOKEN and is off without it.
+# Under serve.py a reload is fanned out: the worker that takes the request reloads, publishes
+# the new routing to the other workers (see registry.ReloadBroadcast), and answers once they
+# have all applied it or CREDIT_RELOAD_WAIT_S (default 30) has passed; "workers" in the
+# response says how many run the new config.
+#
+# Production: `python -m server.serve` pre-forks one worker per core (see serve.py); /ready
+# answers 200 once every worker has loaded and warmed its model (model.warm_up() runs
+# synthetic safe/risky applicants with every loan type through each scoring path, so the
+# first real request doesn't pay for kernel selection, first allocations or the Captum
+# import). /health is 503 while no model is loaded.
+#
+# GET /metrics: request counts, per-stage latency histograms and band / risk distributions in
+# the Prometheus text format, kept in-process (see metrics.py).
+import asyncio
+import time
+import hmac
 import os
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Annotated, List, Optional
 import uvicorn
 import logging
 
 # Import the in-memory model pipeline
-from .model import predict_from_user_payload, load_pickle_bundle
+from . import metrics
+from .model import ART_DIR, INFERENCE_BACKEND, RESULT_CACHE, warmup_payloads
+from .microbatch import MicroBatcher
+from .registry import ModelRegistry
 
 logging.basicConfig(level=logging.INFO)
 app = FastAPI(title="Credit Scoring API", version="1.0")
@@ -22,19 +66,77 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+registry = ModelRegistry.from_env()
+ADMIN_TOKEN = os.environ.get("CREDIT_ADMIN_TOKEN", "")
+RELOAD_WAIT_S = float(os.environ.get("CREDIT_RELOAD_WAIT_S", 30))
+MODEL_LOADED = False
+STARTUP_TIMINGS = {}
+
 @app.on_event("startup")
 def startup_event():
     global MODEL_LOADED
     try:
-        logging.info("Loading pickle bundle...")
-        load_pickle_bundle()
+        logging.info("Loading model bundle (backend=%s)...", INFERENCE_BACKEND)
+        t = time.perf_counter()
+        if WORKER_RELOAD is not None:
+            # prefork worker: start from the latest /admin/reload any worker published
+            registry.reload_from_broadcast(WORKER_RELOAD, WORKER_INDEX)
+        else:
+            registry.reload()   # loads and warms up every live bundle
+        STARTUP_TIMINGS["load_and_warmup_ms"] = round((time.perf_counter() - t) * 1000.0, 2)
+        t = time.perf_counter()
+        for p in warmup_payloads():
+            ScoreRequest(**p).model_dump()   # first pydantic validation builds its validators
+        STARTUP_TIMINGS["request_validation_ms"] = round((time.perf_counter() - t) * 1000.0, 2)
         MODEL_LOADED = True
-        logging.info("✅ Model bundle loaded successfully.")
+        logging.info("✅ Model bundle loaded and warmed up (%s).", STARTUP_TIMINGS)
     except Exception as e:
         MODEL_LOADED = False
         logging.exception("❌ Failed to load model bundle on startup.")
         # Important: don't re-raise here, or uvicorn will crash.
         # Let the app start; /score can handle MODEL_LOADED = False.
+    registry.start_watching()
+    registry.start_following()
+
+MICROBATCH_ENABLED = os.environ.get("SCORE_MICROBATCH", "1").strip().lower() not in {"0", "false", "no"}
+batcher = None
+
+@app.on_event("startup")
+async def start_microbatcher():
+    global batcher
+    if MICROBATCH_ENABLED:
+        batcher = MicroBatcher(
+            registry.score_many, registry.score_one,
+            window_ms=float(os.environ.get("SCORE_BATCH_WINDOW_MS", 2)),
+            max_batch=int(os.environ.get("SCORE_BATCH_MAX", 64)),
+        )
+        await batcher.start()
+
+# Readiness. serve.py gives every prefork worker a slot in a shared array (WORKER_READY,
+# WORKER_INDEX), so any worker can answer /ready for the whole pool; under plain uvicorn it
+# reports this process alone. WORKER_RELOAD is the pool's registry.ReloadBroadcast.
+WORKER_READY = None
+WORKER_INDEX = 0
+WORKER_RELOAD = None
+READY = False
+
+def _set_ready(value: bool):
+    global READY
+    READY = value
+    if WORKER_READY is not None:
+        WORKER_READY[WORKER_INDEX] = int(value)
+
+@app.on_event("startup")
+def mark_ready():
+    # registered after the model load and the micro-batcher, so it runs last
+    _set_ready(MODEL_LOADED)
+
+@app.on_event("shutdown")
+async def stop_microbatcher():
+    _set_ready(False)
+    if batcher is not None:
+        await batcher.stop()
+    registry.stop()
 
 # ----- Schema expected from React form -----
 class ScoreRequest(BaseModel):
@@ -54,22 +156,140 @@ class ScoreRequest(BaseModel):
     spending_pattern_hint: Optional[str] = None
     status_hint: Optional[str] = None
 
+BATCH_LIMIT = int(os.environ.get("SCORE_BATCH_LIMIT", 1000))
+
+class ReloadRequest(BaseModel):
+    # omitted fields keep their current value; challenger_path "" or null drops the challenger
+    champion_path: Optional[str] = None
+    challenger_path: Optional[str] = None
+    challenger_weight: Optional[float] = Field(None, ge=0, le=1)
+    shadow: Optional[bool] = None
+
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    if not MODEL_LOADED:
+        return JSONResponse({"status": "model not loaded", "model_loaded": False}, status_code=503)
+    return {"status": "ok", "model_loaded": True}
+
+@app.get("/ready")
+def ready():
+    flags = list(WORKER_READY) if WORKER_READY is not None else [int(READY)]
+    body = {
+        "ready": all(flags), "workers": len(flags), "workers_ready": sum(flags),
+        # timings of the worker that answered
+        "startup_ms": STARTUP_TIMINGS, "warmup": registry.status()["warmup"],
+    }
+    return body if body["ready"] else JSONResponse(body, status_code=503)
+
+@app.get("/stats")
+def stats():
+    return {
+        "microbatch": batcher.stats() if batcher is not None else None,
+        "result_cache": RESULT_CACHE.stats(),
+        "models": registry.status(),
+    }
+
+@app.get("/metrics")
+def prometheus_metrics():
+    labels = {"worker": str(WORKER_INDEX)} if WORKER_READY is not None else None
+    return PlainTextResponse(metrics.render(labels), media_type="text/plain; version=0.0.4")
+
+metrics.register(metrics.Gauge("credit_model_loaded", "1 once a model bundle is loaded and warmed.",
+                               lambda: {(): int(MODEL_LOADED)}))
+metrics.register(metrics.Gauge("credit_result_cache_hits_total", "Result cache hits.",
+                               lambda: {(): RESULT_CACHE.hits}, kind="counter"))
+metrics.register(metrics.Gauge("credit_result_cache_misses_total", "Result cache misses.",
+                               lambda: {(): RESULT_CACHE.misses}, kind="counter"))
+metrics.register(metrics.Gauge("credit_result_cache_entries", "Results currently cached.",
+                               lambda: {(): RESULT_CACHE.stats()["size"]}))
+metrics.register(metrics.Gauge("credit_microbatch_queue_depth", "Requests waiting for a micro-batch.",
+                               lambda: {(): batcher.stats()["queue_depth"]} if batcher is not None else {}))
 
 @app.post("/score")
-def score(req: ScoreRequest):
-    try:
-        if not MODEL_LOADED:
-            raise RuntimeError("Model bundle not loaded")
+async def score(req: ScoreRequest):
+    with metrics.track_request("/score"):
+        try:
+            if not MODEL_LOADED:
+                raise RuntimeError("Model bundle not loaded")
+
+            payload = req.model_dump()
+            if batcher is not None:
+                result = await batcher.submit(payload)
+            else:
+                result = await run_in_threadpool(registry.score_one, payload)
+            return result
+        except Exception as e:
+            logging.exception("Error in /score")
+            raise HTTPException(status_code=400, detail=f"{type(e).__name__}: {e}")
+
+@app.post("/score/batch")
+def score_batch(reqs: Annotated[List[ScoreRequest], Field(max_length=BATCH_LIMIT)]):
+    """Score many applicants in one vectorized pass (e.g. nightly portfolio re-scoring)."""
+    with metrics.track_request("/score/batch"):
+        try:
+            if not MODEL_LOADED:
+                raise RuntimeError("Model bundle not loaded")
 
-        payload = req.model_dump()
-        result = predict_from_user_payload(payload)
-        return result
+            payloads = [r.model_dump() for r in reqs]
+            return registry.score_many(payloads)
+        except Exception as e:
+            logging.exception("Error in /score/batch")
+            raise HTTPException(status_code=400, detail=f"{type(e).__name__}: {e}")
+
+def _check_admin(token: Optional[str]):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (set CREDIT_ADMIN_TOKEN)")
+    if not token or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+def _model_file(path: Optional[str]) -> Optional[str]:
+    # Only files under the artifacts directory can be loaded over HTTP
+    if not path:
+        return None
+    full = os.path.realpath(path)
+    if os.path.commonpath([full, os.path.realpath(ART_DIR)]) != os.path.realpath(ART_DIR):
+        raise HTTPException(status_code=400, detail=f"{path} is outside {ART_DIR}/")
+    return path
+
+@app.get("/admin/models")
+def admin_models(x_admin_token: Optional[str] = Header(None)):
+    _check_admin(x_admin_token)
+    return registry.status()
+
+@app.post("/admin/reload")
+async def admin_reload(req: Optional[ReloadRequest] = None, x_admin_token: Optional[str] = Header(None)):
+    """Load the model files again (or new ones) and swap them in; requests keep flowing."""
+    global MODEL_LOADED
+    _check_admin(x_admin_token)
+    changes = req.model_dump(exclude_unset=True) if req is not None else {}
+    kwargs = {}
+    if "champion_path" in changes:
+        kwargs["champion_path"] = _model_file(changes["champion_path"])
+    if "challenger_path" in changes:
+        kwargs["challenger_path"] = _model_file(changes["challenger_path"])
+    if changes.get("challenger_weight") is not None:
+        kwargs["weight"] = changes["challenger_weight"]
+    if changes.get("shadow") is not None:
+        kwargs["shadow"] = changes["shadow"]
+    try:
+        status = await run_in_threadpool(registry.reload, **kwargs)
     except Exception as e:
-        logging.exception("Error in /score")
-        raise HTTPException(status_code=400, detail=f"{type(e).__name__}: {e}")
+        raise HTTPException(status_code=409, detail=f"Reload failed, still serving the previous models. "
+                                                    f"{type(e).__name__}: {e}")
+    MODEL_LOADED = True
+    _set_ready(True)
+    if WORKER_RELOAD is not None:
+        try:
+            gen = registry.publish_reload()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Reloaded worker {WORKER_INDEX} only; could not "
+                                                        f"publish to the other workers. {type(e).__name__}: {e}")
+        deadline = time.monotonic() + RELOAD_WAIT_S
+        while WORKER_RELOAD.applied(gen) < WORKER_RELOAD.workers and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        status["workers"] = {"generation": gen, "total": WORKER_RELOAD.workers,
+                             "applied": WORKER_RELOAD.applied(gen)}
+    return status
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,484 @@
+# bench.py
+# Reproducible benchmarks for the scoring and training pipelines, written as JSON so runs can
+# be diffed across commits. --compare exits 1 when a metric regressed beyond --tolerance.
+# Run from creditmodel/:
+#   python -m server.bench                                  # every suite -> artifacts/bench/<commit>-<time>.json
+#   python -m server.bench --suites latency,batch --out before.json
+#   python -m server.bench --out after.json --compare before.json --tolerance 0.15
+#
+# Suites:
+#   cold_start   fresh interpreters: import server.model / server.app, load the served model,
+#                score the first request (median of --cold-runs processes)
+#   load_bundle  model.load_pickle_bundle() and model.load_model_bundle() on artifacts/model.cma
+#   latency      single-request p50/p95/p99 through Scorer.score_one, and through the ASGI app
+#                (/score, micro-batcher included) when httpx is installed
+#   batch        rows/s through Scorer.score_many at each of --batch-sizes
+#   train_prep   model_train.prepare_training_data() on synthetic train.csv / test.csv files of
+#                --train-rows rows: CSV parse, then cold and warm Parquet dataset cache
+#
+# Scoring payloads come from synthetic_payloads(): every OCCUPATION_MAP key plus an unmapped
+# role, every LOAN_REGEX type alone and in mixes, on a sweep from safe to risky profiles so
+# every score band shows up (the bands actually hit are recorded under "payloads"). The result
+# cache is disabled and every bundle is warmed up first, so the numbers are steady-state
+# scoring cost. Everything is seeded by --seed.
+import argparse
+import asyncio
+import calendar
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from . import model as m
+
+try:
+    import httpx
+    HAVE_HTTPX = True
+except Exception:
+    HAVE_HTTPX = False
+
+SUITES = ("cold_start", "load_bundle", "latency", "batch", "train_prep")
+BENCH_DIR = os.path.join(m.ART_DIR, "bench")
+DEFAULT_BATCH_SIZES = (1, 8, 32, 64, 256, 1024)
+# Metrics --compare ignores: single worst samples are too noisy to gate a deploy on
+NOISY_KEYS = ("max_ms",)
+
+_MONTHS = list(calendar.month_name)[1:]
+_LOAN_MIXES = (
+    [[]]
+    + [[t] for t in m.LOAN_REGEX]
+    + [
+        ["Payday Loan", "Personal Loan"],
+        ["Mortgage Loan", "Auto Loan", "Student Loan"],
+        ["Debt Consolidation Loan", "Payday Loan", "Credit-Builder Loan"],
+        ["Home Equity Loan", "Mortgage Loan"],
+        ["payday", "car loan", "student"],   # free text, as the form can send it
+        ["Not Specified"],
+    ]
+)
+
+
+# ───────────────── SYNTHETIC DATA ─────────────────
+def synthetic_payloads(n: int, seed: int = 0):
+    """
+    n ScoreRequest-shaped payloads. Role and loan mix cycle so every combination comes up;
+    a risk knob in [0, 1) moves income, outflows and account counts from safe to risky.
+    """
+    rng = random.Random(seed)
+    roles = list(m.OCCUPATION_MAP) + ["astronaut"]
+    payloads = []
+    for i in range(n):
+        r = rng.random()
+        income = (12000.0 * (1 - r) + 600.0 * r) * rng.uniform(0.8, 1.2)
+        payloads.append({
+            "income_monthly": round(income, 2),
+            "housing_cost_monthly": round((600.0 + 1800.0 * r) * rng.uniform(0.8, 1.2), 2),
+            "other_expenses_monthly": round((100.0 + 900.0 * r) * rng.uniform(0.5, 1.5), 2),
+            "employment_role": roles[i % len(roles)],
+            "loans": list(_LOAN_MIXES[(i // len(roles)) % len(_LOAN_MIXES)]),
+            "age": rng.randint(18, 75),
+            "application_month": rng.choice(_MONTHS + [None]),
+            "num_credit_cards": min(10, int(r * 10) + rng.randint(0, 1)),
+            "num_bank_accounts": max(0, int(8 * (1 - r)) - rng.randint(0, 2)),
+            "num_loans": min(9, int(r * 9)),
+            "invested": round(max(0.0, 1500.0 * (1 - r) - 200.0) * rng.random(), 2),
+            "spending_pattern_hint": rng.choice([None, "High_spent_Small_value_payments"] if r > 0.6
+                                                else [None, "Low_spent_Small_value_payments"]),
+            "status_hint": "Bad" if r > 0.7 else ("Standard" if r > 0.35 else rng.choice([None, "Good"])),
+        })
+    return payloads
+
+
+def synthetic_training_frame(n_rows: int, seed: int = 0, labeled: bool = True) -> pd.DataFrame:
+    """train.csv-shaped frame (TRAIN_COLUMNS + Credit_Score) with the raw file's dirty values."""
+    rng = np.random.default_rng(seed)
+    occupations = [o for o in m.OCC_RISK if o != "_______"] + ["_______"]
+    loan_text = ["Not Specified", "Auto Loan", "Payday Loan, and Personal Loan",
+                 "Mortgage Loan, Student Loan, and Home Equity Loan", "Credit-Builder Loan",
+                 "Debt Consolidation Loan, and Payday Loan", "Auto Loan, and Mortgage Loan", ""]
+    behaviours = ["High_spent_Small_value_payments", "Low_spent_Large_value_payments",
+                  "High_spent_Medium_value_payments", "Low_spent_Small_value_payments", "!@9#%8"]
+
+    def dirty(values, rate=0.03):
+        # a few numeric cells carry the trailing "_" the raw CSV has ("4905.38_")
+        out = np.round(values, 2).astype(str).astype(object)
+        mask = rng.random(n_rows) < rate
+        out[mask] = np.char.add(out[mask].astype(str), "_")
+        return out
+
+    annual = rng.lognormal(10.5, 0.7, n_rows)
+    monthly = annual / 12.0
+    monthly_cell = np.round(monthly, 2).astype(object)
+    monthly_cell[rng.random(n_rows) < 0.15] = np.nan   # ~15% missing, like the real file
+    risk = rng.random(n_rows)
+    years, months = rng.integers(0, 33, n_rows), rng.integers(0, 12, n_rows)
+    history = np.char.add(np.char.add(years.astype(str), " Years and "), np.char.add(months.astype(str), " Months")).astype(object)
+    history[rng.random(n_rows) < 0.09] = np.nan
+
+    df = pd.DataFrame({
+        "ID": [f"0x{i:x}" for i in range(n_rows)],
+        "Customer_ID": [f"CUS_0x{i // 8:x}" for i in range(n_rows)],
+        "Month": rng.choice(_MONTHS[:8], n_rows),
+        "Name": "Synthetic",
+        "Age": dirty(rng.integers(18, 70, n_rows)),
+        "SSN": "000-00-0000",
+        "Occupation": rng.choice(occupations, n_rows),
+        "Annual_Income": dirty(annual),
+        "Monthly_Inhand_Salary": monthly_cell,
+        "Num_Bank_Accounts": rng.integers(0, 11, n_rows),
+        "Num_Credit_Card": rng.integers(0, 11, n_rows),
+        "Interest_Rate": rng.integers(1, 34, n_rows),
+        "Num_of_Loan": dirty(rng.integers(0, 9, n_rows)),
+        "Type_of_Loan": rng.choice(loan_text, n_rows),
+        "Delay_from_due_date": rng.integers(-5, 60, n_rows),
+        "Num_of_Delayed_Payment": dirty(rng.integers(0, 25, n_rows)),
+        "Changed_Credit_Limit": np.round(rng.normal(10, 6, n_rows), 2),
+        "Num_Credit_Inquiries": rng.integers(0, 17, n_rows),
+        "Credit_Mix": rng.choice(["Good", "Standard", "Bad", "_"], n_rows),
+        "Outstanding_Debt": dirty(rng.uniform(0, 5000, n_rows) * (0.3 + risk)),
+        "Credit_Utilization_Ratio": np.round(rng.uniform(20, 50, n_rows), 4),
+        "Credit_History_Age": history,
+        "Payment_of_Min_Amount": rng.choice(["Yes", "No", "NM"], n_rows),
+        "Total_EMI_per_month": np.round(monthly * 0.6 * risk * rng.random(n_rows), 4),
+        "Amount_invested_monthly": dirty(monthly * 0.2 * rng.random(n_rows)),
+        "Payment_Behaviour": rng.choice(behaviours, n_rows),
+        "Monthly_Balance": np.round(monthly * (1 - risk) * 0.5, 4),
+    }, columns=m.TRAIN_COLUMNS)
+    if labeled:
+        df[m.TARGET_COL] = np.where(risk > 0.66, "Poor", np.where(risk > 0.33, "Standard", "Good"))
+    return df
+
+
+# ───────────────── HELPERS ─────────────────
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000.0, 3)
+
+
+def latency_summary(samples_s) -> dict:
+    a = np.asarray(samples_s, dtype=np.float64) * 1000.0
+    p50, p95, p99 = np.percentile(a, [50, 95, 99])
+    return {"n": int(a.size), "p50_ms": round(p50, 3), "p95_ms": round(p95, 3), "p99_ms": round(p99, 3),
+            "mean_ms": round(a.mean(), 3), "max_ms": round(a.max(), 3)}
+
+
+def _git_commit() -> dict:
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             timeout=10).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, timeout=30).stdout.strip())
+        return {"commit": sha or None, "dirty": dirty}
+    except Exception:
+        return {"commit": None, "dirty": None}
+
+
+def environment() -> dict:
+    from .serve import available_cores
+    env = {
+        **_git_commit(),
+        "utc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cores": available_cores(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "backend": m.INFERENCE_BACKEND,
+        "explain_mode": m.EXPLAIN_MODE,
+    }
+    if m.torch is not None:
+        env["torch"] = m.torch.__version__
+        env["torch_threads"] = m.torch.get_num_threads()
+    return env
+
+
+def _scorer() -> "m.Scorer":
+    m.RESULT_CACHE.maxsize = 0   # every request is really scored
+    scorer = m.get_scorer()
+    m.warm_up(scorer.bundle)
+    return scorer
+
+
+# ───────────────── SUITES ─────────────────
+_COLD_SNIPPET = """
+import json, sys, time
+t0 = time.perf_counter()
+from server import {module}
+t1 = time.perf_counter()
+out = {{"import_{module}_ms": (t1 - t0) * 1000.0}}
+if {score}:
+    from server import model as m
+    m.RESULT_CACHE.maxsize = 0
+    scorer = m.get_scorer()
+    t2 = time.perf_counter()
+    scorer.score_one(json.loads(sys.argv[1]))
+    t3 = time.perf_counter()
+    out.update(load_model_ms=(t2 - t1) * 1000.0, first_score_ms=(t3 - t2) * 1000.0)
+print(json.dumps(out))
+"""
+
+
+def bench_cold_start(payload: dict, runs: int = 3) -> dict:
+    """Each sample is a new interpreter, so nothing is cached in-process (the OS page cache is)."""
+    samples = {}
+    for module, score in (("model", True), ("app", False)):
+        code = _COLD_SNIPPET.format(module=module, score=score)
+        for _ in range(runs):
+            t = time.perf_counter()
+            proc = subprocess.run([sys.executable, "-c", code, json.dumps(payload)],
+                                  capture_output=True, text=True, cwd=os.getcwd())
+            wall = time.perf_counter() - t
+            if proc.returncode != 0:
+                raise RuntimeError(f"cold start ({module}) failed: {proc.stderr.strip()[-500:]}")
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            result[f"process_{module}_ms"] = wall * 1000.0
+            for k, v in result.items():
+                samples.setdefault(k, []).append(v)
+    return {"runs": runs, **{k: round(float(np.median(v)), 3) for k, v in samples.items()}}
+
+
+def bench_load_bundle(repeats: int = 5) -> dict:
+    out = {"repeats": repeats}
+    for name, path, load in (
+        ("pickle", m.BUNDLE_PATH, lambda: m.load_pickle_bundle(path=m.BUNDLE_PATH)),
+        ("artifact", m.ARTIFACT_PATH, lambda: m.load_model_bundle(m.ARTIFACT_PATH)),
+    ):
+        if not os.path.exists(path):
+            out[f"{name}_skipped"] = f"{path} not found"
+            continue
+        load()   # untimed: the first pickle load also imports sklearn (cold_start covers imports)
+        times = []
+        for _ in range(repeats):
+            t = time.perf_counter()
+            load()
+            times.append(time.perf_counter() - t)
+        out[f"{name}_ms"] = _ms(float(np.median(times)))
+        out[f"{name}_min_ms"] = _ms(min(times))
+    m.use_bundle(m.load_model_bundle())   # leave the served model loaded for the other suites
+    return out
+
+
+def _api_latency(payloads) -> dict:
+    from . import app as app_module
+    logging.getLogger("httpx").setLevel(logging.WARNING)   # one INFO line per request otherwise
+
+    async def run():
+        async with app_module.app.router.lifespan_context(app_module.app):
+            transport = httpx.ASGITransport(app=app_module.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                times = []
+                for p in payloads:
+                    t = time.perf_counter()
+                    r = await client.post("/score", json=p)
+                    times.append(time.perf_counter() - t)
+                    r.raise_for_status()
+                return times
+
+    m.RESULT_CACHE.maxsize = 0
+    summary = latency_summary(asyncio.run(run()))
+    summary["microbatch"] = app_module.MICROBATCH_ENABLED
+    return summary
+
+
+def bench_latency(payloads, requests: int = 2000, api_requests: int = 500) -> dict:
+    scorer = _scorer()
+    times = []
+    for i in range(requests):
+        p = payloads[i % len(payloads)]
+        t = time.perf_counter()
+        scorer.score_one(p)
+        times.append(time.perf_counter() - t)
+    out = {"scorer": latency_summary(times)}
+    if HAVE_HTTPX and api_requests > 0:
+        out["api"] = _api_latency([payloads[i % len(payloads)] for i in range(api_requests)])
+    return out
+
+
+def bench_batch(payloads, batch_sizes=DEFAULT_BATCH_SIZES, min_time_s: float = 1.0) -> dict:
+    scorer = _scorer()
+    out = {}
+    for bs in batch_sizes:
+        times, start = [], 0
+        t_end = time.perf_counter() + min_time_s
+        while len(times) < 3 or time.perf_counter() < t_end:
+            batch = [payloads[(start + k) % len(payloads)] for k in range(bs)]
+            start += bs
+            t = time.perf_counter()
+            scorer.score_many(batch)
+            times.append(time.perf_counter() - t)
+        out[f"bs_{bs}"] = {
+            "batches": len(times),
+            "rows_per_s": round(bs * len(times) / sum(times), 1),
+            "batch_p50_ms": _ms(float(np.median(times))),
+            "row_mean_ms": _ms(sum(times) / (bs * len(times))),
+        }
+    return out
+
+
+def bench_train_prep(n_rows: int = 20000, seed: int = 0) -> dict:
+    from . import model_train as mt
+
+    with tempfile.TemporaryDirectory(prefix="credit-bench-") as tmp:
+        train_csv, test_csv = os.path.join(tmp, "train.csv"), os.path.join(tmp, "test.csv")
+        t = time.perf_counter()
+        synthetic_training_frame(n_rows, seed).to_csv(train_csv, index=False)
+        synthetic_training_frame(max(1, n_rows // 5), seed + 1, labeled=False).to_csv(test_csv, index=False)
+        out = {"rows": n_rows, "generate_ms": _ms(time.perf_counter() - t),
+               "csv_mb": round(os.path.getsize(train_csv) / 2 ** 20, 2)}
+
+        saved = mt.DATA_CACHE_ENABLED, mt.DATA_CACHE_DIR
+        try:
+            mt.DATA_CACHE_ENABLED = False
+            t = time.perf_counter()
+            data = mt.prepare_training_data(train_csv, test_csv)
+            elapsed = time.perf_counter() - t
+            out.update(features=int(data["X_train"].shape[1]), csv_ms=_ms(elapsed),
+                       rows_per_s=round(n_rows / elapsed, 1))
+
+            if getattr(mt, "HAVE_ARROW", False):
+                mt.DATA_CACHE_ENABLED, mt.DATA_CACHE_DIR = True, os.path.join(tmp, "cache")
+                for key in ("parquet_cold_ms", "parquet_warm_ms"):   # first run writes the cache
+                    t = time.perf_counter()
+                    mt.prepare_training_data(train_csv, test_csv)
+                    out[key] = _ms(time.perf_counter() - t)
+        finally:
+            mt.DATA_CACHE_ENABLED, mt.DATA_CACHE_DIR = saved
+    return out
+
+
+# ───────────────── RUN / COMPARE ─────────────────
+def run_benchmarks(suites=SUITES, seed: int = 0, n_payloads: int = 1024, requests: int = 2000,
+                   api_requests: int = 500, batch_sizes=DEFAULT_BATCH_SIZES, train_rows: int = 20000,
+                   cold_runs: int = 3, load_repeats: int = 5) -> dict:
+    payloads = synthetic_payloads(max(n_payloads, max(batch_sizes)), seed)
+    report = {"env": environment(), "config": {
+        "suites": list(suites), "seed": seed, "payloads": len(payloads), "requests": requests,
+        "api_requests": api_requests, "batch_sizes": list(batch_sizes), "train_rows": train_rows,
+        "cold_runs": cold_runs, "load_repeats": load_repeats,
+    }, "results": {}}
+
+    runners = {
+        "cold_start": lambda: bench_cold_start(payloads[0], cold_runs),
+        "load_bundle": lambda: bench_load_bundle(load_repeats),
+        "latency": lambda: bench_latency(payloads, requests, api_requests),
+        "batch": lambda: bench_batch(payloads, batch_sizes),
+        "train_prep": lambda: bench_train_prep(train_rows, seed),
+    }
+    for name in suites:
+        print(f"🔧 {name}...", flush=True)
+        t = time.perf_counter()
+        report["results"][name] = runners[name]()
+        print(f"  {json.dumps(report['results'][name])}  ({time.perf_counter() - t:.1f}s)", flush=True)
+
+    if any(s in suites for s in ("latency", "batch")):
+        results = m.get_scorer().score_many(payloads)
+        report["payloads"] = {
+            "count": len(payloads),
+            "roles": len({p["employment_role"] for p in payloads}),
+            "loan_mixes": len({tuple(p["loans"]) for p in payloads}),
+            "bands": dict(Counter(r["band"] for r in results)),
+        }
+    return report
+
+
+def _flatten(d: dict, prefix: str = "") -> dict:
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            out.update(_flatten(v, key + "."))
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            out[key] = float(v)
+    return out
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.10):
+    """
+    Changes of every timing (*_ms: lower is better) and throughput (*_per_s: higher is better)
+    present in both reports. Returns (rows, regressions); a regression is worse by > tolerance.
+    """
+    cur, base = _flatten(current["results"]), _flatten(baseline["results"])
+    rows, regressions = [], []
+    for key in sorted(cur.keys() & base.keys()):
+        if key.endswith(NOISY_KEYS) or not base[key]:
+            continue
+        if key.endswith("_ms"):
+            change = (cur[key] - base[key]) / base[key]
+        elif key.endswith("_per_s"):
+            change = (base[key] - cur[key]) / base[key]
+        else:
+            continue
+        row = {"metric": key, "baseline": base[key], "current": cur[key], "worse_by": round(change, 4)}
+        rows.append(row)
+        if change > tolerance:
+            regressions.append(row)
+    return rows, regressions
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmarks for the credit scoring and training pipelines")
+    ap.add_argument("--suites", default=",".join(SUITES), help=f"comma-separated subset of {','.join(SUITES)}")
+    ap.add_argument("--out", help="JSON report path ('-' for stdout; default artifacts/bench/<commit>-<time>.json)")
+    ap.add_argument("--compare", help="baseline JSON report; exit 1 if any metric regressed beyond --tolerance")
+    ap.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown (default 0.10)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--payloads", type=int, default=1024, help="distinct synthetic payloads")
+    ap.add_argument("--requests", type=int, default=2000, help="single requests for the latency suite")
+    ap.add_argument("--api-requests", type=int, default=500, help="/score requests through the app (0 = skip)")
+    ap.add_argument("--batch-sizes", default=",".join(map(str, DEFAULT_BATCH_SIZES)))
+    ap.add_argument("--train-rows", type=int, default=20000, help="rows of synthetic train.csv")
+    ap.add_argument("--cold-runs", type=int, default=3, help="fresh processes per cold-start sample")
+    ap.add_argument("--load-repeats", type=int, default=5)
+    args = ap.parse_args()
+
+    json_out = sys.stdout
+    if args.out == "-":
+        sys.stdout = sys.stderr   # progress and the comparison table; stdout carries only the JSON
+
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        ap.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+    report = run_benchmarks(
+        suites, seed=args.seed, n_payloads=args.payloads, requests=args.requests,
+        api_requests=args.api_requests, batch_sizes=[int(b) for b in args.batch_sizes.split(",")],
+        train_rows=args.train_rows, cold_runs=args.cold_runs, load_repeats=args.load_repeats,
+    )
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows, regressions = compare(report, baseline, args.tolerance)
+        report["comparison"] = {"baseline": baseline.get("env", {}).get("commit"),
+                                "tolerance": args.tolerance, "metrics": rows, "regressions": regressions}
+
+    if args.out == "-":
+        json.dump(report, json_out, indent=2)
+        json_out.write("\n")
+        json_out.flush()
+    else:
+        out = args.out or os.path.join(
+            BENCH_DIR, f"{report['env']['commit'] or 'nogit'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        with open(out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✔ Benchmark report -> {out}")
+
+    if args.compare:
+        print(f"  {'metric':<42} {'baseline':>12}    {'current':>12}  change (+ = worse)")
+        for r in report["comparison"]["metrics"]:
+            flag = "✖" if r in regressions else " "
+            print(f"  {flag} {r['metric']:<40} {r['baseline']:>12.3f} -> {r['current']:>12.3f}  "
+                  f"{r['worse_by']:+.1%}")
+        if regressions:
+            print(f"✖ {len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+        print("✔ No regressions")
@@ -0,0 +1,12 @@
+# export_artifact.py
+# Export artifacts/model_bundle.pkl (the training output) to the versioned serving artifact
+# artifacts/model.cma (see model.py "VERSIONED MODEL ARTIFACT").
+# Run from creditmodel/ after (re)training:  python -m server.export_artifact [model_version]
+# (model_version defaults to $CREDIT_MODEL_VERSION, else the export time; results are tagged with it)
+import sys
+
+from .model import load_pickle_bundle, export_artifact
+
+if __name__ == "__main__":
+    load_pickle_bundle()
+    export_artifact(version=sys.argv[1] if len(sys.argv) > 1 else None)
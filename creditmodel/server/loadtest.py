@@ -0,0 +1,588 @@
+# loadtest.py
+# Load generator for the scoring API: drives /score at a target rate or concurrency and reports
+# achieved throughput, latency percentiles, error rate and CPU per request as JSON, so pod sizes
+# and concurrency settings (workers, threads, micro-batching) can be checked against real
+# traffic shapes before they ship. Run from creditmodel/:
+#   python -m server.loadtest                                      # in-process app, 8 clients, 20 s
+#   python -m server.loadtest --qps 150 --duration 60              # open loop, Poisson arrivals
+#   python -m server.loadtest --spawn --workers 2 --threads 1 --env SCORE_BATCH_WINDOW_MS=5 --qps 300
+#   python -m server.loadtest --url http://localhost:8080 --server-pid 4242 --concurrency 32
+#   python -m server.loadtest --gateway --gateway-db-ms 8 --qps 100
+#   python -m server.loadtest --replay captured.jsonl --speed 2
+#
+# Targets:
+#   (default)    the FastAPI app in this process over httpx's ASGI transport, lifespan included
+#   --url        a running server (uvicorn, python -m server.serve, a pod behind a port-forward)
+#   --spawn      starts python -m server.serve on --port with --workers/--threads/--env, waits
+#                for /ready, and stops it afterwards
+#   --gateway    puts a stand-in for server/server.js in front of the target: POST
+#                /api/calculate-score takes {userId, ...financialData}, drops userId, scores via
+#                /score, waits --gateway-db-ms for the MongoDB save, and answers
+#                500 {"error": "AI Model Failed"} when scoring fails (--gateway-timeout-s, like
+#                SCORE_TIMEOUT_MS)
+#
+# Load:
+#   closed loop  --concurrency clients, each sending its next request when the last one returns
+#   open loop    --qps arrivals (Poisson, or --arrival uniform) whether or not earlier requests
+#                came back; latency counts from the scheduled send time, so a slow server shows
+#                up as latency instead of a lower offered rate. Beyond --max-inflight outstanding
+#                requests new arrivals are dropped and counted.
+#   --mix        request kinds by weight (default score=0.85,repeat=0.1,batch=0.04,invalid=0.01):
+#                  score    a fresh synthetic applicant (bench.synthetic_payloads) or one from
+#                           --payloads FILE
+#                  repeat   an applicant sent earlier in the run (a form resubmitted: cache hit)
+#                  batch    /score/batch with --batch-size applicants (direct, never via gateway)
+#                  invalid  a body that fails validation (422; 500 through the gateway)
+#   --replay     a captured JSON-lines file, sent in file order. A line is a bare payload, the
+#                gateway worker protocol {"id", "payload"}, a gateway body with userId, or
+#                {"path", "body", "t"|"ts"}; a list body goes to /score/batch. With "t" (seconds
+#                from the start) or "ts" (epoch seconds or ISO-8601) the recorded arrival times
+#                are replayed, compressed by --speed, unless --qps or --concurrency is given.
+#
+# CPU per request is the server's CPU time (user + system, from /proc for --spawn or
+# --server-pid, all worker processes included) over the requests completed in the measured
+# window. In-process, client and app share one process and are reported together. Requests
+# scheduled during the first --warmup-s seconds are sent but not counted.
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from . import bench
+
+try:
+    import httpx
+    HAVE_HTTPX = True
+except Exception:
+    HAVE_HTTPX = False
+
+KINDS = ("score", "repeat", "batch", "invalid")
+DEFAULT_MIX = "score=0.85,repeat=0.1,batch=0.04,invalid=0.01"
+LOADTEST_DIR = os.path.join(bench.m.ART_DIR, "loadtest")
+READY_TIMEOUT_S = 120.0
+
+
+# ───────────────── REQUEST SOURCES ─────────────────
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        kind, _, weight = part.partition("=")
+        if kind not in KINDS:
+            raise ValueError(f"unknown request kind {kind!r} (expected one of {', '.join(KINDS)})")
+        mix[kind] = float(weight)
+    if not mix or sum(mix.values()) <= 0 or min(mix.values()) < 0:
+        raise ValueError(f"mix needs non-negative weights with a positive total: {spec!r}")
+    return mix
+
+
+def _read_json_lines(path: str):
+    with open(path) as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)   # a plain JSON array works too
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _offset_s(entry: dict):
+    if "t" in entry:
+        return float(entry["t"])
+    ts = entry.get("ts")
+    if ts is None:
+        return None
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    return datetime.datetime.fromisoformat(str(ts).replace("Z", "+00:00")).timestamp()
+
+
+def load_capture(path: str):
+    """
+    Captured requests as (kind, path, body, offset_s) in file order; offsets are relative to
+    the first timestamped line, or None when the capture carries no times.
+    """
+    out, clocks = [], set()
+    for entry in _read_json_lines(path):
+        if isinstance(entry, dict):
+            clocks.update(k for k in ("t", "ts") if k in entry)
+            if len(clocks) > 1:
+                raise ValueError(f"{path}: mixes relative 't' and absolute 'ts' times")
+        if isinstance(entry, dict) and isinstance(entry.get("payload"), (dict, list)):
+            body, route = entry["payload"], entry.get("path")
+        elif isinstance(entry, dict) and "body" in entry:
+            body, route = entry["body"], entry.get("path")
+        else:
+            body, route = entry, None
+        if isinstance(body, dict):
+            body = {k: v for k, v in body.items() if k != "userId"}   # gateway capture
+        route = route or ("/score/batch" if isinstance(body, list) else "/score")
+        kind = "batch" if route.endswith("/batch") else "score"
+        out.append((kind, route, body, _offset_s(entry) if isinstance(entry, dict) else None))
+    times = [t for *_, t in out if t is not None]
+    if len(times) != len(out):
+        return [(k, r, b, None) for k, r, b, _ in out]
+    t0 = min(times, default=0.0)
+    return [(k, r, b, t - t0) for k, r, b, t in out]
+
+
+class MixSource:
+    """Picks request kinds by weight; bodies come from a payload pool, cycled."""
+
+    timed = False
+
+    def __init__(self, mix: dict, pool, batch_size: int = 16, seed: int = 0):
+        self.kinds, self.weights = zip(*mix.items())
+        self.pool, self.batch_size = pool, batch_size
+        self.rng = random.Random(seed)
+        self._next, self._sent = 0, []
+
+    def _fresh(self) -> dict:
+        lap, i = divmod(self._next, len(self.pool))
+        payload = self.pool[i]
+        if lap:   # past the end of the pool: nudge income so it stays a new applicant (no cache hit)
+            payload = dict(payload, income_monthly=round(float(payload["income_monthly"]) + 0.01 * lap, 2))
+        self._next += 1
+        self._sent.append(payload)
+        return payload
+
+    def next(self):
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        if kind == "repeat" and not self._sent:
+            kind = "score"
+        if kind == "score":
+            return kind, "/score", self._fresh(), None
+        if kind == "repeat":
+            return kind, "/score", self.rng.choice(self._sent), None
+        if kind == "batch":
+            return kind, "/score/batch", [self._fresh() for _ in range(self.batch_size)], None
+        bad = dict(self.pool[self.rng.randrange(len(self.pool))], income_monthly=-1.0)
+        return kind, "/score", bad, None
+
+
+class ReplaySource:
+    """Captured requests in order, --loops times; returns None when exhausted."""
+
+    def __init__(self, entries, loops: int = 1, speed: float = 1.0):
+        self.entries, self.loops, self.speed = entries, max(1, loops), speed
+        self.timed = all(e[3] is not None for e in entries)
+        self.span = (max(e[3] for e in entries) if self.timed else 0.0) + 1e-3
+        self._i = 0
+
+    def next(self):
+        if self._i >= len(self.entries) * self.loops:
+            return None
+        lap, j = divmod(self._i, len(self.entries))
+        self._i += 1
+        kind, route, body, t = self.entries[j]
+        return kind, route, body, ((lap * self.span + t) / self.speed if self.timed else None)
+
+
+# ───────────────── TARGETS ─────────────────
+def stand_in_gateway(scoring: "httpx.AsyncClient", db_ms: float = 5.0, timeout_s: float = 30.0):
+    """A FastAPI stand-in for server/server.js POST /api/calculate-score."""
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+
+    gw = FastAPI(title="Stand-in gateway")
+
+    @gw.post("/api/calculate-score")
+    async def calculate_score(request: Request):
+        body = await request.json()
+        body.pop("userId", None)
+        try:
+            r = await scoring.post("/score", json=body, timeout=timeout_s)
+            r.raise_for_status()
+            result = r.json()
+        except Exception as e:
+            return JSONResponse({"error": "AI Model Failed", "details": str(e)[:200]}, status_code=500)
+        if db_ms > 0:
+            await asyncio.sleep(db_ms / 1000.0)   # CreditScore.save()
+        return result
+
+    return gw
+
+
+def _proc_table():
+    """{pid: (ppid, cpu ticks)} from /proc; empty where /proc is not available."""
+    table = {}
+    try:
+        pids = [int(d) for d in os.listdir("/proc") if d.isdigit()]
+    except OSError:
+        return table
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        fields = stat[stat.rindex(")") + 2:].split()   # after "pid (comm) "
+        table[pid] = (int(fields[1]), int(fields[11]) + int(fields[12]))   # ppid, utime + stime
+    return table
+
+
+def process_tree_cpu_s(root_pid: int):
+    """User + system CPU seconds of a process and all its descendants (None if not found)."""
+    table = _proc_table()
+    if root_pid not in table:
+        return None
+    children = {}
+    for pid, (ppid, _) in table.items():
+        children.setdefault(ppid, []).append(pid)
+    ticks, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        ticks += table[pid][1]
+        stack.extend(children.get(pid, []))
+    return ticks / os.sysconf("SC_CLK_TCK")
+
+
+def spawn_server(port: int, workers: int, threads: int, env_overrides: dict) -> subprocess.Popen:
+    env = {**os.environ, **env_overrides}
+    cmd = [sys.executable, "-m", "server.serve", "--host", "127.0.0.1", "--port", str(port),
+           "--workers", str(workers), "--threads", str(threads), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, env=env, cwd=os.getcwd(), stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + READY_TIMEOUT_S
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode} before it was ready")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/ready", timeout=2.0).status_code == 200:
+                return proc
+        except httpx.TransportError:
+            pass
+        time.sleep(0.25)
+    stop_server(proc)
+    raise RuntimeError(f"server on port {port} not ready after {READY_TIMEOUT_S:.0f}s")
+
+
+def stop_server(proc: subprocess.Popen):
+    if proc.poll() is None:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=40)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+# ───────────────── DRIVER ─────────────────
+class Recorder:
+    def __init__(self):
+        self.records = []   # (kind, status, scheduled, sent, done)
+        self.dropped = 0
+
+    async def send(self, client, route, kind, body, scheduled):
+        sent = time.perf_counter()
+        try:
+            status = (await client.post(route, json=body)).status_code
+        except Exception as e:
+            status = f"exception:{type(e).__name__}"
+        self.records.append((kind, status, scheduled, sent, time.perf_counter()))
+
+
+async def closed_loop(recorder, route_for, source, concurrency: int, duration_s: float,
+                      max_requests: int = 0):
+    t_end = time.perf_counter() + duration_s
+    issued = 0
+
+    async def client_loop():
+        nonlocal issued
+        while time.perf_counter() < t_end and not (max_requests and issued >= max_requests):
+            req = source.next()
+            if req is None:
+                return
+            issued += 1
+            kind, route, body, _ = req
+            client, route = route_for(route)
+            await recorder.send(client, route, kind, body, time.perf_counter())
+
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+
+
+async def open_loop(recorder, route_for, source, qps: float, duration_s: float,
+                    max_inflight: int, arrival: str = "poisson", seed: int = 0):
+    rng = random.Random(seed)
+    tasks = set()
+    t0 = next_t = time.perf_counter()
+    while True:
+        req = source.next()
+        if req is None:
+            break
+        kind, route, body, offset = req
+        if source.timed and not qps:
+            next_t = t0 + offset
+        else:
+            next_t += rng.expovariate(qps) if arrival == "poisson" else 1.0 / qps
+        if next_t - t0 > duration_s:
+            break
+        delay = next_t - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(tasks) >= max_inflight:
+            recorder.dropped += 1
+            continue
+        client, route = route_for(route)
+        task = asyncio.ensure_future(recorder.send(client, route, kind, body, next_t))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+def summarize(recorder: Recorder, t_start: float, t_end: float, open_loop_mode: bool) -> dict:
+    recs = [r for r in recorder.records if r[2] >= t_start]
+    window = max(1e-9, max((r[4] for r in recs), default=t_end) - t_start)
+    ok = [r for r in recs if r[1] == 200]
+    out = {
+        "requests": len(recs),
+        "window_s": round(window, 3),
+        "throughput_rps": round(len(recs) / window, 2),
+        "ok_rps": round(len(ok) / window, 2),
+        "errors": {
+            "rate": round(1 - len(ok) / len(recs), 4) if recs else None,
+            "by_status": {str(k): v for k, v in sorted(Counter(r[1] for r in recs).items(), key=str)},
+        },
+        "dropped": recorder.dropped,
+    }
+    if recs:
+        out["latency"] = bench.latency_summary([r[4] - r[2] for r in recs])
+        if open_loop_mode:   # time in the server (and the client's connection pool) only
+            out["service"] = bench.latency_summary([r[4] - r[3] for r in recs])
+        out["by_kind"] = {}
+        for kind in sorted({r[0] for r in recs}):
+            rs = [r for r in recs if r[0] == kind]
+            out["by_kind"][kind] = {**bench.latency_summary([r[4] - r[2] for r in rs]),
+                                    "errors": sum(r[1] != 200 for r in rs)}
+    return out
+
+
+async def _run(args, source) -> dict:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=max(args.concurrency, args.max_inflight),
+                          max_keepalive_connections=max(args.concurrency, args.max_inflight))
+    timeout = httpx.Timeout(args.timeout_s)
+    cpu_pid = args.server_pid
+
+    async def drive(target_client):
+        gateway_client = None
+        if args.gateway:
+            gw = stand_in_gateway(target_client, args.gateway_db_ms, args.gateway_timeout_s)
+            gateway_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=gw),
+                                               base_url="http://gateway", timeout=timeout)
+
+        gateway_route = _GatewayRoute(gateway_client) if gateway_client is not None else None
+
+        def route_for(route):
+            if gateway_route is not None and route == "/score":
+                return gateway_route, "/api/calculate-score"
+            return target_client, route
+
+        # CPU counters at the start of the measured window (taken again once the warm-up is over)
+        cpu = {"server0": process_tree_cpu_s(cpu_pid) if cpu_pid else None,
+               "process0": time.process_time(), "warm": False}
+
+        async def mark_window_start():
+            await asyncio.sleep(args.warmup_s)
+            cpu.update(server0=process_tree_cpu_s(cpu_pid) if cpu_pid else None,
+                       process0=time.process_time(), warm=True)
+
+        t0 = time.perf_counter()
+        marker = asyncio.ensure_future(mark_window_start())
+        total_s = args.warmup_s + args.duration
+        if args.qps or (source.timed and not args.concurrency_given):
+            await open_loop(recorder, route_for, source, args.qps, total_s, args.max_inflight,
+                            args.arrival, args.seed)
+            mode = "open"
+        else:
+            await closed_loop(recorder, route_for, source, args.concurrency, total_s, args.requests)
+            mode = "closed"
+        if not marker.done():   # finished inside the warm-up: measure the whole run
+            marker.cancel()
+        t_end = time.perf_counter()
+        process_s = time.process_time()
+        server_s = process_tree_cpu_s(cpu_pid) if cpu_pid else None
+        if gateway_client is not None:
+            await gateway_client.aclose()
+
+        results = summarize(recorder, t0 + args.warmup_s if cpu["warm"] else t0, t_end, mode == "open")
+        n = max(1, results["requests"])
+        cpu_out = {"process_s": round(process_s - cpu["process0"], 3)}
+        cpu_out["process_ms_per_request"] = round(1000.0 * cpu_out["process_s"] / n, 3)
+        if server_s is not None and cpu["server0"] is not None:
+            cpu_out["server_s"] = round(server_s - cpu["server0"], 3)
+            cpu_out["server_ms_per_request"] = round(1000.0 * cpu_out["server_s"] / n, 3)
+            cpu_out["server_cores_busy"] = round(cpu_out["server_s"] / results["window_s"], 3)
+        if not args.url and not args.spawn:
+            cpu_out["note"] = "in-process: process_* covers the load generator and the app together"
+        results["cpu"] = cpu_out
+        results["mode"] = mode
+        return results
+
+    if args.url or args.spawn:
+        base = args.url or f"http://127.0.0.1:{args.port}"
+        async with httpx.AsyncClient(base_url=base, limits=limits, timeout=timeout) as client:
+            return await drive(client)
+
+    from . import app as app_module
+    async with app_module.app.router.lifespan_context(app_module.app):
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=timeout) as client:
+            return await drive(client)
+
+
+class _GatewayRoute:
+    """Client wrapper that adds a userId to each body, as the frontend does."""
+
+    def __init__(self, client):
+        self.client, self._n = client, 0
+
+    async def post(self, route, json):
+        self._n += 1
+        return await self.client.post(route, json={"userId": f"user-{self._n}", **json})
+
+
+def run_loadtest(args) -> dict:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if args.replay:
+        entries = load_capture(args.replay)
+        if not entries:
+            raise ValueError(f"{args.replay} holds no requests")
+        source = ReplaySource(entries, args.loops, args.speed)
+    else:
+        pool = (_read_json_lines(args.payloads) if args.payloads
+                else bench.synthetic_payloads(args.pool, args.seed))
+        pool = [p.get("payload", p) if isinstance(p, dict) else p for p in pool]
+        source = MixSource(parse_mix(args.mix), pool, args.batch_size, args.seed)
+
+    proc = None
+    if args.spawn:
+        print(f"🔧 Starting server.serve on :{args.port} ({args.workers} workers x {args.threads} threads)...",
+              flush=True)
+        proc = spawn_server(args.port, args.workers, args.threads, args.env)
+        args.server_pid = proc.pid
+    try:
+        results = asyncio.run(_run(args, source))
+    finally:
+        if proc is not None:
+            stop_server(proc)
+
+    target = ({"kind": "url", "url": args.url} if args.url else
+              {"kind": "spawn", "port": args.port, "workers": args.workers, "threads": args.threads,
+               "env": args.env} if args.spawn else {"kind": "asgi"})
+    if args.gateway:
+        target["gateway"] = {"db_ms": args.gateway_db_ms, "timeout_s": args.gateway_timeout_s}
+    return {"env": bench.environment(), "target": target, "config": {
+        "mode": results.pop("mode"), "qps": args.qps, "arrival": args.arrival if args.qps else None,
+        "concurrency": args.concurrency,
+        "duration_s": None if args.duration == float("inf") else args.duration, "warmup_s": args.warmup_s,
+        "max_inflight": args.max_inflight, "mix": None if args.replay else parse_mix(args.mix),
+        "batch_size": args.batch_size, "replay": args.replay, "speed": args.speed if args.replay else None,
+        "seed": args.seed,
+    }, "results": results}
+
+
+def _print_summary(results: dict):
+    lat = results.get("latency", {})
+    print(f"  {results['requests']} requests in {results['window_s']}s: "
+          f"{results['throughput_rps']} req/s ({results['ok_rps']} ok/s), "
+          f"errors {results['errors']['rate']:.2%} {results['errors']['by_status']}, dropped {results['dropped']}"
+          if results["requests"] else "  no requests completed in the measured window")
+    if lat:
+        print(f"  latency p50 {lat['p50_ms']} ms, p95 {lat['p95_ms']} ms, p99 {lat['p99_ms']} ms, "
+              f"max {lat['max_ms']} ms")
+    for kind, s in results.get("by_kind", {}).items():
+        print(f"    {kind:<8} n={s['n']:<6} p50 {s['p50_ms']} ms  p99 {s['p99_ms']} ms  errors {s['errors']}")
+    cpu = results.get("cpu", {})
+    if "server_ms_per_request" in cpu:
+        print(f"  server CPU {cpu['server_ms_per_request']} ms/request ({cpu['server_cores_busy']} cores busy)")
+    if "process_ms_per_request" in cpu:
+        print(f"  {'load generator + app' if 'note' in cpu else 'load generator'} CPU "
+              f"{cpu['process_ms_per_request']} ms/request")
+
+
+def _env_pair(text: str):
+    key, sep, value = text.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got {text!r}")
+    return key, value
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Load generator for the credit scoring API")
+    target = ap.add_mutually_exclusive_group()
+    target.add_argument("--url", help="base URL of a running server (default: the app in-process)")
+    target.add_argument("--spawn", action="store_true", help="start python -m server.serve for the run")
+    ap.add_argument("--port", type=int, default=18080, help="port for --spawn")
+    ap.add_argument("--workers", type=int, default=1, help="server.serve workers for --spawn")
+    ap.add_argument("--threads", type=int, default=1, help="torch threads per worker for --spawn")
+    ap.add_argument("--env", type=_env_pair, action="append", default=[],
+                    help="KEY=VALUE for the spawned server (repeatable), e.g. SCORE_MICROBATCH=0")
+    ap.add_argument("--server-pid", type=int, help="server process to measure CPU for (with --url)")
+    ap.add_argument("--gateway", action="store_true", help="send /score traffic through the stand-in gateway")
+    ap.add_argument("--gateway-db-ms", type=float, default=5.0, help="simulated MongoDB save per request")
+    ap.add_argument("--gateway-timeout-s", type=float, default=30.0)
+    ap.add_argument("--qps", type=float, default=0.0, help="open loop at this arrival rate (0 = closed loop)")
+    ap.add_argument("--arrival", choices=("poisson", "uniform"), default="poisson")
+    ap.add_argument("--concurrency", type=int, help="closed-loop clients (default 8)")
+    ap.add_argument("--duration", type=float,
+                    help="measured seconds after --warmup-s (default 20; --replay: the whole capture)")
+    ap.add_argument("--warmup-s", type=float,
+                    help="initial seconds left out of the results (default 2; --replay: 0)")
+    ap.add_argument("--requests", type=int, default=0, help="closed loop: stop after this many (0 = no limit)")
+    ap.add_argument("--max-inflight", type=int, default=256, help="open loop: drop arrivals beyond this")
+    ap.add_argument("--timeout-s", type=float, default=30.0, help="client timeout per request")
+    ap.add_argument("--mix", default=DEFAULT_MIX, help=f"request kinds by weight (default {DEFAULT_MIX})")
+    ap.add_argument("--batch-size", type=int, default=16, help="applicants per /score/batch request")
+    ap.add_argument("--payloads", help="JSON / JSON-lines file of payloads to use instead of synthetic ones")
+    ap.add_argument("--pool", type=int, default=4096, help="distinct synthetic payloads")
+    ap.add_argument("--replay", help="captured JSON-lines request file to replay")
+    ap.add_argument("--speed", type=float, default=1.0, help="replay time compression (2 = twice as fast)")
+    ap.add_argument("--loops", type=int, default=1, help="times to replay the capture")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="JSON report path ('-' for stdout; default artifacts/loadtest/<commit>-<time>.json)")
+    args = ap.parse_args()
+
+    if not HAVE_HTTPX:
+        ap.error("httpx is required (pip install httpx)")
+    args.concurrency_given = args.concurrency is not None
+    args.concurrency = args.concurrency or 8
+    args.env = dict(args.env)
+    if args.duration is None:
+        args.duration = float("inf") if args.replay else 20.0
+    if args.warmup_s is None:
+        args.warmup_s = 0.0 if args.replay else 2.0
+    if args.env and not args.spawn:
+        ap.error("--env only applies to --spawn")
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        ap.error(str(e))
+
+    json_out = sys.stdout
+    if args.out == "-":
+        sys.stdout = sys.stderr
+    try:
+        report = run_loadtest(args)
+    except (ValueError, RuntimeError) as e:   # bad capture / payload file, server never ready
+        print(f"✖ {e}")
+        sys.exit(1)
+    print("✔ Load test finished")
+    _print_summary(report["results"])
+
+    if args.out == "-":
+        json.dump(report, json_out, indent=2)
+        json_out.write("\n")
+        json_out.flush()
+    else:
+        out = args.out or os.path.join(
+            LOADTEST_DIR, f"{report['env']['commit'] or 'nogit'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        with open(out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✔ Load test report -> {out}")
@@ -0,0 +1,241 @@
+# metrics.py
+# In-process, Prometheus-style metrics for the scoring API. GET /metrics renders them in the
+# Prometheus text exposition format; nothing else (prometheus_client, a push gateway, a
+# sidecar) is needed.
+#
+#   credit_requests_total{endpoint,status}        /score and /score/batch calls by HTTP status
+#                                                 (bodies that fail validation get a 422 first)
+#   credit_request_seconds{endpoint}              handler latency, queueing in the batcher included
+#   credit_stage_seconds{stage}                   time per call of each pipeline stage; one call
+#                                                 covers a whole (micro-)batch:
+#       build      payload → train.csv-shaped rows (build_row_from_user_payload; plus the
+#                  DataFrame for batches too big for the compiled plan)
+#       featurize  ModelBundle.inputs_row / inputs_df (compiled plan or OHE + scaler)
+#       forward    the network's forward pass
+#       rules      rule risk, hybrid blend, 300–850 score and band
+#       captum     Integrated Gradients ("attributions" mode only)
+#       reasons    reason text (rule engine, IG → text, padding); excludes captum
+#   credit_scored_total{model_version,band}       served results by band (cache hits included)
+#   credit_risk_probability{model_version}        distribution of the blended risk_probability
+#
+# Recording costs two perf_counter() calls, a bisect and a locked add, about a microsecond.
+# model.warm_up() runs inside quiet() so its synthetic applicants are not counted.
+# Numbers are per process: under serve.py every worker keeps its own, and each series carries
+# a worker label (a scrape reaches whichever worker accepts the connection).
+import bisect
+import threading
+import time
+from collections import Counter as _PyCounter
+from typing import Callable, Dict, Tuple
+
+STAGES = ("build", "featurize", "forward", "rules", "captum", "reasons")
+LATENCY_BUCKETS_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS_S = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5)
+RISK_BUCKETS = tuple(round(0.05 * i, 2) for i in range(1, 21))   # 0.05 … 1.0
+
+class _Local(threading.local):
+    quiet = False   # class default: the per-call check never takes the AttributeError path
+
+
+_local = _Local()
+
+
+def _fmt(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if v != int(v) else str(int(v))
+
+
+def _labels(names, values, extra: Dict[str, str] = None) -> str:
+    pairs = list(zip(names, values)) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    esc = lambda s: str(s).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: Tuple[str, ...] = ()):
+        self.name, self.doc, self.labels = name, doc, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def samples(self, extra=None):
+        with self._lock:
+            items = sorted(self._values.items())
+        for lv, v in items:
+            yield f"{self.name}{_labels(self.labels, lv, extra)} {_fmt(v)}"
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative buckets, _sum and _count on render)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, buckets, labels: Tuple[str, ...] = ()):
+        self.name, self.doc, self.labels = name, doc, tuple(labels)
+        self.bounds = tuple(sorted(buckets))
+        self._series = {}   # label values -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        i = bisect.bisect_left(self.bounds, value)   # le semantics: value == bound lands in it
+        with self._lock:
+            s = self._series.get(label_values)
+            if s is None:
+                s = self._series[label_values] = [0] * (len(self.bounds) + 1) + [0.0]
+            s[i] += 1
+            s[-1] += value
+
+    def observe_many(self, values, *label_values):
+        """Observe a batch of values (e.g. one risk per scored row) under one lock."""
+        idx = [bisect.bisect_left(self.bounds, v) for v in values]
+        with self._lock:
+            s = self._series.get(label_values)
+            if s is None:
+                s = self._series[label_values] = [0] * (len(self.bounds) + 1) + [0.0]
+            for i in idx:
+                s[i] += 1
+            s[-1] += float(sum(values))
+
+    def time(self, *label_values) -> "_Timer":
+        return _Timer(self, label_values)
+
+    def count(self, *label_values) -> int:
+        s = self._series.get(label_values)
+        return sum(s[:-1]) if s else 0
+
+    def samples(self, extra=None):
+        with self._lock:
+            items = sorted((lv, list(s)) for lv, s in self._series.items())
+        for lv, s in items:
+            cum = 0
+            for bound, n in zip(self.bounds + (float("inf"),), s[:-1]):
+                cum += n
+                yield (f"{self.name}_bucket{_labels(self.labels + ('le',), lv + (_fmt(bound),), extra)} "
+                       f"{cum}")
+            yield f"{self.name}_sum{_labels(self.labels, lv, extra)} {_fmt(s[-1])}"
+            yield f"{self.name}_count{_labels(self.labels, lv, extra)} {cum}"
+
+
+class Gauge:
+    """
+    Value(s) read at render time from a callback returning {label values tuple: value}.
+    kind="counter" exposes a running total kept elsewhere (e.g. ResultCache.hits).
+    """
+
+    def __init__(self, name: str, doc: str, fn: Callable[[], Dict[tuple, float]],
+                 labels: Tuple[str, ...] = (), kind: str = "gauge"):
+        self.name, self.doc, self.labels, self.fn, self.kind = name, doc, tuple(labels), fn, kind
+
+    def samples(self, extra=None):
+        try:
+            values = self.fn() or {}
+        except Exception:
+            return   # a broken callback must not break the scrape
+        for lv, v in sorted(values.items()):
+            if v is not None:
+                yield f"{self.name}{_labels(self.labels, lv, extra)} {_fmt(v)}"
+
+
+class _Timer:
+    __slots__ = ("hist", "labels", "t0")
+
+    def __init__(self, hist: Histogram, labels: tuple):
+        self.hist, self.labels = hist, labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if not _local.quiet:
+            self.hist.observe(time.perf_counter() - self.t0, *self.labels)
+        return False
+
+
+class quiet:
+    """Context manager: nothing recorded by stage() in this thread while inside (warm-up)."""
+
+    def __enter__(self):
+        self._prev = _local.quiet
+        _local.quiet = True
+
+    def __exit__(self, *exc):
+        _local.quiet = self._prev
+        return False
+
+
+class track_request:
+    """`with metrics.track_request("/score"): ...` counts the call by status and times it."""
+    __slots__ = ("endpoint", "t0")
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        status = 200 if exc is None else getattr(exc, "status_code", 500)   # HTTPException
+        REQUESTS.inc(self.endpoint, str(status))
+        REQUEST_SECONDS.observe(time.perf_counter() - self.t0, self.endpoint)
+        return False
+
+
+# ───────────────── METRICS ─────────────────
+REQUESTS = Counter("credit_requests_total", "Scoring requests by endpoint and HTTP status.",
+                   ("endpoint", "status"))
+REQUEST_SECONDS = Histogram("credit_request_seconds", "Scoring request latency in seconds.",
+                            LATENCY_BUCKETS_S, ("endpoint",))
+STAGE_SECONDS = Histogram("credit_stage_seconds", "Time per call of each scoring pipeline stage.",
+                          STAGE_BUCKETS_S, ("stage",))
+SCORED = Counter("credit_scored_total", "Served scoring results by model version and band.",
+                 ("model_version", "band"))
+RISK = Histogram("credit_risk_probability", "Blended risk_probability of served results.",
+                 RISK_BUCKETS, ("model_version",))
+
+REGISTRY = [REQUESTS, REQUEST_SECONDS, STAGE_SECONDS, SCORED, RISK]
+
+
+def stage(name: str) -> _Timer:
+    """`with metrics.stage("featurize"): ...` times one pipeline stage call."""
+    return _Timer(STAGE_SECONDS, (name,))
+
+
+def observe_results(versions, results):
+    """Band counts and risk histogram for served results; versions[i] scored results[i]."""
+    by_version = {}
+    for v, r in zip(versions, results):
+        by_version.setdefault(v, []).append(r)
+    for v, rs in by_version.items():
+        for band, n in _PyCounter(r["band"] for r in rs).items():
+            SCORED.inc(v, band, amount=n)
+        RISK.observe_many([r["risk_probability"] for r in rs], v)
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render(extra_labels: Dict[str, str] = None) -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.doc}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples(extra_labels))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,151 @@
+# microbatch.py
+# asyncio micro-batcher: collects concurrent /score requests for a short window and
+# scores them with one batched featurize + forward pass on the threadpool.
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List
+
+# Upper bounds of the batch-size / queue-wait histogram buckets (last bucket is open-ended)
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+QUEUE_WAIT_MS_BUCKETS = [0.5, 1, 2, 5, 10, 25, 50, 100, 250]
+
+
+def _bucket(value: float, bounds: List[float]) -> str:
+    for b in bounds:
+        if value <= b:
+            return f"le_{b}"
+    return "inf"
+
+
+class MicroBatcher:
+    """
+    submit(payload) queues one request and waits for its result. A background task takes the
+    first queued request, keeps collecting for up to `window_ms` (or until `max_batch`
+    requests), runs `score_many(payloads)` once in the default executor and resolves every
+    request's future. If a batch raises (or returns the wrong number of results), its requests
+    are retried one by one with `score_one` so a single bad payload only fails its own request.
+    stop() fails every request still queued or in the batch being scored.
+    """
+
+    def __init__(self, score_many: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+                 score_one: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 window_ms: float = 2.0, max_batch: int = 64):
+        self.score_many = score_many
+        self.score_one = score_one
+        self.window_s = max(0.0, window_ms) / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        self._queue = None
+        self._task = None
+        self._batch = []   # requests taken off the queue whose futures are not resolved yet
+
+        # metrics
+        self.batches = 0
+        self.requests = 0
+        self.failed_batches = 0
+        self.max_batch_seen = 0
+        self.queue_wait_ms_total = 0.0
+        self.queue_wait_ms_max = 0.0
+        self.batch_size_hist = {_bucket(b, BATCH_SIZE_BUCKETS): 0 for b in BATCH_SIZE_BUCKETS + [float("inf")]}
+        self.queue_wait_hist = {_bucket(b, QUEUE_WAIT_MS_BUCKETS): 0 for b in QUEUE_WAIT_MS_BUCKETS + [float("inf")]}
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # nothing resolves these futures any more; fail them so no caller waits forever
+        pending, self._batch = self._batch, []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._queue = None
+        for _, fut, _ in pending:
+            if not fut.done():
+                fut.set_exception(RuntimeError("Micro-batcher stopped"))
+
+    async def submit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if self._queue is None:
+            raise RuntimeError("Micro-batcher is not running")
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((payload, fut, time.perf_counter()))
+        return await fut
+
+    async def _collect(self):
+        self._batch = batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.window_s
+        while len(batch) < self.max_batch:
+            # take whatever is already queued without waiting
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            remaining = deadline - loop.time()
+            if len(batch) >= self.max_batch or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            started = time.perf_counter()
+            self._record(batch, started)
+
+            payloads = [p for p, _, _ in batch]
+            try:
+                results = await loop.run_in_executor(None, self.score_many, payloads)
+                if len(results) != len(batch):
+                    raise ValueError(f"score_many returned {len(results)} results for {len(batch)} requests")
+                for (_, fut, _), res in zip(batch, results):
+                    if not fut.done():
+                        fut.set_result(res)
+            except Exception:
+                self.failed_batches += 1
+                logging.exception("Micro-batch of %d failed; scoring its requests one by one", len(batch))
+                for payload, fut, _ in batch:
+                    try:
+                        res = await loop.run_in_executor(None, self.score_one, payload)
+                        if not fut.done():
+                            fut.set_result(res)
+                    except Exception as e:
+                        if not fut.done():
+                            fut.set_exception(e)
+            self._batch = []
+
+    def _record(self, batch, started: float):
+        n = len(batch)
+        self.batches += 1
+        self.requests += n
+        self.max_batch_seen = max(self.max_batch_seen, n)
+        self.batch_size_hist[_bucket(n, BATCH_SIZE_BUCKETS)] += 1
+        for _, _, enqueued in batch:
+            wait_ms = (started - enqueued) * 1000.0
+            self.queue_wait_ms_total += wait_ms
+            self.queue_wait_ms_max = max(self.queue_wait_ms_max, wait_ms)
+            self.queue_wait_hist[_bucket(wait_ms, QUEUE_WAIT_MS_BUCKETS)] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window_s * 1000.0,
+            "max_batch": self.max_batch,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "requests": self.requests,
+            "failed_batches": self.failed_batches,
+            "mean_batch_size": (self.requests / self.batches) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_seen,
+            "batch_size_histogram": dict(self.batch_size_hist),
+            "mean_queue_wait_ms": (self.queue_wait_ms_total / self.requests) if self.requests else 0.0,
+            "max_queue_wait_ms": self.queue_wait_ms_max,
+            "queue_wait_ms_histogram": dict(self.queue_wait_hist),
+        }
@@ -1,22 +1,34 @@
 # model.py
 # End-to-end: train MLP, take user JSON payload, output credit score (300–850) + reasons.
 
-import os, json, warnings
+from __future__ import annotations  # torch type hints below must not need torch at import time
+
+import os, json, logging, warnings
+import copy
+import hashlib
+import threading
+import time
 import numpy as np
 import pandas as pd
 import pickle
 import re
-import torch
-from collections import Counter
+import struct
+from collections import Counter, OrderedDict, namedtuple
 from datetime import datetime
-from torch import nn
-from torch.utils.data import DataLoader, TensorDataset
+from functools import lru_cache
 from typing import Tuple, Dict, Any
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.metrics import accuracy_score
 
-model = None
+from . import metrics
+
+# Inference backend: "torch" (default) or "numpy". Read before importing torch so that the
+# NumPy backend serves from artifacts/model.cma without loading torch or sklearn.
+INFERENCE_BACKEND = os.environ.get("CREDIT_BACKEND", "torch").strip().lower()
+if INFERENCE_BACKEND == "numpy":
+    torch = nn = None
+else:
+    import torch
+    from torch import nn
+
 # Optional fuzzy fallback
 try:
     from rapidfuzz import process, fuzz
@@ -37,20 +49,41 @@ ENGINEERED_NUMERIC_COLS = [
 ]
 
 # Credit score mapping (300–850)
+# The array versions are the implementation (batch scoring calls them directly); the scalar
+# helpers run the same code on one value, so both paths produce bit-identical results.
 SCORE_MIN, SCORE_MAX = 300, 850
+BAND_EDGES = np.array([580.0, 670.0, 740.0, 800.0])
+BAND_NAMES = np.array(["Poor", "Fair", "Good", "Very Good", "Excellent"], dtype=object)
+
+def blend_risk_batch(p_nn_poor, p_rule_poor) -> np.ndarray:
+    """
+    Hybrid risk: probabilistic OR of the NN and rule risks, so a strong rule-based signal
+    produces a high blended risk: 1 - (1 - p_nn) * (1 - p_rule) = p_nn + p_rule - p_nn*p_rule.
+    """
+    p_nn = np.asarray(p_nn_poor, dtype=np.float64)
+    p_rule = np.asarray(p_rule_poor, dtype=np.float64)
+    return np.clip(p_nn + p_rule - (p_nn * p_rule), 0.0, 1.0)
+
+def probability_to_score_batch(p_default) -> np.ndarray:
+    p = np.clip(np.asarray(p_default, dtype=np.float64), 0.0, 1.0)
+    return SCORE_MAX - (SCORE_MAX - SCORE_MIN) * p  # 0→850, 1→300
+
+def score_band_batch(scores) -> np.ndarray:
+    # side="right": a score sitting exactly on an edge moves up a band (580 → "Fair")
+    idx = np.searchsorted(BAND_EDGES, np.asarray(scores, dtype=np.float64), side="right")
+    return BAND_NAMES[idx]
+
+def blend_risk(p_nn_poor: float, p_rule_poor: float) -> float:
+    return float(blend_risk_batch(p_nn_poor, p_rule_poor))
+
 def probability_to_score(p_default: float, method: str = "linear") -> float:
-    p = max(0.0, min(1.0, float(p_default)))
     if method == "linear":
-        return SCORE_MAX - (SCORE_MAX - SCORE_MIN) * p  # 0→850, 1→300
+        return float(probability_to_score_batch(p_default))
     else:
         raise ValueError("Only 'linear' is enabled for now.")
 
 def score_band(score: float) -> str:
-    if score < 580: return "Poor"
-    if score < 670: return "Fair"
-    if score < 740: return "Good"
-    if score < 800: return "Very Good"
-    return "Excellent"
+    return str(score_band_batch(score))
 
  # ───────────────── LOAN TYPE NORMALIZATION ─────────────────
 CANONICAL_TYPES = [
@@ -109,6 +142,17 @@ LOAN_REGEX = {
 
 IGNORE_PAT = re.compile(r"\b(not\s*specified|unknown|n/?a|none)\b", re.I)
 
+LOAN_SPLIT_PAT = re.compile(r",|\band\b", re.I)
+
+# All LOAN_REGEX patterns in one pass. Each alternative is an anchored lookahead, so the
+# engine tries them in dict order and the first pattern that matches *anywhere* in the token
+# wins — the same priority as looping over LOAN_REGEX.
+_LOAN_GROUPS = {f"g{i}": canon for i, canon in enumerate(LOAN_REGEX)}
+LOAN_COMBINED_PAT = re.compile(
+    "|".join(f"(?P<g{i}>(?=.*?(?:{rx.pattern})))" for i, rx in enumerate(LOAN_REGEX.values())),
+    re.I | re.S,
+)
+
 def _fuzzy_canonical(tok, threshold=85):
     if not HAVE_FUZZ:
         return None
@@ -116,38 +160,42 @@ def _fuzzy_canonical(tok, threshold=85):
     best, score, _ = process.extractOne(tok, choices, scorer=fuzz.WRatio)
     return best if score >= threshold else None
 
+@lru_cache(maxsize=8192)
+def canonical_loan_token(tok: str):
+    """
+    Canonical loan type for one stripped token (memoized: the data has few distinct tokens).
+    Returns "" for ignorable tokens ("Not Specified", "N/A", ...) and None when nothing matches.
+    """
+    if not tok or IGNORE_PAT.search(tok):
+        return ""
+    m = LOAN_COMBINED_PAT.match(tok.lower())
+    if m:
+        return _LOAN_GROUPS[m.lastgroup]
+    return _fuzzy_canonical(tok) if HAVE_FUZZ else None
+
+def _split_loan_tokens(s):
+    return [p.strip() for p in LOAN_SPLIT_PAT.split(str(s)) if p and p.strip()]
+
 def normalize_loan_types(loan_value):
     """
     Accepts: string ("Auto Loan, and Mortgage Loan") or list of strings.
     Returns: (matched_set, unmatched_tokens_list)
     """
-    def split_tokens(s):
-        parts = re.split(r",|\band\b", str(s), flags=re.I)
-        return [p.strip() for p in parts if p and p.strip()]
-
     if loan_value is None:
         tokens = []
     elif isinstance(loan_value, (list, tuple, set)):
         tokens = []
         for item in loan_value:
-            tokens.extend(split_tokens(item))
+            tokens.extend(_split_loan_tokens(item))
     else:
-        tokens = split_tokens(loan_value)
+        tokens = _split_loan_tokens(loan_value)
 
     matched, unmatched = set(), []
     for tok in tokens:
-        if not tok or IGNORE_PAT.search(tok):
-            continue
-        low = tok.lower()
-        found = False
-        for canon, rx in LOAN_REGEX.items():
-            if rx.search(low):
-                matched.add(canon); found = True; break
-        if not found and HAVE_FUZZ:
-            guess = _fuzzy_canonical(tok)
-            if guess:
-                matched.add(guess); found = True
-        if not found:
+        canon = canonical_loan_token(tok)
+        if canon:
+            matched.add(canon)
+        elif canon is None:
             unmatched.append(tok)
     return matched, unmatched
 
@@ -209,22 +257,24 @@ def loan_flags_from_series(type_of_loan_series: pd.Series) -> pd.DataFrame:
     For each row, parse the normalized Type_of_Loan string and emit 0/1 flags per canonical type
     plus a couple of counts that are often predictive.
     """
-    flags = {v: [] for v in CANONICAL_FLAGS.values()}
-    counts_all, counts_risky = [], []
-
-    for val in type_of_loan_series.astype(str):
-        matched, _ = normalize_loan_types(val)
-        present = set(matched)
-        for canon, col in CANONICAL_FLAGS.items():
-            flags[col].append(1.0 if canon in present else 0.0)
-        counts_all.append(float(len(present)))
-        # define “risky” bucket; tweak as you like
-        risky = {"Payday Loan", "Debt Consolidation Loan"}
-        counts_risky.append(float(len(present & risky)))
-
-    out = pd.DataFrame(flags, index=type_of_loan_series.index)
-    out["eng_loan_count"] = counts_all
-    out["eng_risky_loan_count"] = counts_risky
+    # Only a few thousand distinct strings across ~100k rows: parse each unique value once
+    # and broadcast the flag rows back with the factorize codes.
+    codes, uniques = pd.factorize(type_of_loan_series.astype(str))
+    canon_cols = list(CANONICAL_FLAGS)
+    # define “risky” bucket; tweak as you like
+    risky = {"Payday Loan", "Debt Consolidation Loan"}
+
+    table = np.zeros((len(uniques), len(canon_cols) + 2), dtype=np.float64)
+    for u, val in enumerate(uniques):
+        present, _ = normalize_loan_types(val)
+        for j, canon in enumerate(canon_cols):
+            table[u, j] = 1.0 if canon in present else 0.0
+        table[u, -2] = float(len(present))
+        table[u, -1] = float(len(present & risky))
+
+    rows = table[codes]
+    out = pd.DataFrame(rows, index=type_of_loan_series.index,
+                       columns=list(CANONICAL_FLAGS.values()) + ["eng_loan_count", "eng_risky_loan_count"])
     return out
 
 # ───────────────── TRAIN / TEST METADATA FOR INFERENCE ─────────────────
@@ -260,15 +310,11 @@ TRAIN_COLUMNS = [
     'Monthly_Balance', 
 ]
 
-# 2) Globals used at inference time.
-#    They start as lightweight placeholders and are populated by load_pickle_bundle().
-ohe = None              # OneHotEncoder (loaded from pickle)
-scaler = None           # StandardScaler (loaded from pickle)
-NUM_COLS_FIT = []       # type: list[str]
-CAT_COLS_FIT = []       # type: list[str]
+# 2) Everything fitted (encoders, NUM_COLS_FIT/CAT_COLS_FIT, weights) lives on a loaded
+#    ModelBundle; see "LOADED MODEL BUNDLES" and "SCORER" below.
 
 
-class MLP(nn.Module):
+class MLP(nn.Module if nn is not None else object):
     def __init__(self, in_dim, hidden=(128, 64), p=0.2, n_classes=3):
         super().__init__()
         self.net = nn.Sequential(
@@ -278,13 +324,214 @@ class MLP(nn.Module):
         )
     def forward(self, x): return self.net(x)
 
+# ───────────────── FUSED INFERENCE GRAPH ─────────────────
+# In eval mode the scaler and both BatchNorm1d layers are fixed affine maps, so they can be
+# folded into the neighbouring nn.Linear weights:
+#   scaler:  z = (x - mean) / scale       → first Linear sees raw numeric columns
+#   BN:      bn(h) = a*h + c              → next Linear: W' = W * a, b' = W @ c + b
+# The fused net is Linear→ReLU→Linear→ReLU→Linear on *unscaled* features (dropout is a no-op).
+USE_FUSED_MODEL = os.environ.get("CREDIT_FUSED_MODEL", "1").strip().lower() not in {"0", "false", "no"}
+FUSED_TOLERANCE = 1e-4  # max |Δprob| allowed between the fused and original model
+
+def fold_mlp_weights(state_dict, mean, scale, n_num: int, eps: float = 1e-5):
+    """
+    Fold scaler + BatchNorm1d into the Linear layers of an MLP state_dict.
+    Returns [(W, b), ...] as float64 NumPy arrays, one pair per fused Linear.
+    """
+    sd = {k: v.detach().cpu().double().numpy() if hasattr(v, "detach") else np.asarray(v, dtype=np.float64)
+          for k, v in state_dict.items()}
+    mean = np.asarray(mean, dtype=np.float64)
+    scale = np.asarray(scale, dtype=np.float64)
+
+    # Linear(0) absorbs the StandardScaler on the numeric columns
+    W1, b1 = sd["net.0.weight"].copy(), sd["net.0.bias"].copy()
+    b1 -= W1[:, :n_num] @ (mean / scale)
+    W1[:, :n_num] /= scale
+    layers = [(W1, b1)]
+
+    # BatchNorm(2) → Linear(4), BatchNorm(6) → Linear(8)
+    for bn, lin in (("net.2", "net.4"), ("net.6", "net.8")):
+        a = sd[f"{bn}.weight"] / np.sqrt(sd[f"{bn}.running_var"] + eps)
+        c = sd[f"{bn}.bias"] - a * sd[f"{bn}.running_mean"]
+        W, b = sd[f"{lin}.weight"], sd[f"{lin}.bias"]
+        layers.append((W * a[None, :], W @ c + b))
+    return layers
+
+def build_fused_model(model: "MLP", mean, scale, n_num: int) -> nn.Sequential:
+    """Fused eval-only copy of a trained MLP that takes unscaled numeric + OHE inputs."""
+    eps = model.net[2].eps
+    folded = fold_mlp_weights(model.state_dict(), mean, scale, n_num, eps=eps)
+    linears = []
+    for W, b in folded:
+        lin = nn.Linear(W.shape[1], W.shape[0])
+        with torch.no_grad():
+            lin.weight.copy_(torch.from_numpy(W))
+            lin.bias.copy_(torch.from_numpy(b))
+        linears.append(lin)
+    fused = nn.Sequential(linears[0], nn.ReLU(), linears[1], nn.ReLU(), linears[2])
+    fused.eval()
+    return fused
+
+def check_fused_equivalence(model: "MLP", fused: nn.Module, mean, scale, n_num: int,
+                            n_probe: int = 256, seed: int = 0) -> float:
+    """
+    Max |softmax difference| between model(scaled x) and fused(raw x) on random probe inputs.
+    """
+    rng = np.random.default_rng(seed)
+    in_dim = model.net[0].in_features
+    z = np.zeros((n_probe, in_dim), dtype=np.float64)
+    z[:, :n_num] = rng.normal(0.0, 2.0, size=(n_probe, n_num))
+    z[:, n_num:] = rng.random((n_probe, in_dim - n_num)) < 0.2
+    raw = z.copy()
+    raw[:, :n_num] = z[:, :n_num] * np.asarray(scale) + np.asarray(mean)
+    with torch.no_grad():
+        p_ref = torch.softmax(model(torch.tensor(z, dtype=torch.float32)), dim=1)
+        p_fused = torch.softmax(fused(torch.tensor(raw, dtype=torch.float32)), dim=1)
+    return float((p_ref - p_fused).abs().max())
+
+def inference_model(bundle: ModelBundle = None) -> nn.Module:
+    """The network used for scoring: the fused graph when available, else the loaded MLP."""
+    return (bundle or current_bundle()).network()
+
+def input_baseline(x: torch.Tensor, bundle: ModelBundle = None) -> torch.Tensor:
+    """
+    Integrated Gradients baseline for inference_model(). The original model uses all-zero
+    scaled inputs; for the fused graph the same point is (mean, 0…0) in raw feature space.
+    """
+    return (bundle or current_bundle()).input_baseline(x)
+
+# ───────────────── NUMPY INFERENCE BACKEND ─────────────────
+# The fused weights (see fold_mlp_weights) served with plain NumPy matmuls. Serving with
+# CREDIT_BACKEND=numpy needs only NumPy/pandas: no torch, sklearn or pickle at startup.
+class NumpyMLP:
+    """Fused MLP forward pass (Linear→ReLU→Linear→ReLU→Linear, then softmax) with NumPy matmuls."""
+    def __init__(self, layers, transposed: bool = False):
+        # keep W transposed so each layer is one (n, in) @ (in, out) matmul; pre-transposed
+        # float32 arrays (the artifact's memmapped views) are used as-is, without a copy
+        if transposed:
+            self.layers = [(np.asarray(Wt, dtype=np.float32), np.asarray(b, dtype=np.float32))
+                           for Wt, b in layers]
+            return
+        self.layers = [
+            (np.ascontiguousarray(np.asarray(W, dtype=np.float32).T), np.asarray(b, dtype=np.float32))
+            for W, b in layers
+        ]
+
+    def logits(self, X: np.ndarray) -> np.ndarray:
+        h = np.asarray(X, dtype=np.float32)
+        for i, (Wt, b) in enumerate(self.layers):
+            h = h @ Wt
+            h += b
+            if i < len(self.layers) - 1:
+                np.maximum(h, 0.0, out=h)
+        return h
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        z = self.logits(X)
+        z -= z.max(axis=1, keepdims=True)
+        np.exp(z, out=z)
+        z /= z.sum(axis=1, keepdims=True)
+        return z
+
+# ───────────────── LOADED MODEL BUNDLES ─────────────────
+# A ModelBundle is one loaded model plus everything needed to featurize for it. It is never
+# mutated after construction, so several can be live at once (champion/challenger, see
+# registry.py) and a request keeps the bundle it started with while a reload swaps in a new
+# one. Scoring goes through a Scorer (see "SCORER") that wraps one bundle.
+
+class ModelBundle:
+    """Immutable loaded model: network, encoders or compiled feature plan, columns, version tag."""
+
+    def __init__(self, *, version, fingerprint, source, class_names, num_cols, cat_cols,
+                 feature_plan=None, model=None, fused=None, numpy_net=None, ohe=None, scaler=None):
+        self.version = version            # tag returned with every result
+        self.fingerprint = fingerprint    # sha256 of the file (artifact: header digest)
+        self.source = source
+        self.class_names = list(class_names)
+        self.num_cols = list(num_cols)
+        self.cat_cols = list(cat_cols)
+        self.feature_plan = feature_plan
+        self.model = model                # torch MLP (pickle) or the fused graph (artifact)
+        self.fused = fused                # fused torch graph, when that is what scores
+        self.numpy_net = numpy_net        # NumpyMLP (CREDIT_BACKEND=numpy)
+        self.ohe = ohe
+        self.scaler = scaler
+        self.poor_index = self.class_names.index("Poor")
+        self.loaded_at = time.time()
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError("ModelBundle is immutable; load a new one instead")
+        object.__setattr__(self, name, value)
+
+    def __repr__(self):
+        return f"ModelBundle(version={self.version!r}, source={self.source!r})"
+
+    @property
+    def raw_inputs(self) -> bool:
+        # The fused graph and the NumPy backend have the scaler folded into their first layer
+        return self.fused is not None or self.numpy_net is not None
+
+    def network(self):
+        """The torch network that scores (fused graph when available), or None for NumPy."""
+        return self.fused if self.fused is not None else self.model
+
+    def featurize(self, df: pd.DataFrame, scale: bool = True) -> np.ndarray:
+        if self.ohe is None and self.feature_plan is not None:
+            return self.feature_plan.transform_df(df, scale=scale)  # no sklearn objects
+        return _sklearn_featurize(df, self.ohe, self.scaler, self.num_cols, self.cat_cols, scale)
+
+    def inputs_df(self, df: pd.DataFrame) -> np.ndarray:
+        return self.featurize(df, scale=not self.raw_inputs)
+
+    def inputs_row(self, row: Dict[str, Any]) -> np.ndarray:
+        if self.feature_plan is not None:
+            return self.feature_plan.transform_row(row, scale=not self.raw_inputs)
+        return self.inputs_df(pd.DataFrame([row], columns=TRAIN_COLUMNS))
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if self.numpy_net is not None:
+            return self.numpy_net.predict_proba(X)
+        with torch.no_grad():
+            return torch.softmax(self.network()(torch.from_numpy(X)), dim=1).cpu().numpy()
+
+    def feature_names(self):
+        names = list(self.num_cols)
+        categories = self.feature_plan.categories if self.feature_plan is not None else self.ohe.categories_
+        for c, cats in zip(self.cat_cols, categories):
+            names.extend((c, str(v)) for v in cats)
+        return names
+
+    def input_baseline(self, x: torch.Tensor) -> torch.Tensor:
+        base = torch.zeros_like(x)
+        if self.fused is not None:
+            mean = self.scaler.mean_ if self.scaler is not None else self.feature_plan.mean
+            base[:, :len(self.num_cols)] = torch.as_tensor(np.array(mean), dtype=x.dtype)   # memmap views are read-only
+        return base
+
+    def info(self) -> Dict[str, Any]:
+        backend = "numpy" if self.numpy_net is not None else ("fused" if self.fused is not None else "mlp")
+        return {
+            "version": self.version, "fingerprint": self.fingerprint, "source": self.source,
+            "backend": backend,
+            "loaded_utc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.loaded_at)),
+        }
+
+def current_bundle() -> ModelBundle:
+    """The default scorer's bundle (loaded on first use)."""
+    return get_scorer().bundle
+
+def use_bundle(bundle: ModelBundle) -> ModelBundle:
+    """Make `bundle` the default for the module-level helpers (wraps it in a new Scorer)."""
+    set_default_scorer(Scorer(bundle))
+    return bundle
+
 
 # ────────────────────────────────────────────────
 # ARTIFACT SAVE / LOAD HELPERS
 # ────────────────────────────────────────────────
 
-import joblib
-
 BUNDLE_PATH = os.path.join(ART_DIR, "model_bundle.pkl")
 
 def save_pickle_bundle(model, ohe, scaler, num_cols, cat_cols):
@@ -304,36 +551,266 @@ def save_pickle_bundle(model, ohe, scaler, num_cols, cat_cols):
 
     print("✔ Saved full model bundle to", BUNDLE_PATH)
 
-def load_pickle_bundle(device: str = "cpu"):
-    """
-    Alternative to load_artifacts(): load everything from a single pickle file.
-    """
-    global model, ohe, scaler, CLASS_NAMES, NUM_COLS_FIT, CAT_COLS_FIT
-
-    with open(BUNDLE_PATH, "rb") as f:
-        bundle = pickle.load(f)
+def _bundle_from_pickle(path: str = BUNDLE_PATH, device: str = "cpu") -> ModelBundle:
+    if torch is None:
+        raise RuntimeError(f"{path}: pickle bundles need torch; CREDIT_BACKEND=numpy serves artifacts only")
+    with open(path, "rb") as f:
+        raw = f.read()
+    bundle = pickle.loads(raw)
 
-    CLASS_NAMES  = bundle["class_names"]
-    NUM_COLS_FIT = bundle["num_cols"]
-    CAT_COLS_FIT = bundle["cat_cols"]
-    ohe          = bundle["ohe"]
-    scaler       = bundle["scaler"]
+    class_names = bundle["class_names"]
+    num_cols    = bundle["num_cols"]
+    cat_cols    = bundle["cat_cols"]
+    ohe         = bundle["ohe"]
+    scaler      = bundle["scaler"]
 
     # rebuild model
     try:
         ohe_feature_count = len(ohe.get_feature_names_out())
     except Exception:
         ohe_feature_count = ohe.transform(
-            pd.DataFrame({c: ["DUMMY"] for c in CAT_COLS_FIT})
+            pd.DataFrame({c: ["DUMMY"] for c in cat_cols})
         ).shape[1]
 
-    in_dim = len(NUM_COLS_FIT) + ohe_feature_count
-    model = MLP(in_dim=in_dim, n_classes=len(CLASS_NAMES))
-    model.load_state_dict(bundle["state_dict"])
+    in_dim = len(num_cols) + ohe_feature_count
+    sd = bundle["state_dict"]
+    hidden = (sd["net.0.weight"].shape[0], sd["net.4.weight"].shape[0])   # sweeps may change them
+    model = MLP(in_dim=in_dim, hidden=hidden, n_classes=len(class_names))
+    model.load_state_dict(sd)
     model.to(device)
     model.eval()
 
-    print("✔ Loaded full model bundle from", BUNDLE_PATH)
+    plan = compile_feature_plan(ohe, scaler, num_cols, cat_cols)
+
+    fused = None
+    if USE_FUSED_MODEL:
+        try:
+            candidate = build_fused_model(model, scaler.mean_, scaler.scale_, len(num_cols)).to(device)
+            err = check_fused_equivalence(model, candidate, scaler.mean_, scaler.scale_, len(num_cols))
+            if err <= FUSED_TOLERANCE:
+                fused = candidate
+            else:
+                warnings.warn(f"Fused model differs from the MLP by {err:.2e}; using the unfused MLP.")
+        except Exception as e:
+            warnings.warn(f"Could not build fused model ({type(e).__name__}: {e}); using the unfused MLP.")
+
+    sha = hashlib.sha256(raw).hexdigest()
+    print("✔ Loaded full model bundle from", path)
+    return ModelBundle(
+        version=bundle.get("model_version") or f"pkl-{sha[:12]}", fingerprint=sha, source=path,
+        class_names=class_names, num_cols=num_cols, cat_cols=cat_cols, feature_plan=plan,
+        model=model, fused=fused, ohe=ohe, scaler=scaler,
+    )
+
+def load_pickle_bundle(device: str = "cpu", path: str = BUNDLE_PATH) -> ModelBundle:
+    """
+    Alternative to load_artifacts(): load everything from a single pickle file.
+    """
+    return use_bundle(_bundle_from_pickle(path, device))
+
+# ───────────────── VERSIONED MODEL ARTIFACT ─────────────────
+# One self-describing file for serving (artifacts/model.cma), written by
+# `python -m server.export_artifact` from the training pickle:
+#
+#   magic "CRMODEL\0" | uint32 version | uint32 header_len | header JSON | pad to 64 | data
+#
+# The header holds the class names, NUM_COLS_FIT/CAT_COLS_FIT, the OHE categories, the
+# occupation/loan tables the model was trained with, the tensor directory (dtype, shape and
+# byte offset of each array in the data section) and a sha256 over header + data. The data
+# section holds the scaler mean/scale (float64) and the fused weights (float32, W stored
+# pre-transposed), each 64-byte aligned. Loading is np.memmap + zero-copy views, so workers
+# start in milliseconds and share the pages through the OS page cache. No pickle, no sklearn.
+ARTIFACT_PATH = os.path.join(ART_DIR, "model.cma")
+ARTIFACT_MAGIC = b"CRMODEL\0"
+ARTIFACT_VERSION = 1
+ARTIFACT_ALIGN = 64
+ARTIFACT_VERIFY = os.environ.get("CREDIT_ARTIFACT_VERIFY", "1").strip().lower() not in {"0", "false", "no"}
+# "artifact" (default) or "pickle"; the torch backend falls back to the pickle when the
+# artifact is missing or when the unfused MLP is requested (CREDIT_FUSED_MODEL=0)
+MODEL_FORMAT = os.environ.get("CREDIT_MODEL_FORMAT", "artifact").strip().lower()
+# Explicit model file (artifact or pickle, detected from its magic bytes); overrides the above
+MODEL_PATH = os.environ.get("CREDIT_MODEL_PATH", "").strip() or None
+
+def _align(n: int) -> int:
+    return (n + ARTIFACT_ALIGN - 1) // ARTIFACT_ALIGN * ARTIFACT_ALIGN
+
+def _artifact_tables() -> Dict[str, Any]:
+    return {
+        "occupation_map": dict(OCCUPATION_MAP),
+        "occ_risk": dict(OCC_RISK),
+        "loan_patterns": {k: rx.pattern for k, rx in LOAN_REGEX.items()},
+        "canonical_flags": dict(CANONICAL_FLAGS),
+    }
+
+def _artifact_digest(header: Dict[str, Any], data) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps({k: v for k, v in header.items() if k != "sha256"},
+                        sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    h.update(data)
+    return h.hexdigest()
+
+def export_artifact(path: str = ARTIFACT_PATH, version: str = None) -> str:
+    """
+    Write the loaded pickle bundle as a versioned artifact (see above). Returns its sha256.
+    `version` (default: $CREDIT_MODEL_VERSION, else the export time) is the model_version
+    tag results are returned with.
+    """
+    bundle = _DEFAULT_SCORER.bundle if _DEFAULT_SCORER is not None else None
+    if bundle is None or bundle.scaler is None:
+        bundle = load_pickle_bundle()
+    model, ohe, scaler = bundle.model, bundle.ohe, bundle.scaler
+
+    n_num = len(bundle.num_cols)
+    layers = fold_mlp_weights(model.state_dict(), scaler.mean_, scaler.scale_, n_num, eps=model.net[2].eps)
+    arrays = [("scaler_mean", np.asarray(scaler.mean_, dtype=np.float64)),
+              ("scaler_scale", np.asarray(scaler.scale_, dtype=np.float64))]
+    for i, (W, b) in enumerate(layers):
+        arrays.append((f"W{i}", np.ascontiguousarray(W.T, dtype=np.float32)))
+        arrays.append((f"b{i}", np.asarray(b, dtype=np.float32)))
+
+    tensors, chunks, offset = {}, [], 0
+    for name, arr in arrays:
+        pad = _align(offset) - offset
+        chunks.append(b"\0" * pad)
+        offset += pad
+        tensors[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        chunks.append(arr.tobytes())
+        offset += arr.nbytes
+    data = b"".join(chunks)
+
+    created = datetime.utcnow()
+    header = {
+        "format": "credit-model-artifact",
+        "version": ARTIFACT_VERSION,
+        "model_version": version or os.environ.get("CREDIT_MODEL_VERSION") or created.strftime("%Y%m%d-%H%M%S"),
+        "created_utc": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "class_names": list(bundle.class_names),
+        "num_cols": list(bundle.num_cols),
+        "cat_cols": list(bundle.cat_cols),
+        "categories": [[str(c) for c in cats] for cats in ohe.categories_],
+        "n_layers": len(layers),
+        "tables": _artifact_tables(),
+        "tensors": tensors,
+        "data_nbytes": len(data),
+    }
+    header["sha256"] = _artifact_digest(header, data)
+    header_bytes = json.dumps(header).encode("utf-8")
+    prefix = ARTIFACT_MAGIC + struct.pack("<II", ARTIFACT_VERSION, len(header_bytes)) + header_bytes
+    prefix += b"\0" * (_align(len(prefix)) - len(prefix))
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(prefix)
+        f.write(data)
+    os.replace(tmp, path)
+
+    print("✔ Saved model artifact to", path, f"({header['model_version']}, sha256 {header['sha256'][:12]}…)")
+    return header["sha256"]
+
+def read_artifact(path: str = ARTIFACT_PATH, verify: bool = None, mode: str = "r"):
+    """
+    Open an artifact with np.memmap. Returns (header, {name: array view}); the views are
+    read-only for mode="r", copy-on-write for mode="c" (still shared until written).
+    Raises ValueError for a foreign/newer file or a hash mismatch.
+    """
+    verify = ARTIFACT_VERIFY if verify is None else verify
+    mm = np.memmap(path, dtype=np.uint8, mode=mode)
+    if mm.shape[0] < 16 or bytes(mm[:8]) != ARTIFACT_MAGIC:
+        raise ValueError(f"{path} is not a model artifact")
+    version, header_len = struct.unpack("<II", bytes(mm[8:16]))
+    if version > ARTIFACT_VERSION:
+        raise ValueError(f"{path} is artifact version {version}; this server reads up to {ARTIFACT_VERSION}")
+    header = json.loads(bytes(mm[16:16 + header_len]).decode("utf-8"))
+    start = _align(16 + header_len)
+    data = mm[start:start + header["data_nbytes"]]
+    if data.shape[0] != header["data_nbytes"]:
+        raise ValueError(f"{path} is truncated")
+    if verify and _artifact_digest(header, data) != header["sha256"]:
+        raise ValueError(f"{path} failed its sha256 check")
+
+    tensors = {}
+    for name, t in header["tensors"].items():
+        dtype = np.dtype(t["dtype"])
+        n = int(np.prod(t["shape"], dtype=np.int64)) * dtype.itemsize
+        tensors[name] = data[t["offset"]:t["offset"] + n].view(dtype).reshape(t["shape"])
+    return header, tensors
+
+def _bundle_from_artifact(path: str = ARTIFACT_PATH, device: str = "cpu") -> ModelBundle:
+    # copy-on-write mapping: torch wants writable buffers, and nothing ever writes to them
+    shared = INFERENCE_BACKEND == "numpy" or torch.device(device).type == "cpu"
+    header, t = read_artifact(path, mode="c" if INFERENCE_BACKEND != "numpy" and shared else "r")
+    layers = [(t[f"W{i}"], t[f"b{i}"]) for i in range(header["n_layers"])]
+    if header.get("tables") != json.loads(json.dumps(_artifact_tables())):
+        warnings.warn(f"{path} was exported with different occupation/loan tables than this code.")
+
+    plan = FeaturePlan(header["num_cols"], header["cat_cols"], t["scaler_mean"], t["scaler_scale"],
+                       header["categories"])
+    net = numpy_net = None
+    if INFERENCE_BACKEND == "numpy":
+        numpy_net = NumpyMLP(layers, transposed=True)
+    else:
+        linears = []
+        for Wt, b in layers:
+            lin = nn.Linear(Wt.shape[0], Wt.shape[1])
+            if shared:
+                # parameters are views of the mapped file, so prefork workers (serve.py)
+                # share one copy of the weights through the page cache
+                lin.weight = nn.Parameter(torch.from_numpy(Wt).t(), requires_grad=False)
+                lin.bias = nn.Parameter(torch.from_numpy(b), requires_grad=False)
+            else:
+                with torch.no_grad():
+                    lin.weight.copy_(torch.from_numpy(np.array(Wt.T)))
+                    lin.bias.copy_(torch.from_numpy(np.array(b)))
+            linears.append(lin)
+        seq = [linears[0]]
+        for lin in linears[1:]:
+            seq += [nn.ReLU(), lin]
+        net = nn.Sequential(*seq).to(device).eval()
+
+    sha = header["sha256"]
+    version = header.get("model_version") or f"cma-{sha[:12]}"
+    print("✔ Loaded model artifact from", path, f"(v{header['version']}, {version}, sha256 {sha[:12]}…)")
+    return ModelBundle(
+        version=version, fingerprint=sha, source=path,
+        class_names=header["class_names"], num_cols=header["num_cols"], cat_cols=header["cat_cols"],
+        feature_plan=plan, model=net, fused=net, numpy_net=numpy_net,
+    )
+
+def load_artifact(path: str = ARTIFACT_PATH, device: str = "cpu") -> ModelBundle:
+    """
+    Serve from a versioned artifact: NumpyMLP for CREDIT_BACKEND=numpy, otherwise the fused
+    torch graph (which is also what Integrated Gradients runs on).
+    """
+    return use_bundle(_bundle_from_artifact(path, device))
+
+def default_model_path() -> str:
+    """The model file load_bundle() serves for INFERENCE_BACKEND / CREDIT_MODEL_FORMAT."""
+    if MODEL_PATH:
+        return MODEL_PATH
+    if INFERENCE_BACKEND == "numpy":
+        return ARTIFACT_PATH
+    if MODEL_FORMAT == "artifact" and USE_FUSED_MODEL and os.path.exists(ARTIFACT_PATH):
+        return ARTIFACT_PATH
+    return BUNDLE_PATH
+
+def load_model_bundle(path: str = None, device: str = "cpu") -> ModelBundle:
+    """
+    Load an artifact or pickle bundle (told apart by the artifact magic) into a new
+    ModelBundle without touching the default scorer. This is what the registry reloads with.
+    """
+    path = path or default_model_path()
+    with open(path, "rb") as f:
+        magic = f.read(len(ARTIFACT_MAGIC))
+    if magic == ARTIFACT_MAGIC:
+        return _bundle_from_artifact(path, device)
+    return _bundle_from_pickle(path, device)
+
+def load_bundle(device: str = "cpu") -> ModelBundle:
+    """Load the serving artifacts for INFERENCE_BACKEND (what app.py calls at startup)."""
+    return use_bundle(load_model_bundle(default_model_path(), device))
+
+def bundle_loaded() -> bool:
+    return _DEFAULT_SCORER is not None
 
 def split_num_cat(df: pd.DataFrame):
     """
@@ -347,240 +824,416 @@ def split_num_cat(df: pd.DataFrame):
     cat_df = df.select_dtypes(exclude=[np.number]).copy()
     return num_df, cat_df
 
-def rule_risk_from_df(df: pd.DataFrame) -> float:
-    """
-    Simple rule-based risk using the train.csv-style columns.
-    Returns a probability in [0, 1], higher = more risky.
-    """
-    row = df.iloc[0]
-
-    # These are set in build_df_from_user_payload():
-    #   Monthly_Inhand_Salary       ← income_monthly
-    #   Total_EMI_per_month        ← housing_cost_monthly + other_expenses_monthly
-    #   Amount_invested_monthly    ← invested
-    #   Num_of_Loan                ← num_loans
-    #   Num_Credit_Card            ← num_credit_cards
-
-    income = float(row.get("Monthly_Inhand_Salary", 0) or 0)
-    total_emi = float(row.get("Total_EMI_per_month", 0) or 0)
-    invested = float(row.get("Amount_invested_monthly", 0) or 0)
-    num_loans = float(row.get("Num_of_Loan", 0) or 0)
-    num_credit_cards = float(row.get("Num_Credit_Card", 0) or 0)
-
+def _first_row(df):
+    """Accept either a one-row DataFrame or an already-extracted row (Series/dict)."""
+    return df.iloc[0] if isinstance(df, pd.DataFrame) else df
+
+def _to_float(v) -> float:
+    # pd.to_numeric(v, errors="coerce") for one cell, without the pandas call
+    if isinstance(v, (int, float, np.number, np.bool_)):
+        return float(v)
+    if isinstance(v, str):
+        try:
+            return float(v.strip())
+        except ValueError:
+            return np.nan
+    return np.nan
+
+def _float_column(rows, col: str) -> np.ndarray:
+    """One column of a list of row dicts/Series as float64; missing or non-numeric → NaN."""
+    cells = [r.get(col) for r in rows]
+    try:
+        return np.array(cells, dtype=np.float64)   # numbers / None / numeric strings
+    except (TypeError, ValueError):
+        return np.fromiter((_to_float(x) for x in cells), dtype=np.float64, count=len(cells))
+
+# These are set in build_df_from_user_payload():
+#   Monthly_Inhand_Salary       ← income_monthly
+#   Total_EMI_per_month        ← housing_cost_monthly + other_expenses_monthly
+#   Amount_invested_monthly    ← invested
+#   Num_of_Loan                ← num_loans
+#   Num_Credit_Card            ← num_credit_cards
+# Missing, None and non-numeric values count as 0.
+RULE_RISK_COLS = ("Monthly_Inhand_Salary", "Total_EMI_per_month", "Amount_invested_monthly",
+                  "Num_of_Loan", "Num_Credit_Card")
+
+def _rule_risk(income, total_emi, invested, num_loans, num_credit_cards) -> np.ndarray:
     # Treat EMI + invested as the core monthly outflow
     total_expenses = total_emi + invested
 
     # Debt-to-income style ratio
-    dti = total_expenses / max(income, 1.0)  # avoid div-by-zero
+    dti = total_expenses / np.maximum(income, 1.0)  # avoid div-by-zero
 
     # Normalize counts into [0,1]
-    loan_factor = min(num_loans / 10.0, 1.0)
-    card_factor = min(num_credit_cards / 10.0, 1.0)
+    loan_factor = np.minimum(num_loans / 10.0, 1.0)
+    card_factor = np.minimum(num_credit_cards / 10.0, 1.0)
 
-    # Combine into rule-based risk
+    # Combine into rule-based risk, clamped to [0,1]
     risk = 0.6 * dti + 0.25 * loan_factor + 0.15 * card_factor
+    return np.clip(risk, 0.0, 1.0)
 
-    # Clamp to [0,1]
-    return float(np.clip(risk, 0.0, 1.0))
+def rule_risk_batch(df: pd.DataFrame) -> np.ndarray:
+    """
+    Simple rule-based risk using the train.csv-style columns, one value per row of df.
+    Returns probabilities in [0, 1], higher = more risky.
+    """
+    def col(name):
+        if name not in df.columns:
+            return np.zeros(len(df), dtype=np.float64)
+        v = pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64)
+        return np.where(np.isnan(v), 0.0, v)
+
+    return _rule_risk(*(col(c) for c in RULE_RISK_COLS))
+
+def rule_risk_rows(rows) -> np.ndarray:
+    """rule_risk_batch() for a list of rows (dicts or Series), without building a DataFrame."""
+    cols = []
+    for c in RULE_RISK_COLS:
+        v = _float_column(rows, c)
+        cols.append(np.where(np.isnan(v), 0.0, v))
+    return _rule_risk(*cols)
+
+def rule_risk_from_df(df: pd.DataFrame) -> float:
+    """rule_risk_rows() for one row (or a DataFrame's first row)."""
+    return float(rule_risk_rows([_first_row(df)])[0])
 
 
 # ───────────────── EXPLANATION (optional via Captum) ─────────────────
+# How reasons are produced for risky applicants:
+#   "none"         → no reasons (cheapest)
+#   "rules"        → rule-based fallback_reasons_dynamic() (default)
+#   "attributions" → Captum Integrated Gradients mapped to text, rules as top-up/fallback
+EXPLAIN_MODES = ("none", "rules", "attributions")
+EXPLAIN_MODE = os.environ.get("CREDIT_EXPLAIN_MODE", "rules").strip().lower()
+if EXPLAIN_MODE not in EXPLAIN_MODES:
+    warnings.warn(f"Unknown CREDIT_EXPLAIN_MODE={EXPLAIN_MODE!r}; using 'rules'.")
+    EXPLAIN_MODE = "rules"
+
+IG_N_STEPS = int(os.environ.get("CREDIT_IG_STEPS", 64))
+# Max rows per IG forward/backward (batch × n_steps); bounds memory on large batches
+IG_INTERNAL_BATCH = int(os.environ.get("CREDIT_IG_INTERNAL_BATCH", 4096))
+
 def try_import_captum():
     try:
         from captum.attr import IntegratedGradients
         return IntegratedGradients
     except Exception:
         return None
-def fallback_reasons_dynamic(df: pd.DataFrame, top_k: int = 4):
+
+def attributions_for_batch(x: np.ndarray, n_steps: int = None, bundle: ModelBundle = None):
     """
-    Rule-based reasons using CSV headers. Works even if Captum fails or is absent.
+    Integrated Gradients toward the "Poor" class for every row of x, in one Captum call.
+    Returns a (n_rows, n_features) array, or None if torch/Captum is missing or IG fails.
     """
-    reasons = []
-    row = df.iloc[0]
-
-    # Numeric pulls (coerce safely)
-    inc = pd.to_numeric(row.get("Monthly_Inhand_Salary"), errors="coerce")
-    emi = pd.to_numeric(row.get("Total_EMI_per_month"), errors="coerce")
-    inv = pd.to_numeric(row.get("Amount_invested_monthly"), errors="coerce")
-    util = pd.to_numeric(row.get("Credit_Utilization_Ratio"), errors="coerce")
-    debt = pd.to_numeric(row.get("Outstanding_Debt"), errors="coerce")
-
-    # Cash flow
-    if pd.notna(inc) and pd.notna(emi) and pd.notna(inv):
-        cash_flow = inc - (emi + inv)
-        if cash_flow < 0:
-            reasons.append("Negative monthly cash flow (expenses exceed income).")
-
-    # Monthly burden & DTI (uses only what the user would normally provide)
-    if pd.notna(inc) and inc > 0:
-        if pd.notna(emi):
-            burden = emi / inc
-            if burden >= 0.5:
-                reasons.append("High monthly burden relative to income (EMI/income).")
-        if pd.notna(inv):
-            dti_m = ((emi or 0.0) + (inv or 0.0)) / inc
-            if dti_m >= 0.5:
-                reasons.append("High debt-to-income ratio (monthly).")
-
-    # Utilization (if present)
-    if pd.notna(util) and util >= 0.6:
-        reasons.append("High credit utilization ratio.")
-
-    # Heuristics from categoricals
-    credit_mix = str(row.get("Credit_Mix", "")).strip().lower()
-    if credit_mix == "poor":
-        reasons.append("Bureau-reported credit mix indicates elevated risk.")
-
-    behaviour = str(row.get("Payment_Behaviour", "")).lower()
-    if "high_spent" in behaviour:
-        reasons.append("High spending pattern relative to income.")
-
-    loan_types = str(row.get("Type_of_Loan", "")).lower()
-    if "payday" in loan_types or "short-term" in loan_types:
-        reasons.append("Recent or frequent payday/short-term loans.")
-
-    # De-dup + cap
-    out, seen = [], set()
-    for r in reasons:
-        if r not in seen:
-            out.append(r); seen.add(r)
-        if len(out) >= top_k:
-            break
+    bundle = bundle or current_bundle()
+    if torch is None or bundle.network() is None:
+        return None
+    IG = try_import_captum()
+    if IG is None or len(x) == 0:
+        return None
+    try:
+        x = torch.from_numpy(np.ascontiguousarray(x, dtype=np.float32))
+        net = bundle.network()
+        net.eval()
+        ig = IG(net)
+        x_req = x.clone().requires_grad_(True)
+        attr = ig.attribute(
+            x_req, bundle.input_baseline(x), target=bundle.poor_index,
+            n_steps=n_steps or IG_N_STEPS, internal_batch_size=IG_INTERNAL_BATCH,
+        )
+        return attr.detach().cpu().numpy()
+    except Exception:
+        logging.getLogger(__name__).exception("Integrated Gradients failed; using rule reasons.")
+        return None
+
+# Reason text per model feature, used when turning attributions into reasons.
+NUM_FEATURE_REASONS = {
+    "Age":                      "Applicant age profile is associated with higher risk.",
+    "Annual_Income":            "Annual income is low for the requested credit.",
+    "Monthly_Inhand_Salary":    "Monthly income is low relative to obligations.",
+    "Num_Bank_Accounts":        "Number of bank accounts increases risk.",
+    "Num_Credit_Card":          "Number of credit cards increases revolving exposure.",
+    "Num_of_Loan":              "Number of concurrent loans increases affordability pressure.",
+    "Outstanding_Debt":         "High outstanding debt.",
+    "Total_EMI_per_month":      "High monthly payment burden (EMI).",
+    "Amount_invested_monthly":  "Monthly investment outflows reduce free cash flow.",
+}
+CAT_FEATURE_REASONS = {
+    "Month":                 "Application timing ({value}) is associated with higher risk.",
+    "Occupation":            "Occupation category ({value}) is associated with higher risk.",
+    "Credit_Mix":            "Reported credit mix ({value}) is unfavorable.",
+    "Payment_of_Min_Amount": "Minimum-payment behaviour ({value}) increases risk.",
+    "Payment_Behaviour":     "Spending pattern ({value}) is associated with higher risk.",
+}
+
+def feature_names(bundle: ModelBundle = None):
+    """Model input names in featurize() order: NUM_COLS_FIT, then (cat_col, category) per OHE slot."""
+    return (bundle or current_bundle()).feature_names()
 
-    if not out:
-        out = [
-            "Unfavorable income-to-expense balance.",
-            "Insufficient verified credit history.",
-            "Additional documentation required to assess affordability.",
-        ][:top_k]
+def summarize_reasons_dynamic(attr_vec: np.ndarray, row, top_k: int = 4, names=None):
+    """
+    Turn one row of Integrated Gradients attributions into text reasons.
+    Only features that push toward "Poor" (positive attribution) and that the applicant
+    actually supplied are used; unsupplied numeric columns are zero-filled by featurize()
+    and would otherwise surface as reasons the user never gave us.
+    """
+    names = names or feature_names()
+    row = _first_row(row)
+    out = []
+    for j in np.argsort(-np.asarray(attr_vec)):
+        if attr_vec[j] <= 0 or len(out) >= top_k:
+            break
+        name = names[j]
+        if isinstance(name, tuple):
+            col, value = name
+            text = CAT_FEATURE_REASONS.get(col, col.replace("_", " ") + " ({value}) increases risk.")
+            text = text.format(value=value.replace("_", " "))
+        elif _is_numeric_value(row.get(name)) and name in NUM_FEATURE_REASONS:
+            text = NUM_FEATURE_REASONS[name]
+        else:
+            continue
+        if text not in out:
+            out.append(text)
     return out
 
+def reasons_for_rows(x: np.ndarray, rows, mode: str = None, bundle: ModelBundle = None):
+    """
+    Reasons for a batch of risky rows (x[i] is the featurized rows[i]) per EXPLAIN_MODE.
+    Integrated Gradients, when enabled, runs once over the whole batch.
+    """
+    mode = mode or EXPLAIN_MODE
+    if mode == "none":
+        return [[] for _ in rows]
+
+    attrs = None
+    if mode == "attributions":
+        bundle = bundle or current_bundle()
+        with metrics.stage("captum"):
+            attrs = attributions_for_batch(x, bundle=bundle)
+
+    with metrics.stage("reasons"):
+        reasons = [[] for _ in rows]
+        if attrs is not None:
+            names = bundle.feature_names()
+            reasons = [summarize_reasons_dynamic(a, r, top_k=4, names=names) for a, r in zip(attrs, rows)]
+
+        # one columnar pass over the batch covers both the fallback reasons and the top-ups
+        _, rule_texts = rule_reasons(rows, RULE_REASONS, top_k=4)
+        return [
+            pad_reasons(rs or list(rt), r, extras=rt[:3])
+            for rs, rt, r in zip(reasons, rule_texts, rows)
+        ]
+
+# ───────────────── RULE-BASED REASONS (columnar) ─────────────────
+# Rule reasons are declared as tables of ReasonRule(id, score, message). `score` maps a
+# batch's ReasonInputs (one NumPy array per field, NaN = missing) to a (n_rows,) array where
+# 0 means the rule does not fire and higher ranks first; ties keep table order. rule_reasons()
+# evaluates a whole table over the batch at once and takes each row's top-k with
+# argpartition, so reasons for every adverse applicant in a re-scoring run cost a few array
+# ops per rule instead of pandas calls per field per row. IDs are stable API values.
+ReasonRule = namedtuple("ReasonRule", "id score message")
+
+# Penalty per canonical loan type for RISKY_LOAN_MIX (listed riskiest first in its message)
+LOAN_TYPE_PENALTIES = {
+    "Payday Loan":              0.35,
+    "Debt Consolidation Loan":  0.15,
+    "Personal Loan":            0.08,
+    "Student Loan":             0.05,
+    "Auto Loan":                0.04,
+    "Home Equity Loan":         0.03,
+    "Mortgage Loan":            0.02,
+    "Credit-Builder Loan":      0.00,
+}
+_LOAN_TYPES = list(CANONICAL_FLAGS)
+_LOAN_PENALTY_VEC = np.array([LOAN_TYPE_PENALTIES[t] for t in _LOAN_TYPES])
+_LOAN_BY_PENALTY = sorted(range(len(_LOAN_TYPES)), key=lambda j: -_LOAN_PENALTY_VEC[j])
+
+def _loan_flag_matrix(values) -> np.ndarray:
+    """(n, len(CANONICAL_FLAGS)) 0/1 matrix from Type_of_Loan strings, one parse per distinct value."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object).astype(str))
+    table = np.zeros((len(uniques), len(_LOAN_TYPES)), dtype=np.float64)
+    for u, val in enumerate(uniques):
+        tokens = val.split(", ")
+        if all(t in CANONICAL_FLAGS or t == "Not Specified" for t in tokens):
+            present = set(tokens)   # already canonical (build_row_from_user_payload)
+        else:
+            present, _ = normalize_loan_types(val)   # raw CSV text
+        for j, canon in enumerate(_LOAN_TYPES):
+            table[u, j] = canon in present
+    return table[codes]
+
+class ReasonInputs:
+    """The fields the reason rules read, coerced once for a whole batch of rows."""
+    NUMERIC = {
+        "inc": "Monthly_Inhand_Salary", "emi": "Total_EMI_per_month", "inv": "Amount_invested_monthly",
+        "util": "Credit_Utilization_Ratio", "debt": "Outstanding_Debt",
+        "n_acc": "Num_Bank_Accounts", "n_cc": "Num_Credit_Card", "n_loans": "Num_of_Loan",
+    }
+    TEXT = {"credit_mix": "Credit_Mix", "behaviour": "Payment_Behaviour", "loan_text": "Type_of_Loan"}
+
+    def __init__(self, data):
+        """`data`: a DataFrame, one row (dict/Series) or a list of rows, train.csv-shaped."""
+        if isinstance(data, pd.DataFrame):
+            self.n = n = len(data)
+            for attr, c in self.NUMERIC.items():
+                v = (pd.to_numeric(data[c], errors="coerce").to_numpy(dtype=np.float64)
+                     if c in data.columns else np.full(n, np.nan))
+                setattr(self, attr, v)
+            text = {attr: data[c].astype(str).tolist() if c in data.columns else [""] * n
+                    for attr, c in self.TEXT.items()}
+        else:
+            rows = [data] if isinstance(data, (dict, pd.Series)) else list(data)
+            self.n = n = len(rows)
+            for attr, c in self.NUMERIC.items():
+                setattr(self, attr, _float_column(rows, c))
+            text = {attr: [str(r.get(c, "")) for r in rows] for attr, c in self.TEXT.items()}
+
+        lower = {attr: np.char.lower(np.array(v, dtype=str).reshape(n)) for attr, v in text.items()}
+        self.credit_mix = np.char.strip(lower["credit_mix"])
+        self.high_spent = np.char.find(lower["behaviour"], "high_spent") >= 0
+        self.payday_text = ((np.char.find(lower["loan_text"], "payday") >= 0)
+                            | (np.char.find(lower["loan_text"], "short-term") >= 0))
+        self.loans = _loan_flag_matrix(text["loan_text"]) if n else np.zeros((0, len(_LOAN_TYPES)))
+
+    def loan_phrase(self, i: int) -> str:
+        return ", ".join(_LOAN_TYPES[j] for j in _LOAN_BY_PENALTY if self.loans[i, j])
+
+def _between(v, lo, hi):
+    return np.clip((v - lo) / (hi - lo), 0.0, 1.0)
+
+# Used for served reasons ("rules" mode, and to top up attribution reasons). Binary rules:
+# every firing rule scores 1, so reasons come out in table order.
+RULE_REASONS = [
+    ReasonRule("NEGATIVE_CASH_FLOW", lambda x: x.inc - (x.emi + x.inv) < 0,
+               "Negative monthly cash flow (expenses exceed income)."),
+    ReasonRule("HIGH_EMI_BURDEN", lambda x: (x.inc > 0) & (x.emi / x.inc >= 0.5),
+               "High monthly burden relative to income (EMI/income)."),
+    ReasonRule("HIGH_DTI", lambda x: (x.inc > 0) & ((x.emi + x.inv) / x.inc >= 0.5),
+               "High debt-to-income ratio (monthly)."),
+    ReasonRule("HIGH_UTILIZATION", lambda x: x.util >= 0.6,
+               "High credit utilization ratio."),
+    ReasonRule("POOR_CREDIT_MIX", lambda x: x.credit_mix == "poor",
+               "Bureau-reported credit mix indicates elevated risk."),
+    ReasonRule("HIGH_SPENDING", lambda x: x.high_spent,
+               "High spending pattern relative to income."),
+    ReasonRule("PAYDAY_LOANS", lambda x: x.payday_text,
+               "Recent or frequent payday/short-term loans."),
+]
+RULE_REASON_DEFAULTS = [
+    ("UNFAVORABLE_BALANCE", "Unfavorable income-to-expense balance."),
+    ("THIN_CREDIT_HISTORY", "Insufficient verified credit history."),
+    ("DOCUMENTATION_REQUIRED", "Additional documentation required to assess affordability."),
+]
+
+# Graded, model-agnostic signals (summarize_reasons): scores in [0, 1] rank the reasons.
+SUMMARY_REASONS = [
+    ReasonRule("EMI_BURDEN", lambda x: np.where((x.inc > 0) & ~np.isnan(x.emi), _between(x.emi / x.inc, 0.3, 0.9), 0.0),
+               "High monthly payment burden relative to income (EMI/income)."),
+    ReasonRule("INCOME_MISSING", lambda x: np.where((x.inc > 0) & ~np.isnan(x.emi), 0.0, 0.7),
+               "Income information is missing/zero, increasing uncertainty and risk."),
+    ReasonRule("MONTHLY_DTI", lambda x: np.where(x.inc > 0, _between((x.emi + x.inv) / x.inc, 0.3, 0.9), 0.0),
+               "Elevated monthly debt-to-income ratio."),
+    ReasonRule("WEAK_CASH_FLOW", lambda x: np.select([x.inc - (x.emi + x.inv) < 0, x.inc - (x.emi + x.inv) < 300],
+                                                     [0.9, 0.6], 0.0),
+               "Weak monthly cash flow after obligations."),
+    ReasonRule("UTILIZATION", lambda x: _between(x.util, 0.3, 0.8),
+               "High credit utilization ratio."),
+    ReasonRule("RISKY_LOAN_MIX", lambda x: np.minimum(0.5, x.loans @ _LOAN_PENALTY_VEC),
+               "Loan portfolio includes higher-risk products: {loans}."),
+    ReasonRule("HIGH_OUTFLOW_SPENDING", lambda x: 0.6 * x.high_spent,
+               "Spending pattern indicates high outflows relative to income."),
+    ReasonRule("UNFAVORABLE_CREDIT_MIX", lambda x: 0.7 * np.isin(x.credit_mix, ["bad", "poor"]),
+               "Reported credit mix is unfavorable."),
+    ReasonRule("OUTSTANDING_DEBT", lambda x: np.clip(x.debt / 15000.0, 0.0, 1.0),
+               "High outstanding debt relative to heuristic threshold."),
+    ReasonRule("NO_BANK_ACCOUNTS", lambda x: 0.3 * (x.n_acc <= 0),
+               "Very thin banking profile (no bank accounts)."),
+    ReasonRule("MANY_BANK_ACCOUNTS", lambda x: 0.2 * (x.n_acc >= 9),
+               "Many bank accounts may add complexity to obligations."),
+    ReasonRule("MANY_CREDIT_CARDS", lambda x: 0.45 * (x.n_cc >= 8),
+               "Many credit cards may indicate elevated revolving exposure."),
+    ReasonRule("SEVERAL_CREDIT_CARDS", lambda x: 0.30 * ((x.n_cc >= 5) & (x.n_cc < 8)),
+               "Several credit cards increase potential utilization/inquiries."),
+    ReasonRule("NO_CREDIT_CARDS", lambda x: 0.15 * (x.n_cc == 0),
+               "No credit cards: thin revolving history."),
+    ReasonRule("MANY_LOANS", lambda x: 0.65 * (x.n_loans >= 6),
+               "Many concurrent loans increase affordability pressure."),
+    ReasonRule("MULTIPLE_LOANS", lambda x: 0.40 * ((x.n_loans >= 4) & (x.n_loans < 6)),
+               "Multiple concurrent loans increase affordability pressure."),
+    ReasonRule("NO_LOANS", lambda x: 0.08 * (x.n_loans == 0),
+               "No active loans: limited installment credit history."),
+]
+SUMMARY_REASON_DEFAULTS = [
+    ("INSUFFICIENT_DATA",
+     "Insufficient data to identify strong drivers; additional information may improve assessment."),
+]
+
+def rule_reason_scores(data, rules=RULE_REASONS) -> np.ndarray:
+    """(n_rows, n_rules) scores in [0, 1] (0 = rule does not fire) for `rules` over `data`."""
+    x = data if isinstance(data, ReasonInputs) else ReasonInputs(data)
+    scores = np.zeros((x.n, len(rules)), dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for j, rule in enumerate(rules):
+            scores[:, j] = np.asarray(rule.score(x), dtype=np.float64)
+    # rounded so float noise (0.35 + 0.05 < 0.4) can't reorder reasons that score the same
+    return np.round(np.nan_to_num(np.clip(scores, 0.0, 1.0), nan=0.0), 9)
+
+def rule_reasons(data, rules=RULE_REASONS, top_k: int = 4, defaults=RULE_REASON_DEFAULTS):
+    """
+    Top-k rule reasons per row. Returns (ids, texts): two lists with one list per row.
+    Rows where no rule fires get `defaults` (id, text) pairs instead.
+    """
+    x = data if isinstance(data, ReasonInputs) else ReasonInputs(data)
+    scores = rule_reason_scores(x, rules)
+    n_rules = len(rules)
+    k = max(0, min(top_k, n_rules))
+    if x.n == 0 or k == 0:
+        return [[] for _ in range(x.n)], [[] for _ in range(x.n)]
+
+    # ties rank in table order: nudge later rules down by less than any real score gap
+    key = scores - np.arange(n_rules) * 1e-12
+    top = np.argpartition(-key, k - 1, axis=1)[:, :k] if k < n_rules else np.tile(np.arange(n_rules), (x.n, 1))
+    top = np.take_along_axis(top, np.argsort(-np.take_along_axis(key, top, axis=1), axis=1), axis=1)
+    fired = np.take_along_axis(scores, top, axis=1) > 0
+
+    rule_ids = np.array([r.id for r in rules], dtype=object)
+    messages = [r.message for r in rules]
+    default_ids = [d[0] for d in defaults[:top_k]]
+    default_texts = [d[1] for d in defaults[:top_k]]
+    ids_out, texts_out = [], []
+    for i in range(x.n):   # list assembly only; every score above was computed column-wise
+        sel = top[i][fired[i]]
+        if len(sel) == 0:
+            ids_out.append(list(default_ids))
+            texts_out.append(list(default_texts))
+            continue
+        ids_out.append(rule_ids[sel].tolist())
+        texts_out.append([messages[j].format(loans=x.loan_phrase(i)) if "{loans}" in messages[j] else messages[j]
+                          for j in sel])
+    return ids_out, texts_out
+
+def fallback_reasons_dynamic(df: pd.DataFrame, top_k: int = 4):
+    """
+    Rule-based reasons using CSV headers. Works even if Captum fails or is absent.
+    """
+    return rule_reasons(_first_row(df), RULE_REASONS, top_k, RULE_REASON_DEFAULTS)[1][0]
+
 def summarize_reasons(row_df: pd.DataFrame, top_k: int = 4):
     """
     Model-agnostic, column-agnostic reason generator.
     It derives interpretable signals directly from the input row (no reliance on
     fitted column orders or OHE feature names). Returns top_k reason strings.
     """
-    row = row_df.iloc[0]
-
-    # Safe pulls
-    inc  = pd.to_numeric(row.get("Monthly_Inhand_Salary"), errors="coerce")
-    emi  = pd.to_numeric(row.get("Total_EMI_per_month"), errors="coerce")
-    inv  = pd.to_numeric(row.get("Amount_invested_monthly"), errors="coerce")
-    util = pd.to_numeric(row.get("Credit_Utilization_Ratio"), errors="coerce")
-    debt = pd.to_numeric(row.get("Outstanding_Debt"), errors="coerce")
-
-    n_acc   = pd.to_numeric(row.get("Num_Bank_Accounts"), errors="coerce")
-    n_cc    = pd.to_numeric(row.get("Num_Credit_Card"), errors="coerce")
-    n_loans = pd.to_numeric(row.get("Num_of_Loan"), errors="coerce")
-
-    credit_mix = str(row.get("Credit_Mix", "")).strip().lower()
-    behaviour  = str(row.get("Payment_Behaviour", "")).lower()
-    tol_raw    = row.get("Type_of_Loan", "")
-
-    # Helper to push a (score, text) entry if score > 0
-    reasons_scored = []
-    def add(score, text):
-        s = float(max(0.0, min(1.0, score)))
-        if s > 0:
-            reasons_scored.append((s, text))
-
-    # ---- Burden / DTI ----
-    if pd.notna(inc) and inc > 0 and pd.notna(emi):
-        burden = float(emi) / float(inc)
-        # scale: 0 at 0.3 → 1 at 0.9+
-        add(np.clip((burden - 0.3) / 0.6, 0.0, 1.0),
-            "High monthly payment burden relative to income (EMI/income).")
-    else:
-        add(0.7, "Income information is missing/zero, increasing uncertainty and risk.")
-
-    if pd.notna(inc) and pd.notna(emi) and pd.notna(inv) and inc > 0:
-        dti_m = (float(emi) + float(inv)) / float(inc)
-        add(np.clip((dti_m - 0.3) / 0.6, 0.0, 1.0),
-            "Elevated monthly debt-to-income ratio.")
-
-    # ---- Cash flow ----
-    if pd.notna(inc) and pd.notna(emi) and pd.notna(inv):
-        cash_flow = float(inc) - (float(emi) + float(inv))
-        add(0.9 if cash_flow < 0 else (0.6 if cash_flow < 300 else 0.0),
-            "Weak monthly cash flow after obligations.")
-
-    # ---- Utilization ----
-    if pd.notna(util):
-        add(np.clip((float(util) - 0.3) / 0.5, 0.0, 1.0),
-            "High credit utilization ratio.")
-
-    # ---- Loan types (normalized) ----
-    matched_types, _ = normalize_loan_types(tol_raw)
-    type_penalties = {
-        "Payday Loan":              0.35,
-        "Debt Consolidation Loan":  0.15,
-        "Personal Loan":            0.08,
-        "Student Loan":             0.05,
-        "Auto Loan":                0.04,
-        "Home Equity Loan":         0.03,
-        "Mortgage Loan":            0.02,
-        "Credit-Builder Loan":      0.00,
-    }
-    if matched_types:
-        loan_risk = min(0.5, sum(type_penalties.get(t, 0.05) for t in matched_types))
-        # Build a readable phrase of risky types first
-        sorted_types = sorted(matched_types, key=lambda t: type_penalties.get(t, 0.05), reverse=True)
-        add(loan_risk, f"Loan portfolio includes higher-risk products: {', '.join(sorted_types)}.")
-
-    # ---- Behaviour / Mix ----
-    if "high_spent" in behaviour:
-        add(0.6, "Spending pattern indicates high outflows relative to income.")
-    if credit_mix in {"bad", "poor"}:
-        add(0.7, "Reported credit mix is unfavorable.")
-
-    # ---- Debt level ----
-    if pd.notna(debt):
-        add(np.clip(float(debt) / 15000.0, 0.0, 1.0),
-            "High outstanding debt relative to heuristic threshold.")
-
-    # ---- Counts (accounts/cards/loans) ----
-    if pd.notna(n_acc):
-        if n_acc <= 0:
-            add(0.3, "Very thin banking profile (no bank accounts).")
-        elif n_acc >= 9:
-            add(0.2, "Many bank accounts may add complexity to obligations.")
-    if pd.notna(n_cc):
-        if n_cc >= 8:
-            add(0.45, "Many credit cards may indicate elevated revolving exposure.")
-        elif n_cc >= 5:
-            add(0.30, "Several credit cards increase potential utilization/inquiries.")
-        elif n_cc == 0:
-            add(0.15, "No credit cards: thin revolving history.")
-    if pd.notna(n_loans):
-        if n_loans >= 6:
-            add(0.65, "Many concurrent loans increase affordability pressure.")
-        elif n_loans >= 4:
-            add(0.40, "Multiple concurrent loans increase affordability pressure.")
-        elif n_loans == 0:
-            add(0.08, "No active loans: limited installment credit history.")
-
-    # Rank by score, then de-duplicate by message
-    reasons_scored.sort(key=lambda x: x[0], reverse=True)
-    out, seen = [], set()
-    for _, text in reasons_scored:
-        if text not in seen:
-            out.append(text)
-            seen.add(text)
-        if len(out) >= top_k:
-            break
-
-    # Fallback if empty
-    if not out:
-        out = [
-            "Insufficient data to identify strong drivers; additional information may improve assessment."
-        ]
-    return out
+    return rule_reasons(_first_row(row_df), SUMMARY_REASONS, top_k, SUMMARY_REASON_DEFAULTS)[1][0]
 
 # ───────────────── USER PAYLOAD → ROW ─────────────────
-def build_df_from_user_payload(payload: Dict[str, Any]) -> pd.DataFrame:
+def resolve_application_month(payload: Dict[str, Any]) -> str:
+    # application_month defaults to the current (UTC) month
+    return payload.get("application_month") or datetime.utcnow().strftime("%B")
+
+def build_row_from_user_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Construct a single-row DataFrame with the SAME COLUMNS as train.csv.
+    Construct one train.csv-shaped row (column -> value) from a user payload.
     Fill user-provided fields; leave others as safe defaults.
     """
     row = {c: "UNKNOWN" for c in TRAIN_COLUMNS}
@@ -592,7 +1245,7 @@ def build_df_from_user_payload(payload: Dict[str, Any]) -> pd.DataFrame:
     loans           = payload.get("loans", []) or []
     role            = payload.get("employment_role", "Unknown")
     age             = payload.get("age", 0)
-    month           = payload.get("application_month") or datetime.utcnow().strftime("%B")
+    month           = resolve_application_month(payload)
     paying          = payload.get("spending_pattern_hint", None)  # e.g. Payment_Behaviour
     status          = payload.get("status_hint", None)            # e.g. Credit_Mix
     numCC           = payload.get("num_credit_cards", 0)
@@ -647,56 +1300,175 @@ def build_df_from_user_payload(payload: Dict[str, Any]) -> pd.DataFrame:
     if status and "Credit_Mix" in row:        row["Credit_Mix"] = status  # Good/Standard/Bad per your data
     # Defaults that don’t over-reward
 
+    return row
 
+def build_df_from_user_payload(payload: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Construct a single-row DataFrame with the SAME COLUMNS as train.csv.
+    """
+    return pd.DataFrame([build_row_from_user_payload(payload)], columns=TRAIN_COLUMNS)
 
-    return pd.DataFrame([row], columns=TRAIN_COLUMNS)
+def build_df_from_user_payloads(payloads) -> pd.DataFrame:
+    """
+    Batch version of build_df_from_user_payload(): one row per payload, one DataFrame build.
+    """
+    rows = [build_row_from_user_payload(p) for p in payloads]
+    return pd.DataFrame(rows, columns=TRAIN_COLUMNS)
 
-def featurize(df: pd.DataFrame) -> np.ndarray:
-    # uses your existing split_num_cat, NUM_COLS_FIT, CAT_COLS_FIT, ohe, scaler
+def _sklearn_featurize(df: pd.DataFrame, ohe, scaler, num_cols, cat_cols, scale: bool = True) -> np.ndarray:
     num_df, cat_df = split_num_cat(df)
-    num_aligned = num_df.reindex(columns=NUM_COLS_FIT, fill_value=0.0).values
-    cat_aligned = cat_df.reindex(columns=CAT_COLS_FIT, fill_value="UNKNOWN")
-    X_num = scaler.transform(num_aligned)
+    num_aligned = num_df.reindex(columns=num_cols, fill_value=0.0).values
+    cat_aligned = cat_df.reindex(columns=cat_cols, fill_value="UNKNOWN")
+    X_num = scaler.transform(num_aligned) if scale else num_aligned
     X_cat = ohe.transform(cat_aligned)
     return np.hstack([X_num, X_cat]).astype(np.float32)
 
+def featurize(df: pd.DataFrame, scale: bool = True, bundle: ModelBundle = None) -> np.ndarray:
+    # uses your existing split_num_cat, NUM_COLS_FIT, CAT_COLS_FIT, ohe, scaler
+    # scale=False leaves numeric columns raw (input for the fused model)
+    return (bundle or current_bundle()).featurize(df, scale=scale)
+
+def _model_takes_raw_inputs(bundle: ModelBundle = None) -> bool:
+    return (bundle or current_bundle()).raw_inputs
+
+def model_inputs_df(df: pd.DataFrame, bundle: ModelBundle = None) -> np.ndarray:
+    """float32 inputs for the active network, one row per df row."""
+    return (bundle or current_bundle()).inputs_df(df)
+
 def transform_df_for_model(df: pd.DataFrame) -> torch.Tensor:
-    X_all = featurize(df)
-    return torch.tensor(X_all, dtype=torch.float32)
-
-def predict_with_reasons_df(df: pd.DataFrame):
-    # 1. Access the global model variable
-    global model
-    
-    # 2. CHECK: If the model is empty, load it now!
-    if model is None:
-        print("⚠️ Model not found in memory. Loading artifacts now...")
-        load_pickle_bundle()
-    
-    # 3. Proceed with prediction
-    x = transform_df_for_model(df)
-    with torch.no_grad():
-        logits = model(x)  # Now this will work because model is loaded
-        probs = torch.softmax(logits, dim=1).cpu().numpy()[0]
+    return torch.from_numpy(model_inputs_df(df))
 
-    # Raw NN view (still useful to return and to gate Captum)
-    top_idx = int(np.argmax(probs))
-    nn_decision = CLASS_NAMES[top_idx]
-    confidence = float(probs[top_idx]) * 100.0
-    p_nn_poor = float(probs[CLASS_NAMES.index("Poor")])
+def predict_proba(X: np.ndarray, bundle: ModelBundle = None) -> np.ndarray:
+    """Class probabilities from the active backend (NumPy MLP, fused graph or original MLP)."""
+    return (bundle or current_bundle()).predict_proba(X)
+
+# ───────────────── COMPILED FEATURE PLAN (fast single-row path) ─────────────────
+# featurize() pays for a DataFrame, select_dtypes, two reindex calls and two sklearn
+# transforms per request. The plan below is compiled once from the fitted scaler/OHE and
+# writes a build_row_from_user_payload() dict straight into a float32 vector.
+
+def _is_numeric_value(v) -> bool:
+    # Mirrors select_dtypes(include=np.number) on a one-row frame (bools are not numeric there)
+    return isinstance(v, (int, float, np.number)) and not isinstance(v, (bool, np.bool_))
+
+class FeaturePlan:
+    """
+    Precomputed scaler arrays + OHE category -> column lookup for NUM_COLS_FIT/CAT_COLS_FIT.
+    transform_row() produces the same float32 vector as featurize() on a one-row frame.
+    """
+    def __init__(self, num_cols, cat_cols, mean, scale, categories):
+        self.num_cols = list(num_cols)
+        self.cat_cols = list(cat_cols)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.n_num = len(self.num_cols)
+
+        # One {category: output column} dict per categorical column, in OHE order
+        self.categories = [list(cats) for cats in categories]
+        self.cat_index = []
+        offset = self.n_num
+        for cats in categories:
+            self.cat_index.append({c: offset + j for j, c in enumerate(cats)})
+            offset += len(cats)
+        self.dim = offset
+
+    def transform_row(self, row: Dict[str, Any], scale: bool = True) -> np.ndarray:
+        out = np.zeros((1, self.dim), dtype=np.float32)
+
+        num = np.zeros(self.n_num, dtype=np.float64)  # reindex(fill_value=0.0)
+        for j, c in enumerate(self.num_cols):
+            v = row.get(c)
+            if _is_numeric_value(v):
+                num[j] = v
+        if scale:
+            # Same float64 ops and order as StandardScaler.transform, then one cast to float32
+            num -= self.mean
+            num /= self.scale
+        out[0, :self.n_num] = num
+
+        for c, lookup in zip(self.cat_cols, self.cat_index):
+            v = row.get(c, "UNKNOWN")
+            if _is_numeric_value(v):
+                v = "UNKNOWN"  # numeric columns never reach the OHE
+            try:
+                idx = lookup.get(v)
+            except TypeError:
+                idx = None
+            if idx is not None:  # unknown categories → all zeros (handle_unknown="ignore")
+                out[0, idx] = 1.0
+        return out
+
+    def transform_df(self, df: pd.DataFrame, scale: bool = True) -> np.ndarray:
+        """featurize() for a whole frame, with split_num_cat()'s dtype rules, without sklearn."""
+        out = np.zeros((len(df), self.dim), dtype=np.float32)
+        numeric = set(df.select_dtypes(include=[np.number]).columns)
+
+        num = np.zeros((len(df), self.n_num), dtype=np.float64)
+        for j, c in enumerate(self.num_cols):
+            if c in numeric:
+                num[:, j] = df[c].to_numpy(dtype=np.float64)
+        if scale:
+            num -= self.mean
+            num /= self.scale
+        out[:, :self.n_num] = num
+
+        rows = np.arange(len(df))
+        for c, lookup in zip(self.cat_cols, self.cat_index):
+            if c not in df.columns or c in numeric:
+                idx = lookup.get("UNKNOWN")
+                if idx is not None:
+                    out[:, idx] = 1.0
+                continue
+            cols = df[c].map(lookup).to_numpy(dtype=np.float64)
+            hit = ~np.isnan(cols)
+            out[rows[hit], cols[hit].astype(np.intp)] = 1.0
+        return out
+
+# Canned payloads used to check a freshly compiled plan against featurize()
+_PLAN_CHECK_PAYLOADS = [
+    {"income_monthly": 5200.0, "housing_cost_monthly": 1400.0, "other_expenses_monthly": 250.0,
+     "employment_role": "professional", "loans": ["Auto Loan", "Mortgage"], "age": 34,
+     "application_month": "March", "num_credit_cards": 3, "num_bank_accounts": 2,
+     "num_loans": 2, "invested": 300.0},
+    {"income_monthly": 900.0, "housing_cost_monthly": 1100.0, "employment_role": "astronaut",
+     "loans": ["payday"], "age": 22.5, "application_month": "December", "num_credit_cards": 9,
+     "num_bank_accounts": 0, "num_loans": 7, "invested": 0.0,
+     "spending_pattern_hint": "High_spent_Small_value_payments", "status_hint": "Bad"},
+]
 
-    # ---- Hybrid risk: combine calibrated NN risk with rule risk ----
-    # Use probabilistic OR so a strong rule-based signal will produce a high blended risk:
-    #   p_combined = 1 - (1 - p_nn) * (1 - p_rule)  => p_nn + p_rule - p_nn*p_rule
-    p_rule_poor = rule_risk_from_df(df)           # in [0,1]
-    p_poor = float(p_nn_poor + p_rule_poor - (p_nn_poor * p_rule_poor))
-    p_poor = max(0.0, min(1.0, p_poor))
+def compile_feature_plan(ohe, scaler, num_cols, cat_cols):
+    """
+    Build a FeaturePlan from the fitted encoders, or return None (→ featurize() is used)
+    if the encoders use options the plan does not reproduce or the parity check fails.
+    """
+    try:
+        if getattr(ohe, "drop_idx_", None) is not None or getattr(ohe, "_infrequent_enabled", False):
+            return None
+        if getattr(ohe, "handle_unknown", "ignore") != "ignore":
+            return None
+        n_num = len(num_cols)
+        mean = scaler.mean_ if getattr(scaler, "with_mean", True) else np.zeros(n_num)
+        scale = scaler.scale_ if getattr(scaler, "with_std", True) else np.ones(n_num)
+        plan = FeaturePlan(num_cols, cat_cols, mean, scale, ohe.categories_)
+
+        for payload in _PLAN_CHECK_PAYLOADS:
+            row = build_row_from_user_payload(payload)
+            expected = _sklearn_featurize(pd.DataFrame([row], columns=TRAIN_COLUMNS),
+                                          ohe, scaler, num_cols, cat_cols)
+            if not np.array_equal(plan.transform_row(row), expected):
+                warnings.warn("Compiled feature plan does not match featurize(); using featurize().")
+                return None
+        return plan
+    except Exception as e:
+        warnings.warn(f"Could not compile feature plan ({type(e).__name__}: {e}); using featurize().")
+        return None
 
-    # Map blended risk to score/band
-    credit_score = probability_to_score(p_poor, method="linear")
-    band = score_band(credit_score)
+def model_inputs_row(row: Dict[str, Any], bundle: ModelBundle = None) -> np.ndarray:
+    """(1, n_features) inputs for the active network from one build_row_from_user_payload() row."""
+    return (bundle or current_bundle()).inputs_row(row)
 
-    # User-facing decision aligned with band
+def decision_and_message(band: str, nn_decision: str, credit_score: float, confidence: float):
+    """User-facing decision + message, both aligned with the score band."""
     if band in {"Poor"}:
         decision = "Poor"
     elif band in {"Fair"}:
@@ -708,50 +1480,389 @@ def predict_with_reasons_df(df: pd.DataFrame):
     # Icon by band (not by raw NN class)
     icon = "⚠️" if band in {"Poor","Fair"} else ("✅" if band in {"Very Good","Excellent"} else "⚖️")
     message = f"{icon} Score {credit_score:.0f} ({band}). Confidence {confidence:.1f}%."
+    return decision, message
+
+def pad_reasons(reasons, row, min_count: int = 3, extras=None):
+    """
+    Top up a reason list with rule-based reasons until it has min_count entries.
+    `extras`: the row's rule reasons when the caller already has them (see reasons_for_rows).
+    """
+    if len(reasons) < min_count:
+        if extras is None:
+            extras = fallback_reasons_dynamic(row, top_k=min_count)
+        for r in extras:
+            if r not in reasons:
+                reasons.append(r)
+            if len(reasons) >= min_count:
+                break
+    return reasons
+
+def predict_with_reasons_df(df: pd.DataFrame, bundle: ModelBundle = None):
+    # 1. CHECK: If the model is empty, load it now!
+    bundle = bundle or current_bundle()
+
+    # 2. Proceed with prediction
+    with metrics.stage("featurize"):
+        x = bundle.inputs_df(df)
+    return predict_with_reasons_row(_first_row(df), x, bundle)
+
+def predict_with_reasons_row(row, x: np.ndarray, bundle: ModelBundle = None):
+    """Score one already-featurized row; `row` is the train.csv-shaped record behind `x`."""
+    bundle = bundle or current_bundle()
+    with metrics.stage("forward"):
+        probs = bundle.predict_proba(x)[0]
+
+    # Raw NN view (still useful to return and to gate Captum)
+    top_idx = int(np.argmax(probs))
+    nn_decision = bundle.class_names[top_idx]
+    confidence = float(probs[top_idx]) * 100.0
+    p_nn_poor = float(probs[bundle.poor_index])
+
+    with metrics.stage("rules"):
+        # ---- Hybrid risk: combine calibrated NN risk with rule risk (see blend_risk_batch) ----
+        p_rule_poor = rule_risk_from_df(row)          # in [0,1]
+        p_poor = blend_risk(p_nn_poor, p_rule_poor)
+
+        # Map blended risk to score/band
+        credit_score = probability_to_score(p_poor, method="linear")
+        band = score_band(credit_score)
+
+    decision, message = decision_and_message(band, nn_decision, credit_score, confidence)
 
     # ----- Reasons (always for risky cases) -----
     reasons = []
     need_reasons = (band in {"Poor","Fair"}) or (p_poor >= 0.5)
     if need_reasons:
-        IG = try_import_captum()
-        attr_ok = False
-        if IG is not None:
-            try:
-                model.eval()
-                target_idx = CLASS_NAMES.index("Poor")
-                ig = IG(model)
-                baseline = torch.zeros_like(x)
-                x_req = x.clone().requires_grad_(True)
-                attr = ig.attribute(x_req, baseline, target=target_idx, n_steps=64)
-                attr_vec = attr.detach().cpu().numpy().reshape(-1)
-                # (Optional) summarize attributions if you implemented a dynamic summarizer.
-                # reasons = summarize_reasons_dynamic(attr_vec, df, top_k=4)
-                attr_ok = True
-            except Exception:
-                attr_ok = False
-
-        if (not attr_ok) or (not reasons):
-            reasons = fallback_reasons_dynamic(df, top_k=4)
-
-        if len(reasons) < 3:
-            extras = fallback_reasons_dynamic(df, top_k=3)
-            for r in extras:
-                if r not in reasons:
-                    reasons.append(r)
-                if len(reasons) >= 3:
-                    break
+        reasons = reasons_for_rows(x, [row], bundle=bundle)[0]
 
     return {
         "decision": decision,                                   # user-facing (band-aligned)
         "confidence": round(confidence, 1),
-        "probabilities": {k: float(v) for k, v in zip(CLASS_NAMES, probs)},  # raw NN probs
+        "probabilities": {k: float(v) for k, v in zip(bundle.class_names, probs)},  # raw NN probs
         "risk_probability": round(p_poor, 6),                   # blended risk
         "credit_score": round(credit_score, 0),
         "band": band,
         "message": message,
         "reasons": reasons,
+        "model_version": bundle.version,
+    }
+
+# ───────────────── RESULT CACHE ─────────────────
+# Applicants resubmit identical forms (frontend retries, page refreshes, gateway re-scores on
+# page load). Results are cached per (bundle fingerprint, explain mode, canonical payload).
+RESULT_CACHE_SIZE = int(os.environ.get("CREDIT_CACHE_SIZE", 10000))   # 0 disables the cache
+RESULT_CACHE_TTL_S = float(os.environ.get("CREDIT_CACHE_TTL_S", 300))
+
+class ResultCache:
+    """Thread-safe LRU + TTL cache of scoring results with hit/miss counters."""
+
+    def __init__(self, maxsize: int, ttl_s: float):
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self.fingerprint = None
+        self._data = OrderedDict()   # key -> (expires_at, result)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def bind(self, fingerprint: str):
+        """Drop every entry if a different bundle was loaded."""
+        with self._lock:
+            if fingerprint != self.fingerprint:
+                if self._data:
+                    self.invalidations += 1
+                self._data.clear()
+                self.fingerprint = fingerprint
+
+    def get(self, key):
+        if self.maxsize <= 0:
+            return None
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            if item[0] < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(item[1])   # callers may mutate what they get back
+
+    def put(self, key, result):
+        if self.maxsize <= 0:
+            return
+        value = (time.monotonic() + self.ttl_s, copy.deepcopy(result))
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data), "maxsize": self.maxsize, "ttl_s": self.ttl_s,
+                "hits": self.hits, "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions, "expirations": self.expirations,
+                "invalidations": self.invalidations, "bundle_fingerprint": self.fingerprint,
+            }
+
+RESULT_CACHE = ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL_S)
+
+def _canonical_value(v):
+    if isinstance(v, (int, float, np.number)) and not isinstance(v, (bool, np.bool_)):
+        return float(v)   # 5000 and 5000.0 score the same
+    if isinstance(v, (list, tuple, set)):
+        return sorted(str(x) for x in v)   # loan order does not matter
+    return v
+
+def canonical_payload(payload: Dict[str, Any]) -> str:
+    """The payload as canonical JSON (numbers as floats, loans sorted, month resolved)."""
+    canon = {k: _canonical_value(v) for k, v in payload.items()}
+    canon["application_month"] = resolve_application_month(payload)
+    return json.dumps(canon, sort_keys=True, default=str)
+
+def result_cache_key(payload: Dict[str, Any], bundle: ModelBundle = None):
+    """Canonical cache key: bundle fingerprint + explain mode + payload with the month resolved."""
+    bundle = bundle or current_bundle()
+    return (bundle.fingerprint, EXPLAIN_MODE, canonical_payload(payload))
+
+def predict_from_user_payload(payload: Dict[str, Any], bundle: ModelBundle = None):
+    bundle = bundle or current_bundle()
+    key = result_cache_key(payload, bundle)
+    result = RESULT_CACHE.get(key)
+    if result is None:
+        with metrics.stage("build"):
+            row = build_row_from_user_payload(payload)
+        with metrics.stage("featurize"):
+            x = bundle.inputs_row(row)
+        result = predict_with_reasons_row(row, x, bundle)
+        RESULT_CACHE.put(key, result)
+    return result
+
+def predict_batch_df(df: pd.DataFrame, bundle: ModelBundle = None):
+    """
+    Batch version of predict_with_reasons_df(): one featurize, one forward pass and
+    vectorized rule/score/band math over every row of df. Returns one result dict per row.
+    """
+    bundle = bundle or current_bundle()
+    if len(df) == 0:
+        return []
+    with metrics.stage("featurize"):
+        x = bundle.inputs_df(df)
+    return _predict_featurized_batch(
+        x, lambda: rule_risk_batch(df), lambda idx: df.iloc[idx].to_dict("records"), bundle,
+    )
+
+def predict_batch_rows(rows, bundle: ModelBundle = None):
+    """
+    predict_batch_df() for a list of build_row_from_user_payload() rows, featurized with the
+    compiled plan. Cheaper than building a DataFrame for the small batches the API forms.
+    """
+    bundle = bundle or current_bundle()
+    if len(rows) == 0:
+        return []
+    with metrics.stage("featurize"):
+        x = np.vstack([bundle.inputs_row(r) for r in rows])
+    return _predict_featurized_batch(x, lambda: rule_risk_rows(rows), lambda idx: [rows[i] for i in idx], bundle)
+
+def _predict_featurized_batch(x: np.ndarray, rule_risk_for, records_for, bundle: ModelBundle):
+    """
+    Shared batch tail: forward pass, hybrid risk/score/band, reasons for risky rows.
+    rule_risk_for() returns the rule risk of every row; records_for(idx) the rows at idx.
+    """
+    with metrics.stage("forward"):
+        probs = bundle.predict_proba(x)
+    n = len(probs)
+
+    top_idx = probs.argmax(axis=1)
+    confidence = probs[np.arange(len(probs)), top_idx].astype(np.float64) * 100.0
+    p_nn_poor = probs[:, bundle.poor_index].astype(np.float64)
+
+    # Hybrid risk (probabilistic OR), score and band, all vectorized
+    with metrics.stage("rules"):
+        p_poor = blend_risk_batch(p_nn_poor, rule_risk_for())
+        credit_score = probability_to_score_batch(p_poor)
+        band = score_band_batch(credit_score)
+    need_reasons = np.isin(band, ["Poor", "Fair"]) | (p_poor >= 0.5)
+
+    # Reasons for every risky row at once (one batched IG call in "attributions" mode)
+    reasons = [[] for _ in range(n)]
+    risky_idx = np.flatnonzero(need_reasons)
+    if len(risky_idx):
+        records = records_for(risky_idx)
+        for i, rs in zip(risky_idx, reasons_for_rows(x[risky_idx], records, bundle=bundle)):
+            reasons[i] = rs
+
+    results = []
+    for i in range(n):
+        decision, message = decision_and_message(
+            band[i], bundle.class_names[top_idx[i]], credit_score[i], confidence[i]
+        )
+        results.append({
+            "decision": decision,
+            "confidence": round(float(confidence[i]), 1),
+            "probabilities": {k: float(v) for k, v in zip(bundle.class_names, probs[i])},
+            "risk_probability": round(float(p_poor[i]), 6),
+            "credit_score": round(float(credit_score[i]), 0),
+            "band": str(band[i]),
+            "message": message,
+            "reasons": reasons[i],
+            "model_version": bundle.version,
+        })
+    return results
+
+# Batches up to this size skip the DataFrame and use the compiled feature plan per row
+PLAN_BATCH_MAX = 256
+
+def predict_batch_from_user_payloads(payloads, bundle: ModelBundle = None):
+    bundle = bundle or current_bundle()
+    keys = [result_cache_key(p, bundle) for p in payloads]
+    results = [RESULT_CACHE.get(k) for k in keys]
+    todo = [i for i, r in enumerate(results) if r is None]
+    if not todo:
+        return results
+
+    with metrics.stage("build"):
+        rows = [build_row_from_user_payload(payloads[i]) for i in todo]
+        use_plan = bundle.feature_plan is not None and len(rows) <= PLAN_BATCH_MAX
+        df = None if use_plan else pd.DataFrame(rows, columns=TRAIN_COLUMNS)
+    scored = predict_batch_rows(rows, bundle) if use_plan else predict_batch_df(df, bundle)
+    for i, res in zip(todo, scored):
+        RESULT_CACHE.put(keys[i], res)
+        results[i] = res
+    return results
+
+# ───────────────── WARM-UP ─────────────────
+# The first requests on a fresh bundle pay one-off costs: torch/BLAS kernel selection and
+# first allocations for each batch shape, the Captum import and first IG pass (attributions
+# mode), the loan/occupation lookups and their caches. warm_up() pays them before the bundle
+# takes traffic, with synthetic applicants covering every branch: a safe and a risky profile
+# (no reasons / rule or IG reasons), each canonical loan type plus an ignored one, the
+# single-row, plan-batch and DataFrame paths. It bypasses RESULT_CACHE.
+WARMUP_BATCH_SIZES = (1, 2, 8, 32, 64)
+
+_WARMUP_SAFE = {
+    "income_monthly": 15000.0, "housing_cost_monthly": 1200.0, "other_expenses_monthly": 200.0,
+    "employment_role": "engineer", "loans": [], "age": 45, "application_month": "June",
+    "num_credit_cards": 2, "num_bank_accounts": 3, "num_loans": 1, "invested": 1500.0,
+    "spending_pattern_hint": "Low_spent_Small_value_payments", "status_hint": "Good",
+}
+_WARMUP_RISKY = {
+    "income_monthly": 800.0, "housing_cost_monthly": 1100.0, "other_expenses_monthly": 400.0,
+    "employment_role": "astronaut", "loans": ["payday"], "age": 21, "application_month": "December",
+    "num_credit_cards": 9, "num_bank_accounts": 0, "num_loans": 7, "invested": 0.0,
+    "spending_pattern_hint": "High_spent_Small_value_payments", "status_hint": "Bad",
+}
+
+def warmup_payloads():
+    """Synthetic /score payloads for warm_up(): safe and risky, with every loan type."""
+    payloads = [dict(_WARMUP_SAFE), dict(_WARMUP_RISKY)]
+    for loan in list(LOAN_REGEX) + ["Not Specified"]:
+        payloads.append({**_WARMUP_SAFE, "loans": [loan]})
+        payloads.append({**_WARMUP_RISKY, "loans": [loan, "Payday Loan"]})
+    return payloads
+
+def warm_up(bundle: ModelBundle = None) -> Dict[str, Any]:
+    """
+    Run the warm-up workload on `bundle` and return its timings. Raises ValueError if the
+    bundle produces invalid probabilities, so a broken model never reports ready.
+    """
+    with metrics.quiet():   # synthetic applicants stay out of /metrics
+        return _run_warm_up(bundle or current_bundle())
+
+def _run_warm_up(bundle: ModelBundle) -> Dict[str, Any]:
+    t_start = time.perf_counter()
+    rows = [build_row_from_user_payload(p) for p in warmup_payloads()]
+    steps = {}
+
+    t = time.perf_counter()
+    results = [predict_with_reasons_row(r, bundle.inputs_row(r), bundle) for r in rows]
+    steps["single_ms"] = (time.perf_counter() - t) * 1000.0
+
+    t = time.perf_counter()
+    for n in WARMUP_BATCH_SIZES:
+        results += predict_batch_rows([rows[i % len(rows)] for i in range(n)], bundle)
+    steps["batch_ms"] = (time.perf_counter() - t) * 1000.0
+
+    t = time.perf_counter()
+    big = [rows[i % len(rows)] for i in range(PLAN_BATCH_MAX + 1)]
+    results += predict_batch_df(pd.DataFrame(big, columns=TRAIN_COLUMNS), bundle)
+    steps["dataframe_ms"] = (time.perf_counter() - t) * 1000.0
+
+    probs = np.array([list(r["probabilities"].values()) for r in results])
+    if not np.isfinite(probs).all() or not np.allclose(probs.sum(axis=1), 1.0, atol=1e-3):
+        raise ValueError(f"{bundle.source} produced invalid probabilities during warm-up")
+    return {
+        "version": bundle.version,
+        "total_ms": round((time.perf_counter() - t_start) * 1000.0, 2),
+        "steps_ms": {k: round(v, 2) for k, v in steps.items()},
+        "payloads": len(rows),
+        "scored": len(results),
+        "bands": dict(Counter(r["band"] for r in results[:len(rows)])),
+        "explain_mode": EXPLAIN_MODE,
     }
 
-def predict_from_user_payload(payload: Dict[str, Any]):
-    df = build_df_from_user_payload(payload)
-    return predict_with_reasons_df(df)
\ No newline at end of file
+# ───────────────── SCORER ─────────────────
+# A Scorer is the thread-safe entry point for scoring: it owns one immutable ModelBundle
+# (network + compiled feature plan) and keeps no mutable state of its own; the only shared
+# state is the locked RESULT_CACHE. One instance can serve every threadpool worker.
+class Scorer:
+    """score_one/score_many/score_df with one loaded bundle; safe to call from many threads."""
+    __slots__ = ("bundle",)
+
+    def __init__(self, bundle: ModelBundle):
+        self.bundle = bundle
+
+    @classmethod
+    def load(cls, path: str = None, device: str = "cpu") -> "Scorer":
+        """Load a model file (artifact or pickle; default: default_model_path()) into a Scorer."""
+        return cls(load_model_bundle(path, device))
+
+    @property
+    def version(self) -> str:
+        return self.bundle.version
+
+    def score_one(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return predict_from_user_payload(payload, self.bundle)
+
+    def score_many(self, payloads) -> list:
+        return predict_batch_from_user_payloads(payloads, self.bundle)
+
+    def score_df(self, df: pd.DataFrame) -> list:
+        """Score train.csv-shaped rows (no result cache)."""
+        return predict_batch_df(df, self.bundle)
+
+    def __repr__(self):
+        return f"Scorer({self.bundle!r})"
+
+# The process-wide default scorer behind the module-level helpers. It is replaced, never
+# mutated, and the first load happens once under _LOAD_LOCK however many requests ask for it.
+_DEFAULT_SCORER = None
+_LOAD_LOCK = threading.Lock()
+
+def set_default_scorer(scorer: Scorer) -> Scorer:
+    global _DEFAULT_SCORER
+    RESULT_CACHE.bind(scorer.bundle.fingerprint)
+    _DEFAULT_SCORER = scorer
+    return scorer
+
+def get_scorer() -> Scorer:
+    """The default Scorer, loading default_model_path() on first use."""
+    scorer = _DEFAULT_SCORER
+    if scorer is not None:
+        return scorer
+    with _LOAD_LOCK:
+        if _DEFAULT_SCORER is None:   # another thread may have loaded it while we waited
+            print("⚠️ Model not found in memory. Loading artifacts now...")
+            set_default_scorer(Scorer.load())
+        return _DEFAULT_SCORER
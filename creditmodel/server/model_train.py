@@ -1,16 +1,18 @@
 # model.py
 # End-to-end: train MLP, take user JSON payload, output credit score (300–850) + reasons.
 
-import os, json, warnings
+import os, json, hashlib, time, warnings
 import numpy as np
 import pandas as pd
 import pickle
 import re
 import torch
 from collections import Counter
+from dataclasses import dataclass, asdict
 from datetime import datetime
+from functools import lru_cache
 from torch import nn
-from torch.utils.data import DataLoader, TensorDataset
+from torch.utils.data import DataLoader, IterableDataset
 from typing import Tuple, Dict, Any
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
@@ -24,6 +26,13 @@ try:
 except Exception:
     HAVE_FUZZ = False
 
+# Optional Parquet cache for the training CSVs
+try:
+    import pyarrow  # noqa: F401
+    HAVE_ARROW = True
+except Exception:
+    HAVE_ARROW = False
+
 # ───────────────── CONFIG / CONSTANTS ─────────────────
 ART_DIR = "artifacts"
 os.makedirs(ART_DIR, exist_ok=True)
@@ -109,6 +118,17 @@ LOAN_REGEX = {
 
 IGNORE_PAT = re.compile(r"\b(not\s*specified|unknown|n/?a|none)\b", re.I)
 
+LOAN_SPLIT_PAT = re.compile(r",|\band\b", re.I)
+
+# All LOAN_REGEX patterns in one pass. Each alternative is an anchored lookahead, so the
+# engine tries them in dict order and the first pattern that matches *anywhere* in the token
+# wins — the same priority as looping over LOAN_REGEX.
+_LOAN_GROUPS = {f"g{i}": canon for i, canon in enumerate(LOAN_REGEX)}
+LOAN_COMBINED_PAT = re.compile(
+    "|".join(f"(?P<g{i}>(?=.*?(?:{rx.pattern})))" for i, rx in enumerate(LOAN_REGEX.values())),
+    re.I | re.S,
+)
+
 def _fuzzy_canonical(tok, threshold=85):
     if not HAVE_FUZZ:
         return None
@@ -116,38 +136,42 @@ def _fuzzy_canonical(tok, threshold=85):
     best, score, _ = process.extractOne(tok, choices, scorer=fuzz.WRatio)
     return best if score >= threshold else None
 
+@lru_cache(maxsize=8192)
+def canonical_loan_token(tok: str):
+    """
+    Canonical loan type for one stripped token (memoized: the data has few distinct tokens).
+    Returns "" for ignorable tokens ("Not Specified", "N/A", ...) and None when nothing matches.
+    """
+    if not tok or IGNORE_PAT.search(tok):
+        return ""
+    m = LOAN_COMBINED_PAT.match(tok.lower())
+    if m:
+        return _LOAN_GROUPS[m.lastgroup]
+    return _fuzzy_canonical(tok) if HAVE_FUZZ else None
+
+def _split_loan_tokens(s):
+    return [p.strip() for p in LOAN_SPLIT_PAT.split(str(s)) if p and p.strip()]
+
 def normalize_loan_types(loan_value):
     """
     Accepts: string ("Auto Loan, and Mortgage Loan") or list of strings.
     Returns: (matched_set, unmatched_tokens_list)
     """
-    def split_tokens(s):
-        parts = re.split(r",|\band\b", str(s), flags=re.I)
-        return [p.strip() for p in parts if p and p.strip()]
-
     if loan_value is None:
         tokens = []
     elif isinstance(loan_value, (list, tuple, set)):
         tokens = []
         for item in loan_value:
-            tokens.extend(split_tokens(item))
+            tokens.extend(_split_loan_tokens(item))
     else:
-        tokens = split_tokens(loan_value)
+        tokens = _split_loan_tokens(loan_value)
 
     matched, unmatched = set(), []
     for tok in tokens:
-        if not tok or IGNORE_PAT.search(tok):
-            continue
-        low = tok.lower()
-        found = False
-        for canon, rx in LOAN_REGEX.items():
-            if rx.search(low):
-                matched.add(canon); found = True; break
-        if not found and HAVE_FUZZ:
-            guess = _fuzzy_canonical(tok)
-            if guess:
-                matched.add(guess); found = True
-        if not found:
+        canon = canonical_loan_token(tok)
+        if canon:
+            matched.add(canon)
+        elif canon is None:
             unmatched.append(tok)
     return matched, unmatched
 
@@ -209,22 +233,24 @@ def loan_flags_from_series(type_of_loan_series: pd.Series) -> pd.DataFrame:
     For each row, parse the normalized Type_of_Loan string and emit 0/1 flags per canonical type
     plus a couple of counts that are often predictive.
     """
-    flags = {v: [] for v in CANONICAL_FLAGS.values()}
-    counts_all, counts_risky = [], []
-
-    for val in type_of_loan_series.astype(str):
-        matched, _ = normalize_loan_types(val)
-        present = set(matched)
-        for canon, col in CANONICAL_FLAGS.items():
-            flags[col].append(1.0 if canon in present else 0.0)
-        counts_all.append(float(len(present)))
-        # define “risky” bucket; tweak as you like
-        risky = {"Payday Loan", "Debt Consolidation Loan"}
-        counts_risky.append(float(len(present & risky)))
-
-    out = pd.DataFrame(flags, index=type_of_loan_series.index)
-    out["eng_loan_count"] = counts_all
-    out["eng_risky_loan_count"] = counts_risky
+    # Only a few thousand distinct strings across ~100k rows: parse each unique value once
+    # and broadcast the flag rows back with the factorize codes.
+    codes, uniques = pd.factorize(type_of_loan_series.astype(str))
+    canon_cols = list(CANONICAL_FLAGS)
+    # define “risky” bucket; tweak as you like
+    risky = {"Payday Loan", "Debt Consolidation Loan"}
+
+    table = np.zeros((len(uniques), len(canon_cols) + 2), dtype=np.float64)
+    for u, val in enumerate(uniques):
+        present, _ = normalize_loan_types(val)
+        for j, canon in enumerate(canon_cols):
+            table[u, j] = 1.0 if canon in present else 0.0
+        table[u, -2] = float(len(present))
+        table[u, -1] = float(len(present & risky))
+
+    rows = table[codes]
+    out = pd.DataFrame(rows, index=type_of_loan_series.index,
+                       columns=list(CANONICAL_FLAGS.values()) + ["eng_loan_count", "eng_risky_loan_count"])
     return out
 
 # ───────────────── LOAD TRAIN / TEST CSV (use CSV headers directly) ─────────────────
@@ -232,12 +258,97 @@ TRAIN_CSV = "../creditmodel/input/train.csv"
 TEST_CSV  = "../creditmodel/input/test.csv"
 TARGET_COL = "Credit_Score"  # train.csv last column
 
+# Columns split_num_cat() actually uses, with the dtype each one is stored as after ingestion.
+# ID/Customer_ID/Name/SSN are never loaded. Numeric columns are read as text and coerced with
+# pd.to_numeric (dirty values like "4905.38_" become NaN, exactly as split_num_cat did).
+CSV_DTYPES = {
+    "Month": "object", "Age": "float64", "Occupation": "object",
+    "Annual_Income": "float64", "Monthly_Inhand_Salary": "float64",
+    "Num_Bank_Accounts": "float64", "Num_Credit_Card": "float64", "Interest_Rate": "float64",
+    "Num_of_Loan": "float64", "Type_of_Loan": "object", "Delay_from_due_date": "float64",
+    "Num_of_Delayed_Payment": "float64", "Changed_Credit_Limit": "float64",
+    "Num_Credit_Inquiries": "float64", "Credit_Mix": "object", "Outstanding_Debt": "float64",
+    "Credit_Utilization_Ratio": "float64", "Credit_History_Age": "object",
+    "Payment_of_Min_Amount": "object", "Total_EMI_per_month": "float64",
+    "Amount_invested_monthly": "float64", "Payment_Behaviour": "object",
+    "Monthly_Balance": "float64",
+    TARGET_COL: "object",
+}
+
+# Parsed CSVs are cached as Parquet, keyed by the CSV's sha256 and the dtype map above.
+# CREDIT_DATA_CACHE=0 disables it; CREDIT_DATA_CACHE_DIR overrides where the files go.
+DATA_CACHE_ENABLED = os.environ.get("CREDIT_DATA_CACHE", "1") != "0"
+DATA_CACHE_DIR = os.environ.get("CREDIT_DATA_CACHE_DIR", os.path.join(ART_DIR, "data_cache"))
+
+def _file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _dataset_cache_path(path: str) -> str:
+    schema = hashlib.sha256(json.dumps(CSV_DTYPES, sort_keys=True).encode()).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(DATA_CACHE_DIR, f"{stem}-{_file_sha256(path)[:24]}-{schema}.parquet")
+
+def _apply_csv_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    # Every ingestion path (CSV, CSV chunks, Parquet cache) ends here, so they all hand back the
+    # same frame. Missing text cells are np.nan, as read_csv gives them: read_parquet returns
+    # None, and .astype(str) downstream would turn that into "None" instead of "nan".
+    for col in df.columns:
+        if CSV_DTYPES[col] == "float64":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        elif df[col].dtype == object:
+            missing = df[col].isna()
+            if missing.any():
+                df[col] = df[col].mask(missing, np.nan)
+    return df
+
+def read_typed_csv(path: str) -> pd.DataFrame:
+    """Read only the CSV_DTYPES columns of `path`, typed per CSV_DTYPES."""
+    df = pd.read_csv(path, dtype=str, usecols=lambda c: c in CSV_DTYPES, low_memory=False)
+    return _apply_csv_dtypes(df)
+
+def iter_typed_csv(path: str, chunksize: int):
+    """Like read_typed_csv(), but yields chunks of at most `chunksize` rows (never cached)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(os.path.abspath(path))
+    reader = pd.read_csv(path, dtype=str, usecols=lambda c: c in CSV_DTYPES,
+                         chunksize=chunksize, low_memory=False)
+    for chunk in reader:
+        yield _apply_csv_dtypes(chunk)
+
+def ingest_csv(path: str) -> pd.DataFrame:
+    """read_typed_csv() behind a Parquet cache, so repeat training runs skip CSV parsing."""
+    if not (DATA_CACHE_ENABLED and HAVE_ARROW):
+        return read_typed_csv(path)
+
+    cache_path = _dataset_cache_path(path)
+    if os.path.exists(cache_path):
+        try:
+            df = _apply_csv_dtypes(pd.read_parquet(cache_path))
+            print("✔ Loaded cached dataset", cache_path)
+            return df
+        except Exception as e:
+            print(f"⚠ Ignoring unreadable dataset cache {cache_path}: {e}")
+
+    df = read_typed_csv(path)
+    try:
+        os.makedirs(DATA_CACHE_DIR, exist_ok=True)
+        tmp = cache_path + ".tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, cache_path)
+        print("✔ Cached dataset to", cache_path)
+    except Exception as e:
+        print(f"⚠ Could not write dataset cache {cache_path}: {e}")
+    return df
+
 def load_dataset(path: str):
     if not os.path.exists(path):
         raise FileNotFoundError(os.path.abspath(path))
 
-    # Read as strings (robust), we’ll coerce numerics later
-    df = pd.read_csv(path, dtype=str, low_memory=False)
+    df = ingest_csv(path)
 
     # Detect whether this file has labels
     has_target = TARGET_COL in df.columns
@@ -251,46 +362,28 @@ def load_dataset(path: str):
             .str.title()      # "good" -> "Good", " BAD " -> "Bad"
             .to_numpy()
         )
-        X = df.drop(columns=[TARGET_COL]).copy()
+        X = df.drop(columns=[TARGET_COL])
     else:
-        X, y = df.copy(), None
+        X, y = df, None
 
     return X, y
 
-
-# Load train and test
-X_tr_df, y_tr_str = load_dataset(TRAIN_CSV)
-X_te_df, y_te_str = load_dataset(TEST_CSV)
-
 CLASS_NAMES = ["Poor", "Standard", "Good"]   # keep this order stable
 name_to_idx = {n: i for i, n in enumerate(CLASS_NAMES)}
 
-# After loading train:
-X_tr_df, y_tr_str = load_dataset(TRAIN_CSV)
-if y_tr_str is None:
-    raise ValueError("train.csv must include the 'Credit_Score' column.")
-
-# Map labels → integers (default to Standard if an odd label sneaks in)
-y_tr = np.array([name_to_idx.get(s, 1) for s in y_tr_str], dtype=np.int64)
-
-# Load test (may be unlabeled)
-X_te_df, y_te_str = load_dataset(TEST_CSV)
-y_te = None if y_te_str is None else np.array([name_to_idx.get(s, 1) for s in y_te_str], dtype=np.int64)
+def encode_labels(y_str):
+    # Map labels → integers (default to Standard if an odd label sneaks in)
+    return np.array([name_to_idx.get(s, 1) for s in y_str], dtype=np.int64)
 
 def clean_train_type_of_loan_col(df: pd.DataFrame) -> pd.DataFrame:
     if "Type_of_Loan" not in df.columns:
         return df
+    codes, uniques = pd.factorize(df["Type_of_Loan"].astype(str))
     cleaned = []
-    for val in df["Type_of_Loan"].astype(str).tolist():
+    for val in uniques:
         matched, _ = normalize_loan_types(val)
         cleaned.append(", ".join(sorted(matched)) if matched else "Not Specified")
-    out = df.copy()
-    out["Type_of_Loan"] = cleaned
-    return out
-
-# Clean both train and test frames so OHE sees the same vocabulary
-X_tr_df = clean_train_type_of_loan_col(X_tr_df)
-X_te_df = clean_train_type_of_loan_col(X_te_df)
+    return df.assign(Type_of_Loan=np.asarray(cleaned, dtype=object)[codes])
 
 # ───────────────── PREPROCESSORS ─────────────────
 def make_ohe():
@@ -299,31 +392,33 @@ def make_ohe():
     except TypeError:
         return OneHotEncoder(handle_unknown="ignore", sparse=False)
 
+def _history_age_months(text: str) -> int:
+    # For "year" and "month": the last whitespace token before the keyword, as int(); any
+    # unparsable token makes the whole value 0 ("3 Years, 4 Months" -> 40, "-2 Years" -> -24)
+    xl = text.lower()
+    yrs = mos = 0
+    try:
+        if "year" in xl:
+            parts = xl.split("year")[0].strip().split()
+            if parts:
+                yrs = int(parts[-1])
+        if "month" in xl:
+            parts = xl.split("month")[0].strip().split()
+            if parts:
+                mos = int(parts[-1])
+    except Exception:
+        yrs, mos = 0, 0
+    return yrs * 12 + mos
+
 def parse_history_months(s: pd.Series) -> pd.Series:
     """
     Convert strings like '17 Years and 4 Months' to numeric months (17*12+4=208).
-    Returns a numeric Series with NaNs replaced by 0.0.
+    Returns a numeric Series with NaNs replaced by 0.0, on the same index as s.
     """
-    out = []
-    for x in s.astype(str):
-        xl = x.lower()
-        yrs = 0
-        mos = 0
-        try:
-            if "year" in xl:
-                # grab number before 'year'
-                parts = xl.split("year")[0].strip().split()
-                if parts:
-                    yrs = int(parts[-1])
-            if "month" in xl:
-                # grab number before 'month'
-                parts = xl.split("month")[0].strip().split()
-                if parts:
-                    mos = int(parts[-1])
-        except Exception:
-            yrs, mos = 0, 0
-        out.append(yrs * 12 + mos)
-    return pd.to_numeric(pd.Series(out), errors="coerce").fillna(0.0)
+    # A few hundred distinct values even on millions of rows: parse the uniques only
+    codes, uniques = pd.factorize(s.astype(str))
+    months = pd.to_numeric(pd.Series([_history_age_months(u) for u in uniques]), errors="coerce").fillna(0.0)
+    return pd.Series(months.to_numpy()[codes], index=s.index)
 
 # Keep only low/medium-cardinality categorical columns (to avoid memory blow-up)
 CAT_WHITELIST = {
@@ -334,19 +429,43 @@ CAT_WHITELIST = {
     "Payment_of_Min_Amount",    # Yes / No
 }
 
-def collapse_rare(df: pd.DataFrame, col: str, top_n: int = 50) -> pd.Series:
+# Declared numeric schema: only these columns are coerced with pd.to_numeric (anything that
+# does not parse, e.g. "4905.38_", becomes 0.0). ID/Customer_ID/Name/SSN and the other text
+# columns are never coerced. Engineered columns added to the frame before the split are
+# listed too. Column order follows the frame, so NUM_COLS_FIT keeps its CSV order.
+NUMERIC_COLUMNS = {
+    "Age", "Annual_Income", "Monthly_Inhand_Salary", "Num_Bank_Accounts", "Num_Credit_Card",
+    "Interest_Rate", "Num_of_Loan", "Delay_from_due_date", "Num_of_Delayed_Payment",
+    "Changed_Credit_Limit", "Num_Credit_Inquiries", "Outstanding_Debt",
+    "Credit_Utilization_Ratio", "Total_EMI_per_month", "Amount_invested_monthly",
+    "Monthly_Balance",
+    "eng_history_months",
+}
+
+RARE_COLLAPSE_COLS = ("Occupation", "Type_of_Loan")
+RARE_TOP_N = 50
+
+def collapse_rare(df: pd.DataFrame, col: str, top_n: int = RARE_TOP_N, keep=None) -> pd.Series:
     """
     Keep only the top_n most common categories, replace others with '__OTHER__'.
+    Pass `keep` (a precomputed set, e.g. from a streaming pass) to skip the counting.
     """
     if col not in df.columns:
         return pd.Series([], dtype=str)
-    vc = df[col].astype(str).value_counts()
-    keep = set(vc.head(top_n).index)
+    if keep is None:
+        vc = df[col].astype(str).value_counts()
+        keep = set(vc.head(top_n).index)
     s = df[col].astype(str).where(df[col].astype(str).isin(keep), other="__OTHER__")
     return s
 
-def split_num_cat(df: pd.DataFrame):
-    raw = df.copy()
+def split_num_cat(df: pd.DataFrame, rare_keep: Dict[str, set] = None):
+    """
+    Split a cleaned frame into (numeric features, whitelisted categoricals).
+    `rare_keep` maps RARE_COLLAPSE_COLS to their kept categories (a missing entry leaves the
+    column uncollapsed); when omitted the top RARE_TOP_N are computed from this frame, which
+    is fine for in-memory data but not for chunks.
+    """
+    raw = df.copy(deep=False)   # only adds columns; never writes into df's data
 
     # ---- Build engineered numerics (before dtype split) ----
     # Credit_History_Age -> numeric months
@@ -365,12 +484,11 @@ def split_num_cat(df: pd.DataFrame):
             pd.to_numeric(raw["Annual_Income"], errors="coerce") / 12.0
         )
 
-    # Coerce numerics
-    num_coerced = raw.apply(pd.to_numeric, errors="coerce")
-
-    # Numeric = columns that convert to at least some numbers
-    numeric_cols = [c for c in raw.columns if not num_coerced[c].isna().all()]
-    num_df = num_coerced[numeric_cols].fillna(0.0)
+    # Coerce the declared numeric columns only
+    numeric_cols = [c for c in raw.columns if c in NUMERIC_COLUMNS]
+    num_df = pd.DataFrame(
+        {c: pd.to_numeric(raw[c], errors="coerce") for c in numeric_cols}, index=raw.index
+    ).fillna(0.0)
 
     # ---- Engineered: numeric occupation risk feature ----
     if "Occupation" in raw.columns:
@@ -426,8 +544,11 @@ def split_num_cat(df: pd.DataFrame):
     cat_df = pd.DataFrame(index=raw.index)
     for c in cat_keep:
         s = raw[c].astype(str).fillna("UNKNOWN")
-        if c in ("Occupation", "Type_of_Loan"):
-            s = collapse_rare(raw, c, top_n=50)
+        if c in RARE_COLLAPSE_COLS:
+            if rare_keep is None:
+                s = collapse_rare(raw, c, top_n=RARE_TOP_N)
+            elif rare_keep.get(c) is not None:
+                s = collapse_rare(raw, c, keep=rare_keep[c])
         cat_df[c] = s
 
     # If nothing left (edge case), return empty cat df with 0 columns
@@ -555,36 +676,61 @@ def rule_risk_from_df(df: pd.DataFrame) -> float:
     return float(np.mean(sorted(pieces)[-k:]))
 
 
-# ───────────────── TRAIN PREP (dynamic) ─────────────────
-ohe = make_ohe()
-scaler = StandardScaler()
+# ───────────────── TRAIN PREP (lazy) ─────────────────
+# Fitted at training time by prepare_training_data(), or loaded by load_pickle_bundle().
+ohe = None              # OneHotEncoder
+scaler = None           # StandardScaler
+NUM_COLS_FIT = []       # type: list[str]
+CAT_COLS_FIT = []       # type: list[str]
+
+def prepare_training_data(train_csv: str = TRAIN_CSV, test_csv: str = TEST_CSV):
+    """
+    Load, clean and featurize train/test. Only training calls this, so the prediction
+    and worker modes never read the CSVs; each CSV is read exactly once.
+    Fits (and publishes) the module-level ohe/scaler/NUM_COLS_FIT/CAT_COLS_FIT.
+    Returns a dict with X_train, y_train, X_test, y_test (y_test is None if unlabeled).
+    """
+    global ohe, scaler, NUM_COLS_FIT, CAT_COLS_FIT
 
-# Split using current CSV headers
-num_tr, cat_tr = split_num_cat(X_tr_df)
-num_te, cat_te = split_num_cat(X_te_df)
+    X_tr_df, y_tr_str = load_dataset(train_csv)
+    if y_tr_str is None:
+        raise ValueError("train.csv must include the 'Credit_Score' column.")
+    y_tr = encode_labels(y_tr_str)
 
-# Remember the exact column order we fit on (important for inference)
-NUM_COLS_FIT = list(num_tr.columns)
-CAT_COLS_FIT = list(cat_tr.columns)
+    # Test may be unlabeled
+    X_te_df, y_te_str = load_dataset(test_csv)
+    y_te = None if y_te_str is None else encode_labels(y_te_str)
 
-# Fit on train, transform both
-X_tr_cat = ohe.fit_transform(cat_tr)
-X_tr_num = scaler.fit_transform(num_tr.values)
+    # Clean both train and test frames so OHE sees the same vocabulary
+    X_tr_df = clean_train_type_of_loan_col(X_tr_df)
+    X_te_df = clean_train_type_of_loan_col(X_te_df)
 
-X_te_cat = ohe.transform(cat_te.reindex(columns=CAT_COLS_FIT, fill_value="UNKNOWN"))
-X_te_num = scaler.transform(
-    num_te.reindex(columns=NUM_COLS_FIT, fill_value=0.0).values
-)
+    ohe = make_ohe()
+    scaler = StandardScaler()
+
+    # Split using current CSV headers
+    num_tr, cat_tr = split_num_cat(X_tr_df)
+    num_te, cat_te = split_num_cat(X_te_df)
+
+    # Remember the exact column order we fit on (important for inference)
+    NUM_COLS_FIT = list(num_tr.columns)
+    CAT_COLS_FIT = list(cat_tr.columns)
 
-X_train = np.hstack([X_tr_num, X_tr_cat]).astype(np.float32)
-X_test  = np.hstack([X_te_num, X_te_cat]).astype(np.float32)
+    # Fit on train, transform both
+    X_tr_cat = ohe.fit_transform(cat_tr)
+    X_tr_num = scaler.fit_transform(num_tr.values)
 
-Xtr = torch.tensor(X_train, dtype=torch.float32)
-ytr = torch.tensor(y_tr, dtype=torch.long)
-Xte = torch.tensor(X_test, dtype=torch.float32)
-yte = torch.tensor(y_te, dtype=torch.long) if y_te is not None else None
+    X_te_cat = ohe.transform(cat_te.reindex(columns=CAT_COLS_FIT, fill_value="UNKNOWN"))
+    X_te_num = scaler.transform(
+        num_te.reindex(columns=NUM_COLS_FIT, fill_value=0.0).values
+    )
 
-train_loader = DataLoader(TensorDataset(Xtr, ytr), batch_size=16, shuffle=True)
+    return {
+        "X_train": np.hstack([X_tr_num, X_tr_cat]).astype(np.float32),
+        "y_train": y_tr,
+        "X_test": np.hstack([X_te_num, X_te_cat]).astype(np.float32),
+        "y_test": y_te,
+    }
 
 
 class MLP(nn.Module):
@@ -647,8 +793,10 @@ def load_pickle_bundle(device: str = "cpu"):
         ).shape[1]
 
     in_dim = len(NUM_COLS_FIT) + ohe_feature_count
-    model = MLP(in_dim=in_dim, n_classes=len(CLASS_NAMES))
-    model.load_state_dict(bundle["state_dict"])
+    sd = bundle["state_dict"]
+    hidden = (sd["net.0.weight"].shape[0], sd["net.4.weight"].shape[0])   # sweeps may change them
+    model = MLP(in_dim=in_dim, hidden=hidden, n_classes=len(CLASS_NAMES))
+    model.load_state_dict(sd)
     model.to(device)
     model.eval()
 
@@ -855,8 +1003,15 @@ def summarize_reasons(row_df: pd.DataFrame, top_k: int = 4):
     return out
 
 # ───────────────── USER PAYLOAD → ROW ─────────────────
-# Use the columns from train.csv (already loaded as X_tr_df above)
-TRAIN_COLUMNS = list(X_tr_df.columns)
+# train.csv feature columns (everything except Credit_Score), in file order
+TRAIN_COLUMNS = [
+    'ID', 'Customer_ID', 'Month', 'Name', 'Age', 'SSN', 'Occupation', 'Annual_Income',
+    'Monthly_Inhand_Salary', 'Num_Bank_Accounts', 'Num_Credit_Card', 'Interest_Rate',
+    'Num_of_Loan', 'Type_of_Loan', 'Delay_from_due_date', 'Num_of_Delayed_Payment',
+    'Changed_Credit_Limit', 'Num_Credit_Inquiries', 'Credit_Mix', 'Outstanding_Debt',
+    'Credit_Utilization_Ratio', 'Credit_History_Age', 'Payment_of_Min_Amount',
+    'Total_EMI_per_month', 'Amount_invested_monthly', 'Payment_Behaviour', 'Monthly_Balance',
+]
 
 def build_df_from_user_payload(payload: Dict[str, Any]) -> pd.DataFrame:
     """
@@ -1038,12 +1193,417 @@ def predict_from_user_payload(payload: Dict[str, Any]):
 
 # ... (All your existing imports and functions stay the same) ...
 
+# ───────────────── TRAINING ─────────────────
+def _env_int(name, default):
+    v = os.environ.get(name)
+    return default if v in (None, "") else int(v)
+
+def _env_float(name, default):
+    v = os.environ.get(name)
+    return default if v in (None, "") else float(v)
+
+@dataclass
+class TrainConfig:
+    """
+    Trainer knobs; TrainConfig.from_env() reads CREDIT_TRAIN_<FIELD> overrides (e.g.
+    CREDIT_TRAIN_BATCH_SIZE=1024). The original loop is batch_size=16, lr_scaling="none",
+    lr_schedule="none", val_fraction=0, patience=0.
+    """
+    hidden: tuple = (128, 64)       # MLP hidden sizes
+    dropout: float = 0.2
+    epochs: int = 30
+    batch_size: int = 512
+    lr: float = 3e-4                # at base_batch_size; scaled for bigger batches
+    base_batch_size: int = 16
+    lr_scaling: str = "sqrt"        # "sqrt" | "linear" | "none"
+    lr_schedule: str = "cosine"     # "cosine" (with warm-up) | "none"
+    warmup_epochs: int = 1
+    weight_decay: float = 0.01      # AdamW default
+    num_threads: int = 0            # torch.set_num_threads; 0 leaves torch's default
+    val_fraction: float = 0.1       # stratified hold-out from the training set; 0 disables
+    patience: int = 5               # epochs without val-loss improvement; 0 disables early stopping
+    min_delta: float = 1e-4
+    checkpoint_every: int = 5       # epochs; 0 disables
+    checkpoint_dir: str = os.path.join(ART_DIR, "checkpoints")
+    seed: int = 0
+    verbose: bool = True            # per-epoch logs
+
+    @classmethod
+    def from_env(cls) -> "TrainConfig":
+        cfg = cls()
+        for name, default in asdict(cfg).items():
+            key = f"CREDIT_TRAIN_{name.upper()}"
+            if isinstance(default, bool):
+                setattr(cfg, name, os.environ.get(key, "1" if default else "0").lower() in ("1", "true", "yes"))
+            elif isinstance(default, tuple):
+                v = os.environ.get(key)
+                setattr(cfg, name, tuple(int(h) for h in v.split(",")) if v else default)
+            elif isinstance(default, str):
+                setattr(cfg, name, os.environ.get(key, default))
+            elif isinstance(default, int):
+                setattr(cfg, name, _env_int(key, default))
+            else:
+                setattr(cfg, name, _env_float(key, default))
+        return cfg
+
+    def effective_lr(self) -> float:
+        ratio = self.batch_size / float(self.base_batch_size)
+        if self.lr_scaling == "linear":
+            return self.lr * ratio
+        if self.lr_scaling == "sqrt":
+            return self.lr * ratio ** 0.5
+        return self.lr
+
+def class_weights(label_counts: Counter) -> torch.Tensor:
+    total = sum(label_counts.values())
+    return torch.tensor(
+        [total / label_counts.get(i, 1) for i in range(len(CLASS_NAMES))],
+        dtype=torch.float32
+    )
+
+def make_optimizer(model: nn.Module, cfg: TrainConfig, steps_per_epoch: int):
+    optimizer = torch.optim.AdamW(model.parameters(), lr=cfg.effective_lr(),
+                                  weight_decay=cfg.weight_decay)
+    if cfg.lr_schedule != "cosine":
+        return optimizer, None
+    total = max(1, cfg.epochs * steps_per_epoch)
+    warmup = min(total - 1, cfg.warmup_epochs * steps_per_epoch)
+
+    def factor(step):
+        if step < warmup:
+            return (step + 1) / warmup
+        progress = (step - warmup) / max(1, total - warmup)
+        return 0.5 * (1.0 + np.cos(np.pi * min(progress, 1.0)))
+    return optimizer, torch.optim.lr_scheduler.LambdaLR(optimizer, factor)
+
+def save_checkpoint(cfg: TrainConfig, model, optimizer, epoch: int, name: str = "checkpoint.pt"):
+    os.makedirs(cfg.checkpoint_dir, exist_ok=True)
+    path = os.path.join(cfg.checkpoint_dir, name)
+    torch.save({
+        "epoch": epoch,
+        "model_state": model.state_dict(),
+        "optimizer_state": optimizer.state_dict(),
+        "config": asdict(cfg),
+    }, path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return path
+
+def _iter_minibatches(n: int, batch_size: int, generator: torch.Generator):
+    # Index slicing on the full tensors; a trailing batch of 1 row is skipped (BatchNorm)
+    perm = torch.randperm(n, generator=generator)
+    for i in range(0, n, batch_size):
+        idx = perm[i:i + batch_size]
+        if len(idx) > 1:
+            yield idx
+
+def _evaluate(model, criterion, X: torch.Tensor, y: torch.Tensor, batch_size: int = 8192):
+    model.eval()
+    loss_sum, correct = 0.0, 0
+    with torch.no_grad():
+        for i in range(0, len(X), batch_size):
+            logits = model(X[i:i + batch_size])
+            yb = y[i:i + batch_size]
+            loss_sum += float(criterion(logits, yb)) * len(yb)
+            correct += int((logits.argmax(dim=1) == yb).sum())
+    model.train()
+    return loss_sum / max(1, len(X)), correct / max(1, len(X))
+
+def fit_model(data: Dict[str, Any], config: TrainConfig = None):
+    """
+    Train the MLP on the arrays returned by prepare_training_data().
+    Large shuffled batches sliced straight from the tensors, LR scaling + cosine schedule,
+    early stopping on a validation split (best weights are restored) and periodic
+    checkpoints; see TrainConfig. A precomputed split can be passed as data["X_val"]/["y_val"].
+    Returns (model, summary dict).
+    """
+    cfg = config or TrainConfig.from_env()
+    if cfg.num_threads > 0:
+        torch.set_num_threads(cfg.num_threads)
+    torch.manual_seed(cfg.seed)
+    log = print if cfg.verbose else (lambda *a, **k: None)
+
+    X_train, y_tr = data["X_train"], data["y_train"]
+    X_val, y_val = data.get("X_val"), data.get("y_val")
+    if X_val is None and cfg.val_fraction > 0:
+        X_train, X_val, y_tr, y_val = train_test_split(
+            X_train, y_tr, test_size=cfg.val_fraction, random_state=cfg.seed, stratify=y_tr
+        )
+    Xtr = torch.from_numpy(np.ascontiguousarray(X_train, dtype=np.float32))
+    ytr = torch.from_numpy(np.ascontiguousarray(y_tr, dtype=np.int64))
+    Xva = None if X_val is None else torch.from_numpy(np.ascontiguousarray(X_val, dtype=np.float32))
+    yva = None if y_val is None else torch.from_numpy(np.ascontiguousarray(y_val, dtype=np.int64))
+
+    model = MLP(in_dim=Xtr.shape[1], hidden=tuple(cfg.hidden), p=cfg.dropout, n_classes=len(CLASS_NAMES))
+    criterion = nn.CrossEntropyLoss(weight=class_weights(Counter(y_tr.tolist())))
+    steps_per_epoch = max(1, len(Xtr) // cfg.batch_size)
+    optimizer, scheduler = make_optimizer(model, cfg, steps_per_epoch)
+    gen = torch.Generator().manual_seed(cfg.seed)
+
+    log(f"🔧 Training on {len(Xtr)} rows (val {0 if Xva is None else len(Xva)}), "
+        f"batch {cfg.batch_size}, lr {cfg.effective_lr():.2e}, {torch.get_num_threads()} threads")
+    best_val, best_acc, best_state, stale = float("inf"), None, None, 0
+    epochs_run = 0
+    t_start = time.perf_counter()
+
+    model.train()
+    for epoch in range(1, cfg.epochs + 1):
+        t0 = time.perf_counter()
+        epochs_run = epoch
+        loss_sum, seen = 0.0, 0
+        for idx in _iter_minibatches(len(Xtr), cfg.batch_size, gen):
+            xb, yb = Xtr[idx], ytr[idx]
+            logits = model(xb)
+            loss = criterion(logits, yb)
+            optimizer.zero_grad(set_to_none=True)
+            loss.backward()
+            optimizer.step()
+            if scheduler is not None:
+                scheduler.step()
+            loss_sum += loss.item() * len(idx); seen += len(idx)
+
+        msg = f"epoch {epoch:3d}  train_loss {loss_sum / max(1, seen):.4f}"
+        improved = True
+        if Xva is not None:
+            val_loss, val_acc = _evaluate(model, criterion, Xva, yva)
+            msg += f"  val_loss {val_loss:.4f}  val_acc {val_acc:.4f}"
+            improved = val_loss < best_val - cfg.min_delta
+            if improved:
+                best_val, best_acc, stale = val_loss, val_acc, 0
+                best_state = {k: v.detach().clone() for k, v in model.state_dict().items()}
+            else:
+                stale += 1
+        log(f"{msg}  lr {optimizer.param_groups[0]['lr']:.2e}  {time.perf_counter() - t0:.2f}s")
+
+        if cfg.checkpoint_every > 0 and epoch % cfg.checkpoint_every == 0:
+            save_checkpoint(cfg, model, optimizer, epoch)
+        if cfg.patience > 0 and stale >= cfg.patience:
+            log(f"⏹ Early stopping at epoch {epoch} (best val_loss {best_val:.4f})")
+            break
+
+    if best_state is not None:
+        model.load_state_dict(best_state)
+    wall_s = time.perf_counter() - t_start
+    log(f"✔ Training finished in {wall_s:.1f}s")
+
+    model.eval()
+    summary = {
+        "epochs_run": epochs_run,
+        "wall_s": wall_s,
+        "val_loss": None if Xva is None else best_val,
+        "val_acc": best_acc,
+        "test_acc": None,
+        "n_params": sum(p.numel() for p in model.parameters()),
+    }
+    if data.get("y_test") is not None:
+        Xte = torch.from_numpy(np.ascontiguousarray(data["X_test"], dtype=np.float32))
+        with torch.no_grad():
+            preds = torch.argmax(model(Xte), dim=1).cpu().numpy()
+        summary["test_acc"] = float(accuracy_score(data["y_test"], preds))
+        log("Test accuracy:", summary["test_acc"])
+    return model, summary
+
+def train_model(data: Dict[str, Any], config: TrainConfig = None) -> nn.Module:
+    """Train the MLP (see fit_model) and report test accuracy."""
+    model, _ = fit_model(data, config)
+    return model
+
+# ───────────────── STREAMING (OUT-OF-CORE) TRAINING ─────────────────
+# For datasets that do not fit in RAM. Pass 1 streams train.csv once to fit the scaler
+# (StandardScaler.partial_fit), the OHE vocabulary, the rare-category keep sets and the class
+# counts. Training then re-reads the CSV every epoch and featurizes chunk by chunk, so memory
+# is bounded by chunksize + shuffle_buffer rows instead of three full copies of the data.
+STREAM_CHUNKSIZE = int(os.environ.get("CREDIT_TRAIN_CHUNKSIZE", 50_000))
+STREAM_SHUFFLE_BUFFER = int(os.environ.get("CREDIT_TRAIN_SHUFFLE_BUFFER", 200_000))
+RARE_KEEP = None        # type: Dict[str, set] | None  (set by fit_streaming_preprocessors)
+
+def fit_streaming_preprocessors(train_csv: str = TRAIN_CSV, chunksize: int = STREAM_CHUNKSIZE):
+    """
+    One chunked pass over train_csv. Fits and publishes ohe/scaler/NUM_COLS_FIT/CAT_COLS_FIT/
+    RARE_KEEP exactly like prepare_training_data() does, and returns the label Counter.
+    """
+    global ohe, scaler, NUM_COLS_FIT, CAT_COLS_FIT, RARE_KEEP
+
+    rare_counts = {c: Counter() for c in RARE_COLLAPSE_COLS}
+    cat_values = {}
+    label_counts = Counter()
+    scaler = StandardScaler()
+    num_cols = None
+    n_rows = 0
+
+    for chunk in iter_typed_csv(train_csv, chunksize):
+        if TARGET_COL not in chunk.columns:
+            raise ValueError("train.csv must include the 'Credit_Score' column.")
+        label_counts.update(encode_labels(chunk[TARGET_COL].astype(str).str.strip().str.title()).tolist())
+        X = clean_train_type_of_loan_col(chunk.drop(columns=[TARGET_COL]))
+        for c in RARE_COLLAPSE_COLS:
+            if c in X.columns:
+                rare_counts[c].update(X[c].astype(str).value_counts().to_dict())
+
+        # Nothing is collapsed in this pass; the OHE vocabulary is collapsed afterwards
+        num, cat = split_num_cat(X, rare_keep={})
+        if num_cols is None:
+            num_cols = list(num.columns)
+            # eng_utilization only appears when a chunk has utilization data; fix it up front
+            if "Credit_Utilization_Ratio" in X.columns and "eng_utilization" not in num_cols:
+                num_cols.append("eng_utilization")
+        scaler.partial_fit(num.reindex(columns=num_cols, fill_value=0.0).values)
+        for c in cat.columns:
+            cat_values.setdefault(c, set()).update(cat[c].unique().tolist())
+        n_rows += len(X)
+
+    if num_cols is None:
+        raise ValueError(f"{train_csv} has no rows.")
+
+    # Global top-N per rare column (the in-memory path computes this over the whole frame)
+    RARE_KEEP = {c: {v for v, _ in cnt.most_common(RARE_TOP_N)} for c, cnt in rare_counts.items()}
+    CAT_COLS_FIT = list(cat_values)
+    categories = []
+    for c in CAT_COLS_FIT:
+        vals = cat_values[c]
+        if c in RARE_KEEP:
+            vals = {v if v in RARE_KEEP[c] else "__OTHER__" for v in vals}
+        categories.append(sorted(vals))
+    try:
+        ohe = OneHotEncoder(categories=categories, handle_unknown="ignore", sparse_output=False)
+    except TypeError:
+        ohe = OneHotEncoder(categories=categories, handle_unknown="ignore", sparse=False)
+    ohe.fit(pd.DataFrame([[cats[0] for cats in categories]], columns=CAT_COLS_FIT))
+    NUM_COLS_FIT = num_cols
+
+    print(f"✔ Streaming pass 1: {n_rows} rows, {len(NUM_COLS_FIT)} numeric + "
+          f"{sum(len(c) for c in categories)} one-hot features")
+    return label_counts
+
+def featurize_training_chunk(chunk: pd.DataFrame):
+    """Typed CSV chunk -> (float32 X, int64 y or None) with the fitted preprocessors."""
+    y = None
+    if TARGET_COL in chunk.columns:
+        y = encode_labels(chunk[TARGET_COL].astype(str).str.strip().str.title())
+        chunk = chunk.drop(columns=[TARGET_COL])
+    num, cat = split_num_cat(clean_train_type_of_loan_col(chunk), rare_keep=RARE_KEEP)
+    X_num = scaler.transform(num.reindex(columns=NUM_COLS_FIT, fill_value=0.0).values)
+    X_cat = ohe.transform(cat.reindex(columns=CAT_COLS_FIT, fill_value="UNKNOWN"))
+    return np.hstack([X_num, X_cat]).astype(np.float32), y
+
+class ChunkedCSVDataset(IterableDataset):
+    """
+    Yields shuffled (X, y) mini-batches from a CSV, one chunk in memory at a time.
+    Rows are shuffled within a buffer of `shuffle_buffer` rows (block shuffle); use it with
+    DataLoader(batch_size=None) since batching already happened here.
+    """
+
+    def __init__(self, path: str, batch_size: int = 16, chunksize: int = STREAM_CHUNKSIZE,
+                 shuffle_buffer: int = STREAM_SHUFFLE_BUFFER, seed: int = 0):
+        self.path = path
+        self.batch_size = batch_size
+        self.chunksize = chunksize
+        self.shuffle_buffer = max(shuffle_buffer, batch_size)
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int):
+        self.epoch = epoch   # different shuffle every epoch, reproducible across runs
+
+    def _batches(self, X, y, rng):
+        order = rng.permutation(len(X))
+        for i in range(0, len(order), self.batch_size):
+            idx = order[i:i + self.batch_size]
+            yield torch.from_numpy(X[idx]), torch.from_numpy(y[idx])
+
+    def __iter__(self):
+        rng = np.random.default_rng((self.seed, self.epoch))
+        buf_X, buf_y, buffered = [], [], 0
+        for chunk in iter_typed_csv(self.path, self.chunksize):
+            X, y = featurize_training_chunk(chunk)
+            buf_X.append(X); buf_y.append(y); buffered += len(X)
+            if buffered >= self.shuffle_buffer:
+                yield from self._batches(np.concatenate(buf_X), np.concatenate(buf_y), rng)
+                buf_X, buf_y, buffered = [], [], 0
+        if buffered:
+            yield from self._batches(np.concatenate(buf_X), np.concatenate(buf_y), rng)
+
+def train_model_streaming(train_csv: str = TRAIN_CSV, test_csv: str = TEST_CSV,
+                          chunksize: int = STREAM_CHUNKSIZE, config: TrainConfig = None) -> nn.Module:
+    """
+    Out-of-core counterpart of train_model(prepare_training_data()): same model, loss,
+    class weighting and TrainConfig (batch size, LR scaling/schedule, threads, checkpoints),
+    but the data never has to fit in memory. There is no validation split or early stopping
+    here since that would need another pass over the CSV.
+    """
+    cfg = config or TrainConfig.from_env()
+    if cfg.num_threads > 0:
+        torch.set_num_threads(cfg.num_threads)
+    torch.manual_seed(cfg.seed)
+
+    label_counts = fit_streaming_preprocessors(train_csv, chunksize)
+    in_dim = len(NUM_COLS_FIT) + sum(len(c) for c in ohe.categories_)
+    model = MLP(in_dim=in_dim, hidden=tuple(cfg.hidden), p=cfg.dropout, n_classes=len(CLASS_NAMES))
+
+    criterion = nn.CrossEntropyLoss(weight=class_weights(label_counts))
+    steps_per_epoch = max(1, sum(label_counts.values()) // cfg.batch_size)
+    optimizer, scheduler = make_optimizer(model, cfg, steps_per_epoch)
+
+    dataset = ChunkedCSVDataset(train_csv, batch_size=cfg.batch_size, chunksize=chunksize,
+                                seed=cfg.seed)
+    train_loader = DataLoader(dataset, batch_size=None)
+
+    model.train()
+    for epoch in range(1, cfg.epochs + 1):
+        t0 = time.perf_counter()
+        dataset.set_epoch(epoch)
+        loss_sum, seen = 0.0, 0
+        for xb, yb in train_loader:
+            if len(xb) < 2:
+                continue   # BatchNorm needs more than one row
+            logits = model(xb)
+            loss = criterion(logits, yb)
+            optimizer.zero_grad(set_to_none=True)
+            loss.backward()
+            optimizer.step()
+            if scheduler is not None:
+                scheduler.step()
+            loss_sum += loss.item() * len(yb); seen += len(yb)
+        print(f"epoch {epoch:3d}  train_loss {loss_sum / max(1, seen):.4f}  "
+              f"lr {optimizer.param_groups[0]['lr']:.2e}  {time.perf_counter() - t0:.2f}s")
+        if cfg.checkpoint_every > 0 and epoch % cfg.checkpoint_every == 0:
+            save_checkpoint(cfg, model, optimizer, epoch)
+
+    model.eval()
+    if test_csv and os.path.exists(test_csv):
+        correct = seen = 0
+        with torch.no_grad():
+            for chunk in iter_typed_csv(test_csv, chunksize):
+                X, y = featurize_training_chunk(chunk)
+                if y is None:
+                    break   # unlabeled test set
+                preds = torch.argmax(model(torch.from_numpy(X)), dim=1).numpy()
+                correct += int((preds == y).sum()); seen += len(y)
+        if seen:
+            print("Test accuracy:", correct / seen)
+    return model
+
 # ───────────────── DUAL MODE: TRAIN OR PREDICT ─────────────────
 import sys
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        # === WORKER MODE ===
+        # Moved to server/worker.py, which scores through server.model like the API does
+        print("model_train.py --worker is deprecated; starting python -m server.worker", file=sys.stderr)
+        os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        os.execv(sys.executable, [sys.executable, "-m", "server.worker"])
+
+    elif len(sys.argv) > 1 and sys.argv[1] == "--stream":
+        # === STREAMING TRAINING MODE (datasets larger than RAM) ===
+        chunksize = int(sys.argv[2]) if len(sys.argv) > 2 else STREAM_CHUNKSIZE
+        print(f"🔧 Streaming training from {TRAIN_CSV} in chunks of {chunksize} rows...")
+        model = train_model_streaming(TRAIN_CSV, TEST_CSV, chunksize=chunksize,
+                                      config=TrainConfig.from_env())
+        save_pickle_bundle(model, ohe, scaler, NUM_COLS_FIT, CAT_COLS_FIT)
+        print("➡ Refresh the serving artifact: python -m server.export_artifact")
+
     # CHECK: Did the server send us data?
-    if len(sys.argv) > 1:
+    elif len(sys.argv) > 1:
         # === PREDICTION MODE ===
         try:
             # 1. Load artifacts (Silent mode to not break JSON output)
@@ -1071,33 +1631,6 @@ if __name__ == "__main__":
     else:
         # === TRAINING MODE (Original Logic) ===
         print("🔧 No input data detected. Starting Training Mode...")
-        
-        # We already built: ohe, scaler, NUM_COLS_FIT, CAT_COLS_FIT, X_train, X_test
-        model = MLP(in_dim=X_train.shape[1], n_classes=len(CLASS_NAMES))
-
-        # Class weights
-        counts = Counter(y_tr)
-        total = sum(counts.values())
-        weights = torch.tensor(
-            [total / counts.get(i, 1) for i in range(len(CLASS_NAMES))],
-            dtype=torch.float32
-        )
-        criterion = nn.CrossEntropyLoss(weight=weights)
-        optimizer = torch.optim.AdamW(model.parameters(), lr=3e-4)
-
-        model.train()
-        for _ in range(30):
-            for xb, yb in train_loader:
-                logits = model(xb)
-                loss = criterion(logits, yb)
-                optimizer.zero_grad()
-                loss.backward()
-                optimizer.step()
-
-        model.eval()
-        if yte is not None:
-            with torch.no_grad():
-                preds = torch.argmax(model(Xte), dim=1).cpu().numpy()
-            print("Test accuracy:", accuracy_score(yte, preds))
-
-        save_pickle_bundle(model, ohe, scaler, NUM_COLS_FIT, CAT_COLS_FIT)
\ No newline at end of file
+        model = train_model(prepare_training_data(), TrainConfig.from_env())
+        save_pickle_bundle(model, ohe, scaler, NUM_COLS_FIT, CAT_COLS_FIT)
+        print("➡ Refresh the serving artifact: python -m server.export_artifact")
@@ -0,0 +1,391 @@
+# registry.py
+# Live model bundles for the API: a champion, an optional challenger, and how /score traffic
+# is split between them.
+#
+#   CREDIT_MODEL_PATH          champion file (artifact or pickle; default: model.load_bundle's choice)
+#   CREDIT_CHALLENGER_PATH     challenger file (unset: champion only)
+#   CREDIT_CHALLENGER_WEIGHT   share of applicants routed to the challenger, 0..1 (default 0)
+#   CREDIT_SHADOW=1            challenger scores every request in the background instead;
+#                              callers always get the champion's result
+#   CREDIT_MODEL_WATCH_S       poll the model files every N seconds and reload on change (0 = off)
+#   CREDIT_RELOAD_POLL_S       prefork workers: how often to check for a reload published by
+#                              another worker (default 0.5)
+#
+# Each model is a model.Scorer over an immutable ModelBundle, and the routing is one tuple
+# that reload() replaces in a single assignment, after the new bundles have loaded and run
+# model.warm_up(). A request reads the routing once, so it finishes on the bundles it started
+# with; a failed reload leaves the current routing in place. Routing is by a hash of the
+# canonical payload, so the same applicant always lands on the same model for a given weight.
+#
+# Under serve.py every worker has its own registry. POST /admin/reload reaches one of them, so
+# that worker publishes its new routing config on a ReloadBroadcast (shared memory set up by
+# serve.py before forking); the others pick it up within CREDIT_RELOAD_POLL_S and reload with
+# it, and a worker that is restarted later starts from it.
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from . import metrics
+from . import model as m
+
+CHALLENGER_WEIGHT = float(os.environ.get("CREDIT_CHALLENGER_WEIGHT", 0.0))
+SHADOW_MODE = os.environ.get("CREDIT_SHADOW", "0").strip().lower() in {"1", "true", "yes"}
+WATCH_INTERVAL_S = float(os.environ.get("CREDIT_MODEL_WATCH_S", 0))
+# Payloads allowed to wait for shadow scoring; beyond that they are counted and skipped
+SHADOW_MAX_PENDING = int(os.environ.get("CREDIT_SHADOW_MAX_PENDING", 1024))
+RELOAD_POLL_S = float(os.environ.get("CREDIT_RELOAD_POLL_S", 0.5))
+
+Routing = namedtuple("Routing", "champion challenger weight shadow")
+_KEEP = object()
+
+
+def route_fraction(payload: Dict[str, Any]) -> float:
+    """Stable position of an applicant in [0, 1); below the challenger weight → challenger."""
+    digest = hashlib.blake2b(m.canonical_payload(payload).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2.0 ** 64
+
+
+class ReloadBroadcast:
+    """
+    The latest routing config published by any prefork worker, plus the generation each
+    worker has applied. Built by serve.py from a multiprocessing context before it forks.
+    """
+
+    def __init__(self, ctx, workers: int, spec_bytes: int = 8192):
+        self._lock = ctx.Lock()
+        self._generation = ctx.RawValue("q", 0)
+        self._spec = ctx.RawArray("c", spec_bytes)
+        self._applied = ctx.RawArray("q", workers)
+
+    def publish(self, config: Dict[str, Any]) -> int:
+        data = json.dumps(config).encode("utf-8")
+        if len(data) >= len(self._spec):
+            raise ValueError(f"routing config is {len(data)} bytes; the broadcast holds {len(self._spec) - 1}")
+        with self._lock:
+            self._spec.value = data
+            self._generation.value += 1
+            return self._generation.value
+
+    def latest(self):
+        """(generation, config); generation 0 (config None) until the first publish."""
+        with self._lock:
+            gen = self._generation.value
+            return gen, (json.loads(self._spec.value.decode("utf-8")) if gen else None)
+
+    def mark_applied(self, index: int, generation: int):
+        self._applied[index] = generation
+
+    def applied(self, generation: int) -> int:
+        """How many workers run a config at least as new as `generation`."""
+        return sum(g >= generation for g in self._applied)
+
+    @property
+    def workers(self) -> int:
+        return len(self._applied)
+
+
+class ModelRegistry:
+    """
+    Holds the champion/challenger scorers and routes payloads to them. score_many() and
+    score_one() never block on a reload; reload() serializes with other reloads only.
+    """
+
+    def __init__(self, champion_path: str = None, challenger_path: str = None,
+                 weight: float = 0.0, shadow: bool = False, device: str = "cpu"):
+        self.device = device
+        self._paths = {"champion": champion_path, "challenger": challenger_path}
+        self._weight = min(1.0, max(0.0, weight))
+        self._shadow = shadow
+        self._routing = None
+        self._reload_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._file_sigs = {}
+        self._bad_sigs = None
+        self._watcher = None
+        self._follower = None
+        self._broadcast = None
+        self._worker_index = 0
+        self._seen_generation = 0
+        self._follow_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._shadow_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+
+        # metrics
+        self.reloads = 0
+        self.failed_reloads = 0
+        self.last_reload_utc = None
+        self.last_error = None
+        self.warmups = {}   # version -> model.warm_up() report
+        self.requests_by_version = Counter()
+        self._shadow_pending = 0
+        self.shadow_compared = 0
+        self.shadow_decision_agree = 0
+        self.shadow_band_agree = 0
+        self.shadow_risk_diff_total = 0.0
+        self.shadow_risk_diff_max = 0.0
+        self.shadow_errors = 0
+        self.shadow_dropped = 0
+
+    @classmethod
+    def from_env(cls, device: str = "cpu") -> "ModelRegistry":
+        return cls(m.MODEL_PATH, os.environ.get("CREDIT_CHALLENGER_PATH", "").strip() or None,
+                   CHALLENGER_WEIGHT, SHADOW_MODE, device)
+
+    @property
+    def loaded(self) -> bool:
+        return self._routing is not None
+
+    # ----- loading -----
+    def _resolve(self, role: str, paths=None) -> str:
+        paths = paths or self._paths
+        if role == "champion":
+            return paths["champion"] or m.default_model_path()
+        return paths["challenger"]
+
+    def _signatures(self, paths) -> Dict[str, Any]:
+        sigs = {}
+        for role in ("champion", "challenger"):
+            path = self._resolve(role, paths)
+            if path:
+                try:
+                    st = os.stat(path)
+                    sigs[role] = (path, st.st_mtime_ns, st.st_size)
+                except OSError:
+                    sigs[role] = (path, None, None)
+        return sigs
+
+    def _load(self, path: str, current):
+        scorer = m.Scorer.load(path, self.device)
+        if current is not None and current.bundle.fingerprint == scorer.bundle.fingerprint:
+            return current   # same file contents: keep the warm scorer (and its cache entries)
+        # warm up (and sanity-check) before the scorer can take traffic
+        report = m.warm_up(scorer.bundle)
+        with self._stats_lock:
+            self.warmups[scorer.version] = report
+        logging.info("Warmed %s in %.0f ms", scorer.version, report["total_ms"])
+        return scorer
+
+    def reload(self, champion_path=_KEEP, challenger_path=_KEEP, weight: float = None,
+               shadow: bool = None) -> Dict[str, Any]:
+        """
+        Load the champion (and challenger) again, optionally from new paths, and swap them in
+        atomically. Omitted arguments keep their current values; challenger_path=None drops
+        the challenger. Raises (and keeps serving the current bundles) if anything fails.
+        """
+        with self._reload_lock:
+            paths = dict(self._paths)
+            if champion_path is not _KEEP:
+                paths["champion"] = champion_path or None
+            if challenger_path is not _KEEP:
+                paths["challenger"] = challenger_path or None
+            current = self._routing
+            sigs = self._signatures(paths)
+            try:
+                champion = self._load(self._resolve("champion", paths),
+                                      current.champion if current else None)
+                challenger = None
+                if paths["challenger"]:
+                    challenger = self._load(paths["challenger"], current.challenger if current else None)
+            except Exception as e:
+                self.failed_reloads += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                logging.exception("Model reload failed; still serving %s",
+                                  current.champion.version if current else "nothing")
+                raise
+
+            if weight is not None:
+                self._weight = min(1.0, max(0.0, float(weight)))
+            if shadow is not None:
+                self._shadow = bool(shadow)
+            self._paths = paths
+            self._file_sigs = sigs
+            self._bad_sigs = None
+            m.set_default_scorer(champion)   # module-level helpers default to the champion
+            self._routing = Routing(champion, challenger, self._weight, self._shadow)
+            with self._stats_lock:
+                live = {champion.version, challenger.version if challenger else None}
+                self.warmups = {v: r for v, r in self.warmups.items() if v in live}
+            self.reloads += 1
+            self.last_reload_utc = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            self.last_error = None
+            logging.info("Serving champion %s%s", champion.version,
+                         f", challenger {challenger.version} ({'shadow' if self._shadow else f'{self._weight:.0%}'})"
+                         if challenger else "")
+        return self.status()
+
+    # ----- file watching -----
+    def start_watching(self, interval_s: float = WATCH_INTERVAL_S):
+        if interval_s <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval_s,),
+                                         name="model-watch", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+        for thread in (self._watcher, self._follower):
+            if thread is not None:
+                thread.join(timeout=5)
+        self._watcher = self._follower = None
+        self._shadow_pool.shutdown(wait=False)
+
+    # ----- prefork fan-out (serve.py) -----
+    def config(self) -> Dict[str, Any]:
+        """The routing config as reload() keyword arguments (None paths = defaults)."""
+        return {"champion_path": self._paths["champion"], "challenger_path": self._paths["challenger"],
+                "weight": self._weight, "shadow": self._shadow}
+
+    def reload_from_broadcast(self, broadcast: ReloadBroadcast, worker_index: int):
+        """Startup of a prefork worker: load the latest published config (the env's if none)."""
+        self._broadcast, self._worker_index = broadcast, worker_index
+        gen, config = broadcast.latest()
+        status = self.reload(**(config or {}))
+        self._seen_generation = gen
+        broadcast.mark_applied(worker_index, gen)
+        return status
+
+    def publish_reload(self) -> int:
+        """After a local reload: hand the new config to the other workers. Returns its generation."""
+        with self._follow_lock:
+            gen = self._broadcast.publish(self.config())
+            self._seen_generation = gen   # this worker already runs it
+            self._broadcast.mark_applied(self._worker_index, gen)
+        return gen
+
+    def start_following(self, interval_s: float = RELOAD_POLL_S):
+        if self._broadcast is None or self._follower is not None:
+            return
+        self._follower = threading.Thread(target=self._follow, args=(interval_s,),
+                                          name="reload-follow", daemon=True)
+        self._follower.start()
+
+    def _follow(self, interval_s: float):
+        while not self._stop.wait(interval_s):
+            gen, config = self._broadcast.latest()
+            with self._follow_lock:
+                if gen == self._seen_generation:
+                    continue
+                self._seen_generation = gen
+            try:
+                self.reload(**config)
+                self._broadcast.mark_applied(self._worker_index, gen)
+            except Exception:
+                pass   # logged by reload(); keep serving the current bundles
+
+    def _watch(self, interval_s: float):
+        while not self._stop.wait(interval_s):
+            sigs = self._signatures(self._paths)
+            if sigs == self._file_sigs or sigs == self._bad_sigs:
+                continue
+            try:
+                self.reload()
+            except Exception:
+                self._bad_sigs = sigs   # don't retry until the file changes again
+
+    # ----- scoring -----
+    def _pick(self, routing: Routing, payload: Dict[str, Any]):
+        if routing.challenger is None or routing.shadow or routing.weight <= 0:
+            return routing.champion
+        return routing.challenger if route_fraction(payload) < routing.weight else routing.champion
+
+    def _snapshot(self) -> Routing:
+        routing = self._routing
+        if routing is None:
+            raise RuntimeError("Model bundle not loaded")
+        return routing
+
+    def score_many(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        routing = self._snapshot()   # one snapshot for the whole batch
+        picks = [self._pick(routing, p) for p in payloads]
+        results = [None] * len(payloads)
+        for scorer in {id(s): s for s in picks}.values():
+            idx = [i for i, s in enumerate(picks) if s is scorer]
+            scored = scorer.score_many([payloads[i] for i in idx])
+            for i, res in zip(idx, scored):
+                results[i] = res
+        self._after_scoring(routing, picks, payloads, results)
+        return results
+
+    def score_one(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        routing = self._snapshot()
+        scorer = self._pick(routing, payload)
+        result = scorer.score_one(payload)
+        self._after_scoring(routing, [scorer], [payload], [result])
+        return result
+
+    def _after_scoring(self, routing: Routing, picks, payloads, results):
+        versions = [s.version for s in picks]
+        with self._stats_lock:
+            self.requests_by_version.update(versions)
+        metrics.observe_results(versions, results)
+        if routing.shadow and routing.challenger is not None:
+            self._submit_shadow(routing.challenger, payloads, results)
+
+    # ----- shadow scoring -----
+    def _submit_shadow(self, scorer, payloads, results):
+        with self._stats_lock:
+            if self._shadow_pending + len(payloads) > SHADOW_MAX_PENDING:
+                self.shadow_dropped += len(payloads)
+                return
+            self._shadow_pending += len(payloads)
+        primary = [(r["decision"], r["band"], r["risk_probability"]) for r in results]
+        try:
+            self._shadow_pool.submit(self._run_shadow, scorer, list(payloads), primary)
+        except RuntimeError:   # pool shut down
+            with self._stats_lock:
+                self._shadow_pending -= len(payloads)
+
+    def _run_shadow(self, scorer, payloads, primary):
+        try:
+            shadow = scorer.score_many(payloads)
+            with self._stats_lock:
+                for (decision, band, risk), s in zip(primary, shadow):
+                    diff = abs(s["risk_probability"] - risk)
+                    self.shadow_compared += 1
+                    self.shadow_decision_agree += s["decision"] == decision
+                    self.shadow_band_agree += s["band"] == band
+                    self.shadow_risk_diff_total += diff
+                    self.shadow_risk_diff_max = max(self.shadow_risk_diff_max, diff)
+        except Exception:
+            with self._stats_lock:
+                self.shadow_errors += len(payloads)
+            logging.exception("Shadow scoring with %s failed", scorer.version)
+        finally:
+            with self._stats_lock:
+                self._shadow_pending -= len(payloads)
+
+    def status(self) -> Dict[str, Any]:
+        routing = self._routing
+        live = [s.version for s in (routing.champion, routing.challenger) if s is not None] if routing else []
+        with self._stats_lock:
+            n = self.shadow_compared
+            return {
+                "champion": routing.champion.bundle.info() if routing else None,
+                "challenger": routing.challenger.bundle.info() if routing and routing.challenger else None,
+                "challenger_weight": routing.weight if routing else self._weight,
+                "shadow": routing.shadow if routing else self._shadow,
+                "reloads": self.reloads,
+                "failed_reloads": self.failed_reloads,
+                "last_reload_utc": self.last_reload_utc,
+                "last_error": self.last_error,
+                "watch_interval_s": WATCH_INTERVAL_S if self._watcher is not None else 0,
+                "warmup": {v: self.warmups.get(v) for v in live},
+                "requests_by_version": dict(self.requests_by_version),
+                "shadow_stats": {
+                    "compared": n,
+                    "decision_agreement": (self.shadow_decision_agree / n) if n else None,
+                    "band_agreement": (self.shadow_band_agree / n) if n else None,
+                    "mean_abs_risk_diff": (self.shadow_risk_diff_total / n) if n else None,
+                    "max_abs_risk_diff": self.shadow_risk_diff_max,
+                    "pending": self._shadow_pending,
+                    "dropped": self.shadow_dropped,
+                    "errors": self.shadow_errors,
+                },
+            }
@@ -0,0 +1,143 @@
+# serve.py
+# Production entry point: pre-forks N uvicorn workers that accept on one shared socket.
+# Run from creditmodel/:
+#   python -m server.serve                             # one worker per core, port $PORT or 8080
+#   python -m server.serve --workers 4 --threads 1 --port 8080
+#
+# - The parent binds the socket and imports the app (torch, pandas, FastAPI) once, then forks,
+#   so the imported code is shared copy-on-write. It never loads the model or runs a torch op
+#   itself, so no OpenMP/BLAS thread pool exists yet when it forks.
+# - Every worker pins torch to --threads intra-op threads (default: cores // workers) and one
+#   inter-op thread, and the OpenMP/MKL/OpenBLAS pools are capped the same way, so
+#   workers x threads never exceeds the cores this process may run on.
+# - Workers load the model from the memory-mapped artifact (artifacts/model.cma, see model.py
+#   "VERSIONED MODEL ARTIFACT"); the weights are views of that mapping, so all workers share
+#   one copy of the pages through the page cache.
+# - Each worker sets its flag in a shared array once its model is loaded and warmed, and /ready
+#   returns 200 only when every flag is set. A worker that dies is replaced.
+# - POST /admin/reload reaches one worker; it publishes the new routing in shared memory
+#   (registry.ReloadBroadcast) and every other worker, including later replacements, loads it.
+import argparse
+import multiprocessing as mp
+import os
+import signal
+import socket
+import time
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+RESTART_DELAY_S = 1.0     # minimum gap between two starts of the same worker slot
+SHUTDOWN_GRACE_S = 30.0   # how long workers get to drain before they are killed
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))   # honours taskset / cgroup cpusets
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    # proto must be IPPROTO_TCP (not 0): asyncio only sets TCP_NODELAY on accepted sockets
+    # whose proto says TCP, and with Nagle on every keep-alive response stalls ~40 ms on
+    # the client's delayed ACK
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)   # inherited by accepted sockets
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _pin_threads(threads: int):
+    from . import model
+    if model.torch is not None:
+        model.torch.set_num_threads(threads)
+        try:
+            model.torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass   # inter-op pool already started; leave it
+
+
+def _worker(index: int, sock: socket.socket, ready, reload_broadcast, threads: int, log_level: str):
+    import uvicorn
+    from . import app as app_module
+
+    _pin_threads(threads)
+    app_module.WORKER_READY = ready
+    app_module.WORKER_INDEX = index
+    app_module.WORKER_RELOAD = reload_broadcast
+    config = uvicorn.Config(app_module.app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(host: str = "0.0.0.0", port: int = 8080, workers: int = 0, threads: int = 0,
+          log_level: str = "info"):
+    cores = available_cores()
+    workers = max(1, workers or cores)
+    threads = max(1, threads or cores // workers)
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)   # before numpy/torch create their pools
+
+    sock = bind_socket(host, port)
+    from . import app  # noqa: F401  (preload: shared copy-on-write by every worker)
+    from .registry import ReloadBroadcast
+
+    ctx = mp.get_context("fork")
+    ready = ctx.RawArray("b", workers)
+    reload_broadcast = ReloadBroadcast(ctx, workers)
+    procs, started = {}, {}
+
+    def start(i: int):
+        ready[i] = 0
+        p = ctx.Process(target=_worker, args=(i, sock, ready, reload_broadcast, threads, log_level),
+                        name=f"credit-worker-{i}")
+        p.start()
+        procs[i], started[i] = p, time.monotonic()
+
+    stopping = []
+    def request_stop(signum, frame):
+        stopping.append(signum)
+
+    print(f"🔧 Serving on {host}:{port} with {workers} workers x {threads} threads ({cores} cores)")
+    for i in range(workers):
+        start(i)
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    while not stopping:
+        for i, p in list(procs.items()):
+            if p.is_alive():
+                continue
+            ready[i] = 0
+            if time.monotonic() - started[i] < RESTART_DELAY_S:
+                continue   # crash loop: wait a little before the next start
+            print(f"⚠️ Worker {i} (pid {p.pid}) exited with code {p.exitcode}; restarting")
+            start(i)
+        time.sleep(0.2)
+
+    print("⏹ Shutting down workers...")
+    for p in procs.values():
+        if p.is_alive():
+            p.terminate()   # SIGTERM: uvicorn stops accepting and drains in-flight requests
+    deadline = time.monotonic() + SHUTDOWN_GRACE_S
+    for p in procs.values():
+        p.join(max(0.0, deadline - time.monotonic()))
+        if p.is_alive():
+            p.kill()
+    sock.close()
+    print("✔ All workers stopped")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Pre-forked production server for the credit scoring API")
+    ap.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    ap.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8080)))
+    ap.add_argument("--workers", type=int, default=int(os.environ.get("CREDIT_WORKERS", 0)),
+                    help="worker processes (default: one per available core)")
+    ap.add_argument("--threads", type=int, default=int(os.environ.get("CREDIT_TORCH_THREADS", 0)),
+                    help="torch/BLAS threads per worker (default: cores // workers)")
+    ap.add_argument("--log-level", default=os.environ.get("LOG_LEVEL", "info"))
+    args = ap.parse_args()
+    serve(args.host, args.port, args.workers, args.threads, args.log_level)
@@ -0,0 +1,185 @@
+# sweep.py
+# Parallel hyperparameter sweep for the credit MLP.
+# Run from creditmodel/:
+#   python -m server.sweep                          # DEFAULT_GRID, one worker per CPU
+#   python -m server.sweep --grid grid.json --workers 4 --out artifacts/sweeps/run1
+#
+# The CSVs are featurized once per distinct rare_top_n and written as .npy files; worker
+# processes open them with np.load(mmap_mode="r"), so every trial shares the same pages
+# instead of holding its own copy. Each trial trains with model_train.fit_model on a fixed
+# stratified train/validation split, and the results go to leaderboard.json / leaderboard.csv.
+#
+# A grid is a JSON object mapping TrainConfig fields (hidden, dropout, lr, batch_size,
+# weight_decay, epochs, patience, ...) and "rare_top_n" to lists of values; every combination
+# is one trial. OCC_FEATURE_MULT is not swept: eng_occ_risk is standardized, so a constant
+# multiplier has no effect on the model. OCC_RULE_MULT only affects the serving-time rule
+# blend, not the MLP being trained here.
+import argparse
+import itertools
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import numpy as np
+
+from . import model_train as mt
+
+DEFAULT_GRID = {
+    "hidden": [[64, 32], [128, 64], [256, 128]],
+    "dropout": [0.1, 0.2, 0.3],
+    "lr": [3e-4, 1e-3],
+    "batch_size": [512],
+    "rare_top_n": [50],
+}
+SWEEP_DIR = os.path.join(mt.ART_DIR, "sweeps")
+ARRAY_NAMES = ("X_train", "y_train", "X_val", "y_val", "X_test", "y_test")
+
+
+def expand_grid(grid: dict) -> list:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def prepare_arrays(train_csv: str, test_csv: str, rare_top_n: int, out_dir: str,
+                   val_fraction: float = 0.1, seed: int = 0) -> str:
+    """Featurize once for this rare_top_n and save the split as .npy files; returns the dir."""
+    data_dir = os.path.join(out_dir, f"data_top{rare_top_n}")
+    if all(os.path.exists(os.path.join(data_dir, f"{n}.npy")) for n in ARRAY_NAMES[:4]):
+        return data_dir
+
+    mt.RARE_TOP_N = rare_top_n
+    data = mt.prepare_training_data(train_csv, test_csv)
+    X_tr, X_val, y_tr, y_val = mt.train_test_split(
+        data["X_train"], data["y_train"], test_size=val_fraction, random_state=seed,
+        stratify=data["y_train"],
+    )
+    arrays = {"X_train": X_tr, "y_train": y_tr, "X_val": X_val, "y_val": y_val,
+              "X_test": data["X_test"], "y_test": data["y_test"]}
+
+    os.makedirs(data_dir, exist_ok=True)
+    for name, arr in arrays.items():
+        if arr is not None:
+            np.save(os.path.join(data_dir, f"{name}.npy"), np.ascontiguousarray(arr))
+    print(f"✔ Featurized top_n={rare_top_n}: {X_tr.shape[0]} train / {X_val.shape[0]} val rows "
+          f"x {X_tr.shape[1]} features -> {data_dir}")
+    return data_dir
+
+
+def load_arrays(data_dir: str) -> dict:
+    data = {}
+    for name in ARRAY_NAMES:
+        path = os.path.join(data_dir, f"{name}.npy")
+        data[name] = np.load(path, mmap_mode="r") if os.path.exists(path) else None
+    return data
+
+
+def run_trial(trial_id: int, params: dict, data_dir: str, num_threads: int, base: dict) -> dict:
+    """Worker entry point: train one configuration on the memory-mapped arrays."""
+    # torch warns about wrapping the read-only memmaps; nothing writes to them
+    warnings.filterwarnings("ignore", message="The given NumPy array is not writable")
+    cfg_fields = {k: v for k, v in params.items() if k != "rare_top_n"}
+    if "hidden" in cfg_fields:
+        cfg_fields["hidden"] = tuple(cfg_fields["hidden"])
+    cfg = mt.TrainConfig(**{**base, **cfg_fields, "num_threads": num_threads,
+                            "checkpoint_every": 0, "verbose": False})
+    try:
+        _, summary = mt.fit_model(load_arrays(data_dir), cfg)
+    except Exception as e:
+        return {"trial": trial_id, "params": params, "error": f"{type(e).__name__}: {e}"}
+    return {
+        "trial": trial_id,
+        "params": params,
+        "val_loss": summary["val_loss"],
+        "val_acc": summary["val_acc"],
+        "test_acc": summary["test_acc"],
+        "epochs_run": summary["epochs_run"],
+        "wall_s": round(summary["wall_s"], 3),
+        "n_params": summary["n_params"],
+        "model_kb": round(summary["n_params"] * 4 / 1024, 1),   # float32 weights
+    }
+
+
+def write_leaderboard(results: list, out_dir: str) -> list:
+    ok = sorted((r for r in results if "error" not in r), key=lambda r: r["val_loss"])
+    failed = [r for r in results if "error" in r]
+    board = [{"rank": i + 1, **r} for i, r in enumerate(ok)] + failed
+
+    with open(os.path.join(out_dir, "leaderboard.json"), "w") as f:
+        json.dump(board, f, indent=2)
+    with open(os.path.join(out_dir, "leaderboard.csv"), "w") as f:
+        f.write("rank,trial,params,val_loss,val_acc,test_acc,epochs_run,wall_s,n_params,model_kb\n")
+        for r in board[:len(ok)]:
+            f.write(",".join(str(x) for x in [
+                r["rank"], r["trial"], '"' + json.dumps(r["params"]).replace('"', "'") + '"',
+                f"{r['val_loss']:.5f}", f"{r['val_acc']:.4f}",
+                "" if r["test_acc"] is None else f"{r['test_acc']:.4f}",
+                r["epochs_run"], r["wall_s"], r["n_params"], r["model_kb"],
+            ]) + "\n")
+    return board
+
+
+def run_sweep(grid: dict, train_csv: str = mt.TRAIN_CSV, test_csv: str = mt.TEST_CSV,
+              workers: int = 0, out_dir: str = None, base: dict = None) -> list:
+    """Run every combination in `grid` on a process pool; returns the ranked leaderboard."""
+    out_dir = out_dir or os.path.join(SWEEP_DIR, time.strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(out_dir, exist_ok=True)
+    trials = expand_grid(grid)
+    base = dict(base or {})
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(trials)))
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    data_dirs = {}
+    for params in trials:
+        top_n = params.get("rare_top_n", mt.RARE_TOP_N)
+        if top_n not in data_dirs:
+            data_dirs[top_n] = prepare_arrays(train_csv, test_csv, top_n, out_dir,
+                                              base.get("val_fraction", 0.1), base.get("seed", 0))
+
+    print(f"🔧 Sweeping {len(trials)} configurations on {workers} workers x {num_threads} threads")
+    results = []
+    t0 = time.perf_counter()
+    # spawn: workers must not inherit the parent's torch/OpenMP thread state
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        futures = [
+            pool.submit(run_trial, i, params, data_dirs[params.get("rare_top_n", mt.RARE_TOP_N)],
+                        num_threads, base)
+            for i, params in enumerate(trials)
+        ]
+        for fut in as_completed(futures):
+            r = fut.result()
+            results.append(r)
+            if "error" in r:
+                print(f"  ✖ trial {r['trial']} {r['params']}: {r['error']}")
+            else:
+                print(f"  trial {r['trial']:3d}  val_loss {r['val_loss']:.4f}  val_acc {r['val_acc']:.4f}  "
+                      f"{r['wall_s']:.1f}s  {r['params']}")
+
+    board = write_leaderboard(results, out_dir)
+    print(f"✔ Sweep finished in {time.perf_counter() - t0:.1f}s -> {out_dir}/leaderboard.json")
+    for r in board[:5]:
+        if "rank" in r:
+            print(f"  #{r['rank']}  val_loss {r['val_loss']:.4f}  val_acc {r['val_acc']:.4f}  "
+                  f"{r['model_kb']} KB  {r['params']}")
+    return board
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Parallel hyperparameter sweep for the credit MLP")
+    ap.add_argument("--grid", help="JSON file mapping parameter -> list of values (default: DEFAULT_GRID)")
+    ap.add_argument("--train", default=mt.TRAIN_CSV)
+    ap.add_argument("--test", default=mt.TEST_CSV)
+    ap.add_argument("--workers", type=int, default=0, help="processes (default: one per CPU)")
+    ap.add_argument("--out", help="output dir (default: artifacts/sweeps/<timestamp>)")
+    ap.add_argument("--epochs", type=int, help="max epochs per trial (TrainConfig default otherwise)")
+    args = ap.parse_args()
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid) as f:
+            grid = json.load(f)
+    base = {"epochs": args.epochs} if args.epochs else {}
+    run_sweep(grid, args.train, args.test, workers=args.workers, out_dir=args.out, base=base)
@@ -0,0 +1,60 @@
+# worker.py
+# Long-lived JSON-lines scorer for the Node gateway (server/server.js). Run from creditmodel/:
+#   python -m server.worker
+#
+# Scores through the same registry and request schema as the API (app.registry,
+# app.ScoreRequest): compiled feature plan, fused graph or NumPy backend, result cache,
+# champion/challenger routing and the model_version tag all behave as they do behind /score,
+# and the CREDIT_* / CREDIT_BACKEND environment variables apply unchanged.
+#
+# Protocol: each stdin line {"id": <any>, "payload": {...ScoreRequest fields...}} gets exactly
+# one stdout line, in order: {"id": <same id>, "result": {...}} or {"id": <same id>, "error": "..."}.
+# A {"ready": true} line is written once the model is loaded and warmed up. Anything else the
+# process prints (logging, bundle loading) goes to stderr.
+import json
+import sys
+
+
+def run_worker(stream_in, stream_out, predict_fn):
+    """
+    JSON-lines scoring loop (see the protocol above). Callers may pipeline several requests
+    and match answers by id. The loop ends when stream_in is closed.
+    """
+    def send(msg):
+        stream_out.write(json.dumps(msg) + "\n")
+        stream_out.flush()
+
+    send({"ready": True})
+    for line in stream_in:
+        line = line.strip()
+        if not line:
+            continue
+        req_id = None
+        try:
+            req = json.loads(line)
+            req_id = req.get("id")
+            send({"id": req_id, "result": predict_fn(req["payload"])})
+        except Exception as e:
+            send({"id": req_id, "error": f"{type(e).__name__}: {e}"})
+
+
+def main():
+    # The protocol owns the real stdout; any print() (bundle loading etc.) goes to stderr.
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+    from . import app as api
+
+    api.registry.reload()   # loads and warms up every live bundle; raises if that fails
+    api.registry.start_watching()
+
+    def predict(payload):
+        return api.registry.score_one(api.ScoreRequest(**payload).model_dump())
+
+    try:
+        run_worker(sys.stdin, protocol_out, predict)
+    finally:
+        api.registry.stop()
+
+
+if __name__ == "__main__":
+    main()
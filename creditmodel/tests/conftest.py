@@ -0,0 +1,10 @@
+# Tests run against the shipped artifacts/ with creditmodel/ as the working directory (model.py
+# resolves ART_DIR relative to it), from either the repo root or creditmodel/:
+#   python -m pytest creditmodel/tests
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,40 @@
+# The Parquet dataset cache (model_train.ingest_csv) must not change what training sees: the
+# featurized matrices from a cold CSV read, the run that writes the cache and the run that reads
+# it back must be identical, including for rows with missing categorical cells.
+import numpy as np
+import pytest
+
+mt = pytest.importorskip("server.model_train")
+from server.bench import synthetic_training_frame
+
+pytestmark = pytest.mark.skipif(not mt.HAVE_ARROW, reason="pyarrow not installed")
+
+
+@pytest.fixture
+def csv_pair(tmp_path):
+    df = synthetic_training_frame(3000, seed=0)
+    df.loc[df.index[::50], "Occupation"] = np.nan
+    df.loc[df.index[7::97], "Credit_Mix"] = np.nan
+    train, test = tmp_path / "train.csv", tmp_path / "test.csv"
+    df.to_csv(train, index=False)
+    synthetic_training_frame(500, seed=1, labeled=False).to_csv(test, index=False)
+    return str(train), str(test)
+
+
+def test_cached_dataset_matches_csv(csv_pair, tmp_path, monkeypatch):
+    # prepare_training_data publishes the fitted encoders as module globals; put them back after
+    for name in ("ohe", "scaler", "NUM_COLS_FIT", "CAT_COLS_FIT"):
+        monkeypatch.setattr(mt, name, getattr(mt, name))
+    monkeypatch.setattr(mt, "DATA_CACHE_DIR", str(tmp_path / "cache"))
+
+    runs = {}
+    for name, cache_on in (("off", False), ("write", True), ("cached", True)):
+        monkeypatch.setattr(mt, "DATA_CACHE_ENABLED", cache_on)
+        runs[name] = mt.prepare_training_data(*csv_pair)
+
+    cached = mt.ingest_csv(csv_pair[0])
+    assert cached["Occupation"].isna().sum() == 60
+    assert not (cached["Occupation"] == "None").any()
+    for name in ("write", "cached"):
+        for key in ("X_train", "y_train", "X_test"):
+            np.testing.assert_array_equal(runs["off"][key], runs[name][key], err_msg=f"{name}: {key}")
@@ -0,0 +1,98 @@
+# The compiled FeaturePlan must produce exactly what the fitted OHE + scaler produce
+# (_sklearn_featurize), row by row and for whole frames, on randomized form payloads.
+import math
+import os
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from server import model as m
+
+pytestmark = pytest.mark.skipif(m.torch is None or not os.path.exists(m.BUNDLE_PATH),
+                                reason="needs torch and artifacts/model_bundle.pkl")
+
+FREE_TEXT_LOANS = ["car loan", "payday", "student", "HOME EQUITY", "mortgage loan stuff",
+                   "credit builder", "", "   ", "Not Specified", "boat loan"]
+ODD_ROLES = ["astronaut", "", "  Professional  ", "STUDENT", "unknown", "123"]
+MONTHS = ["January", "March", "December", "Smarch", "march", ""]
+NAN_PRONE = ("age", "num_credit_cards", "num_bank_accounts", "num_loans", "invested")
+
+
+@pytest.fixture(scope="module")
+def bundle():
+    b = m._bundle_from_pickle(m.BUNDLE_PATH)
+    assert b.feature_plan is not None, "compile_feature_plan() rejected the shipped encoders"
+    return b
+
+
+def random_payload(rng: random.Random) -> dict:
+    roles = list(m.OCCUPATION_MAP) + ODD_ROLES
+    loans = [rng.choice(list(m.LOAN_REGEX) + FREE_TEXT_LOANS) for _ in range(rng.randint(0, 4))]
+    p = {
+        "income_monthly": round(rng.uniform(0, 20000), 2),
+        "housing_cost_monthly": round(rng.uniform(0, 4000), 2),
+        "other_expenses_monthly": round(rng.uniform(0, 2000), 2),
+        "employment_role": rng.choice(roles),
+        "loans": loans,
+        "age": rng.choice([rng.randint(18, 80), rng.uniform(18, 80)]),
+        "application_month": rng.choice(MONTHS),
+        "num_credit_cards": rng.randint(0, 12),
+        "num_bank_accounts": rng.randint(0, 12),
+        "num_loans": rng.randint(0, 9),
+        "invested": round(rng.uniform(0, 3000), 2),
+        "spending_pattern_hint": rng.choice([None, "High_spent_Small_value_payments",
+                                             "Low_spent_Large_value_payments", "!@9#%8", "whatever"]),
+        "status_hint": rng.choice([None, "Good", "bad", "Average", "standard", "excellent"]),
+    }
+    if rng.random() < 0.2:
+        del p["application_month"]   # resolve_application_month() fills in the current month
+    if rng.random() < 0.1:
+        del p["other_expenses_monthly"]
+    for key in NAN_PRONE:
+        r = rng.random()
+        if r < 0.08:
+            p[key] = None
+        elif r < 0.12:
+            p[key] = math.nan
+    return p
+
+
+def payloads(n: int, seed: int):
+    rng = random.Random(seed)
+    return [random_payload(rng) for _ in range(n)]
+
+
+def sklearn_inputs(bundle, df, scale=True):
+    return m._sklearn_featurize(df, bundle.ohe, bundle.scaler, bundle.num_cols, bundle.cat_cols, scale)
+
+
+@pytest.mark.parametrize("scale", [True, False])
+def test_transform_row_matches_sklearn(bundle, scale):
+    for p in payloads(300, seed=1):
+        row = m.build_row_from_user_payload(p)
+        expected = sklearn_inputs(bundle, pd.DataFrame([row], columns=m.TRAIN_COLUMNS), scale)
+        got = bundle.feature_plan.transform_row(row, scale=scale)
+        assert got.dtype == np.float32
+        assert np.array_equal(got, expected, equal_nan=True), p
+
+
+@pytest.mark.parametrize("scale", [True, False])
+@pytest.mark.parametrize("size", [1, 7, 64, 500])
+def test_transform_df_matches_sklearn(bundle, scale, size):
+    df = m.build_df_from_user_payloads(payloads(size, seed=size))
+    expected = sklearn_inputs(bundle, df, scale)
+    got = bundle.feature_plan.transform_df(df, scale=scale)
+    assert got.dtype == np.float32
+    assert np.array_equal(got, expected, equal_nan=True)
+
+
+def test_canned_payloads_cover_unknown_inputs(bundle):
+    # every categorical column gets an unseen value: all-zero OHE block on both paths
+    row = m.build_row_from_user_payload({"employment_role": "astronaut", "loans": ["boat loan"],
+                                         "application_month": "Smarch", "status_hint": "excellent",
+                                         "spending_pattern_hint": "whatever", "age": None})
+    df = pd.DataFrame([row], columns=m.TRAIN_COLUMNS)
+    assert np.array_equal(bundle.feature_plan.transform_row(row), sklearn_inputs(bundle, df))
+    assert np.array_equal(bundle.feature_plan.transform_df(df), sklearn_inputs(bundle, df))
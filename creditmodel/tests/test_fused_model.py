@@ -0,0 +1,86 @@
+# The fused graph (scaler + BatchNorm folded into the Linears) and the NumPy backend must give
+# the trained MLP's probabilities within FUSED_TOLERANCE, on real payloads and random probes.
+import os
+
+import numpy as np
+import pytest
+
+from server import model as m
+from server.bench import synthetic_payloads
+
+pytestmark = pytest.mark.skipif(m.torch is None or not os.path.exists(m.BUNDLE_PATH),
+                                reason="needs torch and artifacts/model_bundle.pkl")
+
+
+@pytest.fixture(scope="module")
+def bundle():
+    return m._bundle_from_pickle(m.BUNDLE_PATH)
+
+
+@pytest.fixture(scope="module")
+def raw_inputs(bundle):
+    """Unscaled inputs: featurized synthetic applicants plus random probes around the data."""
+    df = m.build_df_from_user_payloads(synthetic_payloads(512, seed=4))
+    real = m._sklearn_featurize(df, bundle.ohe, bundle.scaler, bundle.num_cols, bundle.cat_cols,
+                                scale=False).astype(np.float64)
+    rng = np.random.default_rng(0)
+    n_num, dim = len(bundle.num_cols), real.shape[1]
+    probes = np.zeros((512, dim))
+    probes[:, :n_num] = (rng.normal(0.0, 2.0, (512, n_num)) * bundle.scaler.scale_
+                         + bundle.scaler.mean_)
+    probes[:, n_num:] = rng.random((512, dim - n_num)) < 0.2
+    return np.vstack([real, probes])
+
+
+def mlp_proba(bundle, raw):
+    scaled = raw.copy()
+    n_num = len(bundle.num_cols)
+    scaled[:, :n_num] = bundle.scaler.transform(raw[:, :n_num])
+    with m.torch.no_grad():
+        logits = bundle.model(m.torch.tensor(scaled, dtype=m.torch.float32))
+        return m.torch.softmax(logits, dim=1).double().numpy()
+
+
+def folded_layers(bundle):
+    return m.fold_mlp_weights(bundle.model.state_dict(), bundle.scaler.mean_, bundle.scaler.scale_,
+                              len(bundle.num_cols), eps=bundle.model.net[2].eps)
+
+
+def test_fused_graph_matches_mlp(bundle, raw_inputs):
+    fused = m.build_fused_model(bundle.model, bundle.scaler.mean_, bundle.scaler.scale_,
+                                len(bundle.num_cols))
+    with m.torch.no_grad():
+        p_fused = m.torch.softmax(fused(m.torch.tensor(raw_inputs, dtype=m.torch.float32)), dim=1)
+    err = np.abs(p_fused.double().numpy() - mlp_proba(bundle, raw_inputs)).max()
+    assert err <= m.FUSED_TOLERANCE
+
+
+def test_numpy_mlp_matches_mlp(bundle, raw_inputs):
+    p_np = m.NumpyMLP(folded_layers(bundle)).predict_proba(raw_inputs.astype(np.float32))
+    assert np.abs(p_np - mlp_proba(bundle, raw_inputs)).max() <= m.FUSED_TOLERANCE
+
+
+def test_numpy_mlp_matches_fused_graph(bundle, raw_inputs):
+    fused = m.build_fused_model(bundle.model, bundle.scaler.mean_, bundle.scaler.scale_,
+                                len(bundle.num_cols))
+    x = raw_inputs.astype(np.float32)
+    with m.torch.no_grad():
+        p_fused = m.torch.softmax(fused(m.torch.from_numpy(x)), dim=1).numpy()
+    assert np.abs(m.NumpyMLP(folded_layers(bundle)).predict_proba(x) - p_fused).max() <= m.FUSED_TOLERANCE
+
+
+def test_load_time_probe_agrees(bundle):
+    fused = m.build_fused_model(bundle.model, bundle.scaler.mean_, bundle.scaler.scale_,
+                                len(bundle.num_cols))
+    assert m.check_fused_equivalence(bundle.model, fused, bundle.scaler.mean_, bundle.scaler.scale_,
+                                     len(bundle.num_cols)) <= m.FUSED_TOLERANCE
+    assert bundle.fused is not None   # the shipped bundle serves the fused graph
+
+
+@pytest.mark.skipif(not os.path.exists(m.ARTIFACT_PATH), reason="needs artifacts/model.cma")
+def test_shipped_artifact_matches_mlp(bundle, raw_inputs):
+    header, t = m.read_artifact(m.ARTIFACT_PATH, verify=True)
+    net = m.NumpyMLP([(t[f"W{i}"], t[f"b{i}"]) for i in range(header["n_layers"])], transposed=True)
+    assert header["num_cols"] == list(bundle.num_cols)
+    assert np.abs(net.predict_proba(raw_inputs.astype(np.float32))
+                  - mlp_proba(bundle, raw_inputs)).max() <= m.FUSED_TOLERANCE
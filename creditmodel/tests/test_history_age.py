@@ -0,0 +1,66 @@
+# parse_history_months() parses each distinct Credit_History_Age string once; the values must
+# be exactly those of the original per-row parser (kept below verbatim as the reference).
+import os
+
+import pandas as pd
+import pytest
+
+mt = pytest.importorskip("server.model_train")
+from server.bench import synthetic_training_frame
+
+
+def reference_parse(s: pd.Series) -> pd.Series:
+    out = []
+    for x in s.astype(str):
+        xl = x.lower()
+        yrs = 0
+        mos = 0
+        try:
+            if "year" in xl:
+                # grab number before 'year'
+                parts = xl.split("year")[0].strip().split()
+                if parts:
+                    yrs = int(parts[-1])
+            if "month" in xl:
+                # grab number before 'month'
+                parts = xl.split("month")[0].strip().split()
+                if parts:
+                    mos = int(parts[-1])
+        except Exception:
+            yrs, mos = 0, 0
+        out.append(yrs * 12 + mos)
+    return pd.to_numeric(pd.Series(out), errors="coerce").fillna(0.0)
+
+
+ODD_VALUES = [
+    "17 Years and 4 Months", "3 Years, 4 Months", "-3 Years and -2 Months", "+1 Years and 0 Months",
+    "22 years", "5 months", "1 Year and 1 Month", "YEARS and MONTHS", "Years 4 and Months 2",
+    "10Years and 3Months", "x Years and 2 Months", "4 Years and 2.5 Months", "NA", "nan", "",
+    "   ", "0 Years and 0 Months", "1_0 Years", "١٢ Years", "12 Months and 3 Years", None, float("nan"),
+]
+
+
+def assert_same(values):
+    s = pd.Series(values, dtype=object)
+    got, expected = mt.parse_history_months(s), reference_parse(s)
+    assert got.index.equals(s.index)
+    assert list(got.to_numpy()) == list(expected.to_numpy())
+
+
+def test_odd_values_match_reference():
+    assert_same(ODD_VALUES * 3)
+
+
+def test_synthetic_training_values_match_reference():
+    assert_same(synthetic_training_frame(5000, seed=2)["Credit_History_Age"].tolist())
+
+
+@pytest.mark.skipif(not os.path.exists(mt.TRAIN_CSV), reason="train.csv not available")
+def test_train_csv_uniques_match_reference():
+    values = pd.read_csv(mt.TRAIN_CSV, usecols=["Credit_History_Age"])["Credit_History_Age"]
+    assert_same(values.drop_duplicates().tolist())
+
+
+def test_keeps_the_input_index():
+    s = pd.Series(["1 Years and 2 Months", "nan"], index=[10, 20])
+    assert mt.parse_history_months(s).to_dict() == {10: 14.0, 20: 0.0}
@@ -0,0 +1,52 @@
+# MicroBatcher must resolve every submitted request: a batch whose score_many result list is
+# the wrong length goes through the one-by-one fallback, and stop() fails whatever is still
+# queued or being scored instead of leaving callers waiting.
+import asyncio
+import threading
+
+import pytest
+
+from server.microbatch import MicroBatcher
+
+
+def score_one(payload):
+    return {"id": payload["id"]}
+
+
+def test_short_result_list_falls_back_to_score_one():
+    async def main():
+        batcher = MicroBatcher(lambda payloads: [score_one(p) for p in payloads[:-1]], score_one,
+                               window_ms=20.0)
+        await batcher.start()
+        try:
+            results = await asyncio.gather(*(batcher.submit({"id": i}) for i in range(5)))
+        finally:
+            await batcher.stop()
+        return results, batcher.failed_batches
+
+    results, failed = asyncio.run(main())
+    assert results == [{"id": i} for i in range(5)]
+    assert failed >= 1
+
+
+def test_stop_fails_queued_and_in_flight_requests():
+    release = threading.Event()
+
+    def slow_score_many(payloads):
+        release.wait(5.0)
+        return [score_one(p) for p in payloads]
+
+    async def main():
+        batcher = MicroBatcher(slow_score_many, score_one, window_ms=0.0, max_batch=1)
+        await batcher.start()
+        tasks = [asyncio.create_task(batcher.submit({"id": i})) for i in range(3)]
+        await asyncio.sleep(0.05)   # first request is being scored, the others are queued
+        await batcher.stop()
+        release.set()
+        outcomes = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 5.0)
+        with pytest.raises(RuntimeError):
+            await batcher.submit({"id": 99})
+        return outcomes
+
+    outcomes = asyncio.run(main())
+    assert all(isinstance(o, RuntimeError) for o in outcomes)
@@ -3,6 +3,8 @@ const express = require('express');
 const cors = require('cors');
 const mongoose = require('mongoose');
 const { spawn } = require('child_process');
+const path = require('path');
+const readline = require('readline');
 
 const app = express();
 const PORT = process.env.PORT || 3000;
@@ -37,50 +39,128 @@ app.use(express.json());
 
 app.get('/', (req, res) => res.send('MongoDB Credit Server Running'));
 
-// 3. API ROUTE
-app.post('/api/calculate-score', async (req, res) => {
-    const { userId, ...financialData } = req.body;
-    const jsonData = JSON.stringify(financialData);
-
-    // Spawn Python Script
-    const pythonProcess = spawn('python3', ['model.py', jsonData]);
-
-    let resultString = '';
-    let errorString = '';
+// 3. SCORING WORKER
+// One long-lived `python -m server.worker` process loads the model once and answers
+// JSON-lines requests ({id, payload} -> {id, result|error}), so a score costs milliseconds
+// instead of a Python start-up + model load per request. It scores through server.model's
+// registry, like the FastAPI /score endpoint (same model_version, result cache and backends).
+// If the worker dies or cannot be started, its pending requests fail at once and the next
+// request starts a new one.
+const CREDITMODEL_DIR = process.env.CREDITMODEL_DIR || path.join(__dirname, '..', 'creditmodel');
+const PYTHON_BIN = process.env.PYTHON_BIN || 'python3';
+const SCORE_TIMEOUT_MS = Number(process.env.SCORE_TIMEOUT_MS || 30000);
+
+let scorer = null;
+let nextRequestId = 1;
+
+// Fail everything still waiting on `proc` and make sure the next request starts a new worker
+function retireScorer(proc, reason) {
+    if (scorer === proc) scorer = null;
+    for (const entry of proc.pending.values()) {
+        clearTimeout(entry.timer);
+        entry.reject(new Error(reason));
+    }
+    proc.pending.clear();
+}
 
-    pythonProcess.stdout.on('data', (data) => { resultString += data.toString(); });
-    pythonProcess.stderr.on('data', (data) => { errorString += data.toString(); });
+function startScorer() {
+    const proc = spawn(PYTHON_BIN, ['-m', 'server.worker'], { cwd: CREDITMODEL_DIR });
+    proc.pending = new Map(); // id -> { resolve, reject, timer }
 
-    pythonProcess.on('close', async (code) => {
-        if (code !== 0) {
-            console.error("Python Error:", errorString);
-            return res.status(500).json({ error: "AI Model Failed", details: errorString });
+    readline.createInterface({ input: proc.stdout }).on('line', (line) => {
+        let msg;
+        try {
+            msg = JSON.parse(line);
+        } catch (e) {
+            console.error('Scoring worker sent invalid JSON:', line);
+            return;
+        }
+        if (msg.ready) {
+            console.log('✅ Scoring worker ready');
+            return;
         }
+        const entry = proc.pending.get(msg.id);
+        if (!entry) return;
+        proc.pending.delete(msg.id);
+        clearTimeout(entry.timer);
+        if (msg.error) entry.reject(new Error(msg.error));
+        else entry.resolve(msg.result);
+    });
 
-        try {
-            // Parse AI Result
-            const aiResult = JSON.parse(resultString);
+    proc.stderr.on('data', (data) => console.error('[scorer]', data.toString().trimEnd()));
 
-            // 4. SAVE TO MONGODB
-            const newEntry = new CreditScore({
-                userId: userId || 'anonymous',
-                score: aiResult.credit_score,
-                band: aiResult.band,
-                reasons: aiResult.reasons,
-                inputData: financialData
-            });
+    // A write after the worker died emits EPIPE here; unhandled, it would crash the gateway
+    proc.stdin.on('error', (err) => {
+        console.error('Scoring worker stdin error:', err.message);
+        retireScorer(proc, 'Scoring worker is not accepting requests');
+    });
 
-            await newEntry.save();
-            console.log(`Saved score ${aiResult.credit_score} to MongoDB`);
+    proc.on('exit', (code, signal) => {
+        console.error(`Scoring worker exited (${signal || `code ${code}`}); it will restart on the next request`);
+        retireScorer(proc, 'Scoring worker exited');
+    });
 
-            // Respond to Frontend
-            res.json(aiResult);
+    // spawn failures (e.g. PYTHON_BIN not found) may never emit 'exit'
+    proc.on('error', (err) => {
+        console.error('❌ Scoring worker error:', err.message);
+        retireScorer(proc, `Scoring worker failed: ${err.message}`);
+    });
+    return proc;
+}
 
+function scorePayload(payload) {
+    if (!scorer) scorer = startScorer();
+    const proc = scorer;
+    return new Promise((resolve, reject) => {
+        const id = nextRequestId++;
+        const timer = setTimeout(() => {
+            proc.pending.delete(id);
+            reject(new Error('Scoring timed out'));
+        }, SCORE_TIMEOUT_MS);
+        proc.pending.set(id, { resolve, reject, timer });
+        try {
+            proc.stdin.write(JSON.stringify({ id, payload }) + '\n');
         } catch (e) {
-            console.error("Error processing result:", e);
-            res.status(500).json({ error: "Server Error", details: e.message });
+            retireScorer(proc, `Could not send to scoring worker: ${e.message}`);
         }
     });
+}
+
+// 4. API ROUTE
+app.post('/api/calculate-score', async (req, res) => {
+    const { userId, ...financialData } = req.body;
+
+    let aiResult;
+    try {
+        aiResult = await scorePayload(financialData);
+    } catch (e) {
+        console.error("Python Error:", e.message);
+        return res.status(500).json({ error: "AI Model Failed", details: e.message });
+    }
+
+    try {
+        // 5. SAVE TO MONGODB
+        const newEntry = new CreditScore({
+            userId: userId || 'anonymous',
+            score: aiResult.credit_score,
+            band: aiResult.band,
+            reasons: aiResult.reasons,
+            inputData: financialData
+        });
+
+        await newEntry.save();
+        console.log(`Saved score ${aiResult.credit_score} to MongoDB`);
+
+        // Respond to Frontend
+        res.json(aiResult);
+
+    } catch (e) {
+        console.error("Error processing result:", e);
+        res.status(500).json({ error: "Server Error", details: e.message });
+    }
 });
 
+// Start the worker up front so the first request does not pay for the model load
+scorer = startScorer();
+
 app.listen(PORT, () => console.log(`Server running on port ${PORT}`));
\ No newline at end of file